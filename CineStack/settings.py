@@ -122,6 +122,15 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # POST /api/movies/batch/ can fetch up to 500 titles from TMDB per request
+    'DEFAULT_THROTTLE_RATES': {
+        'tmdb_batch': '30/hour',
+    },
+    # JSON equivalent to JSONRenderer's, rendered with orjson when it is installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'playlist.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # =============================
@@ -230,4 +239,47 @@ if os.environ.get('DATABASE_URL'):
 TMDB_API_KEY = os.environ.get("TMDB_API_KEY", "")  # REQUIRED, no default
 TMDB_BASE_URL = os.environ.get("TMDB_BASE_URL", "https://api.themoviedb.org/3")
 # Base path used to build poster URLs (can be overridden)
-TMDB_IMAGE_BASE = os.environ.get("TMDB_IMAGE_BASE", "https://image.tmdb.org/t/p/w500")
\ No newline at end of file
+TMDB_IMAGE_BASE = os.environ.get("TMDB_IMAGE_BASE", "https://image.tmdb.org/t/p/w500")
+# Pooled HTTP session used for TMDB calls (one pool per worker process)
+TMDB_HTTP_POOL_SIZE = int(os.environ.get("TMDB_HTTP_POOL_SIZE", 10))
+TMDB_HTTP_TIMEOUT = float(os.environ.get("TMDB_HTTP_TIMEOUT", 10))
+TMDB_HTTP_MAX_RETRIES = int(os.environ.get("TMDB_HTTP_MAX_RETRIES", 3))
+TMDB_HTTP_BACKOFF = float(os.environ.get("TMDB_HTTP_BACKOFF", 0.5))  # base seconds for exponential backoff
+# Seconds after the first attempt past which a TMDB call stops retrying; with
+# TMDB_HTTP_TIMEOUT it bounds one call, so keep the sum under gunicorn's 30 s timeout
+TMDB_HTTP_RETRY_BUDGET = float(os.environ.get("TMDB_HTTP_RETRY_BUDGET", 15))
+# Connection pool size of the async TMDB client (one per event loop, used by the async proxy views)
+TMDB_ASYNC_POOL_SIZE = int(os.environ.get("TMDB_ASYNC_POOL_SIZE", 100))
+# Concurrent TMDB fetches when resolving movies in bulk (keep <= TMDB_HTTP_POOL_SIZE)
+TMDB_BATCH_WORKERS = int(os.environ.get("TMDB_BATCH_WORKERS", 8))
+# Seconds a stored TMDB detail snapshot is served before it is revalidated with TMDB
+TMDB_SNAPSHOT_MAX_AGE = int(os.environ.get("TMDB_SNAPSHOT_MAX_AGE", 24 * 60 * 60))
+# Seconds before a stored TV season is refetched by refresh_tv_catalogue
+TV_CATALOGUE_MAX_AGE = int(os.environ.get("TV_CATALOGUE_MAX_AGE", 7 * 24 * 60 * 60))
+# /api/sync/: seconds of overlap re-sent before each watermark (covers writes that
+# committed after a sync read past them) and how long deletion tombstones are kept
+SYNC_WATERMARK_OVERLAP = int(os.environ.get("SYNC_WATERMARK_OVERLAP", 5))
+SYNC_TOMBSTONE_RETENTION = int(os.environ.get("SYNC_TOMBSTONE_RETENTION", 90 * 24 * 60 * 60))
+# Rows fetched per round trip by the streaming playlist export (/api/playlists/<id>/export/)
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 2000))
+
+# Cache backend - local memory by default. Point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (e.g. django.core.cache.backends.redis.RedisCache) when running several workers
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# ETag/304 answers for playlist reads (playlist.library_version) need version tokens that every
+# worker sees, so by default they are only on with a shared cache. Set LIBRARY_ETAGS=true to
+# force them on (single-process deployments) or false to turn them off.
+LIBRARY_ETAGS = (
+    os.environ['LIBRARY_ETAGS'].lower() in ('true', '1', 'yes') if 'LIBRARY_ETAGS' in os.environ else None
+)
+
+# Per-endpoint TTLs (seconds) for cached TMDB responses; unset keys use playlist.tmdb_cache.DEFAULT_TTLS
+TMDB_CACHE_TTLS = {}
+# Extra seconds popular/top-rated pages may be served stale while refreshed in the background
+TMDB_CACHE_STALE_TTLS = {}
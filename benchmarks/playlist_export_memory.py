@@ -0,0 +1,109 @@
+"""
+Peak memory of a playlist download: the items endpoint vs the streaming export.
+
+Seeds a throwaway test database (in memory for SQLite; test_<name> on the
+server from DATABASE_URL for Postgres) with playlists of each ``--sizes``
+item count, then fetches every playlist through the Django test client:
+
+- items: ``GET /api/playlists/<id>/items/`` (whole list built, then rendered)
+- export: ``GET /api/playlists/<id>/export/`` (?as=json and ?as=ndjson),
+  consumed chunk by chunk as a WSGI server would
+
+and prints the Python heap peak (tracemalloc) of each request.
+
+    python benchmarks/playlist_export_memory.py --sizes 1000 10000 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "CineStack.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from playlist.models import Movie, Playlist, PlaylistItem  # noqa: E402
+
+
+def seed(user, sizes, batch_size=2000):
+    movies = Movie.objects.bulk_create(
+        [
+            Movie(
+                title=f"Title {n}",
+                description="A fairly ordinary synopsis of a film, long enough to look realistic. " * 3,
+                poster_url=f"https://image.tmdb.org/t/p/w500/poster{n}.jpg",
+                media_type="movie",
+                tmdb_id=50_000_000 + n,
+            )
+            for n in range(max(sizes))
+        ],
+        batch_size=batch_size,
+    )
+    playlists = {}
+    for size in sizes:
+        playlist = Playlist.objects.create(user=user, title=f"{size} items")
+        PlaylistItem.objects.bulk_create(
+            [PlaylistItem(playlist=playlist, movie=movie) for movie in movies[:size]], batch_size=batch_size
+        )
+        playlists[size] = playlist
+    return playlists
+
+
+def measure(client, url, params=None):
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url, params)
+    assert response.status_code == 200, response.status_code
+    if response.streaming:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+    else:
+        size = len(response.content)
+    elapsed = (time.perf_counter() - start) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"bytes": size, "ms": round(elapsed, 1), "peak_mb": round(peak / 2 ** 20, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Items per playlist")
+    args = parser.parse_args()
+
+    # Test client requests (allows the "testserver" host)
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    results = {}
+    try:
+        user = User.objects.create(username="bench", password="!")
+        client = APIClient()
+        client.force_authenticate(user)
+        for size, playlist in seed(user, args.sizes).items():
+            results[size] = {
+                "items": measure(client, f"/api/playlists/{playlist.id}/items/"),
+                "export json": measure(client, f"/api/playlists/{playlist.id}/export/", {"as": "json"}),
+                "export ndjson": measure(client, f"/api/playlists/{playlist.id}/export/", {"as": "ndjson"}),
+            }
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f"Python heap peak per request on {connection.vendor} (tracemalloc)")
+    for size, endpoints in results.items():
+        print(f"\n== {size} items")
+        for name, result in endpoints.items():
+            print(f"  {name:<14} peak {result['peak_mb']:>7} MB  {result['ms']:>8} ms  {result['bytes']:>10} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Micro-benchmark: DRF serializers + JSONRenderer vs the fast_serializers
+``.values()`` path + FastJSONRenderer, on 10k-row payloads.
+
+Seeds a throwaway test database (in memory for SQLite; test_<name> on the
+server from DATABASE_URL for Postgres) with one playlist of ``--items``
+items and as many favorites and reviews, then times for each payload:
+
+- query + build: fetching the rows and producing the Python data
+- render: turning it into JSON bytes
+
+and checks the two paths produce byte-for-byte identical output.
+
+    python benchmarks/serializer_fastpath.py --items 10000 --repeat 5
+
+Without orjson installed FastJSONRenderer falls back to JSONRenderer, so
+only the serializer part of the speed-up remains.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "CineStack.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Prefetch  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from playlist import fast_serializers  # noqa: E402
+from playlist.models import Favorite, Movie, Playlist, PlaylistItem, Review  # noqa: E402
+from playlist.renderers import FastJSONRenderer, orjson  # noqa: E402
+from playlist.serializers import (  # noqa: E402
+    FavoriteSerializer,
+    PlaylistItemSerializer,
+    PlaylistSerializer,
+    ReviewSerializer,
+)
+
+
+def seed(items: int, batch_size: int = 2000):
+    user = User.objects.create(username="bench", password="!")
+    statuses = [choice for choice, _ in PlaylistItem.Status.choices]
+    movies = Movie.objects.bulk_create(
+        [
+            Movie(
+                title=f"Title {n} – “quoted”",
+                description="A fairly ordinary synopsis of a film, long enough to look realistic. " * 3,
+                poster_url=f"https://image.tmdb.org/t/p/w500/poster{n}.jpg",
+                release_year=1950 + n % 75,
+                media_type="tv" if n % 4 == 0 else "movie",
+                tmdb_id=40_000_000 + n,
+                youtube_id=f"yt{n:08d}",
+            )
+            for n in range(items)
+        ],
+        batch_size=batch_size,
+    )
+    playlist = Playlist.objects.create(user=user, title="Everything", description="Benchmark playlist")
+    PlaylistItem.objects.bulk_create(
+        [
+            PlaylistItem(playlist=playlist, movie=movie, status=statuses[n % len(statuses)], user_rating=n % 6 or None)
+            for n, movie in enumerate(movies)
+        ],
+        batch_size=batch_size,
+    )
+    Favorite.objects.bulk_create([Favorite(user=user, movie=movie) for movie in movies], batch_size=batch_size)
+    Review.objects.bulk_create(
+        [Review(user=user, movie=movie, rating=n % 5 + 1, review_text="Liked it.") for n, movie in enumerate(movies)],
+        batch_size=batch_size,
+    )
+    Playlist.objects.filter(pk=playlist.pk).refresh_counters()
+    playlist.refresh_from_db()
+    return user, playlist
+
+
+def payloads(user, playlist):
+    """name -> (current path, fast path); each returns the data to render."""
+    items = PlaylistItem.objects.filter(playlist=playlist).order_by("-added_at", "-id")
+    favorites = Favorite.objects.filter(user=user).order_by("-added_at", "-id")
+    reviews = Review.objects.filter(user=user).order_by("-created_at", "-id")
+
+    def playlist_detail():
+        # What PlaylistViewSet.retrieve did before: prefetch items with their movies
+        prefetched = Playlist.objects.prefetch_related(
+            Prefetch("items", queryset=items.select_related("movie"))
+        ).get(pk=playlist.pk)
+        return PlaylistSerializer(prefetched).data
+
+    return {
+        "playlist_detail": (
+            playlist_detail,
+            lambda: fast_serializers.playlist_data(
+                Playlist.objects.get(pk=playlist.pk), items.values(*fast_serializers.PLAYLIST_ITEM_VALUES)
+            ),
+        ),
+        "playlist_items": (
+            lambda: PlaylistItemSerializer(items.select_related("movie"), many=True).data,
+            lambda: fast_serializers.playlist_item_data(items.values(*fast_serializers.PLAYLIST_ITEM_VALUES)),
+        ),
+        "favorites": (
+            lambda: FavoriteSerializer(favorites.select_related("movie"), many=True).data,
+            lambda: fast_serializers.favorite_data(favorites.values(*fast_serializers.FAVORITE_VALUES)),
+        ),
+        "reviews": (
+            lambda: ReviewSerializer(reviews.select_related("movie", "user"), many=True).data,
+            lambda: fast_serializers.review_data(reviews.values(*fast_serializers.REVIEW_VALUES)),
+        ),
+    }
+
+
+def timed(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, round(statistics.median(timings), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10000, help="Rows per payload")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    results = {}
+    mismatches = []
+    try:
+        user, playlist = seed(args.items)
+        for name, (current, fast) in payloads(user, playlist).items():
+            current_data, current_build = timed(current, args.repeat)
+            current_bytes, current_render = timed(lambda: JSONRenderer().render(current_data), args.repeat)
+            fast_data, fast_build = timed(fast, args.repeat)
+            fast_bytes, fast_render = timed(lambda: FastJSONRenderer().render(fast_data), args.repeat)
+            if fast_bytes != current_bytes:
+                mismatches.append(name)
+            results[name] = {
+                "bytes": len(current_bytes),
+                "identical": fast_bytes == current_bytes,
+                "current_ms": {"build": current_build, "render": current_render},
+                "fast_ms": {"build": fast_build, "render": fast_render},
+            }
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f"{args.items} rows per payload on {connection.vendor}, orjson {'on' if orjson else 'not installed'}")
+    print(f"{'payload':<16}{'bytes':>10}  {'current build+render':>22}  {'fast build+render':>20}  {'speed-up':>8}  identical")
+    for name, result in results.items():
+        current, fast = result["current_ms"], result["fast_ms"]
+        current_total = current["build"] + current["render"]
+        fast_total = fast["build"] + fast["render"]
+        print(
+            f"{name:<16}{result['bytes']:>10}  "
+            f"{current['build']:>9} + {current['render']:>6} ms  "
+            f"{fast['build']:>7} + {fast['render']:>6} ms  "
+            f"{current_total / fast_total:>7.1f}x  {result['identical']}"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"rows": args.items, "results": results}, indent=2))
+    if mismatches:
+        sys.exit(f"Output differs for: {', '.join(mismatches)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Load benchmark for the TMDB proxy routes: sync (gunicorn/WSGI) vs async (ASGI).
+
+The benchmark has two parts:
+
+1. ``fake-tmdb`` - a stand-in TMDB API that answers every request after a
+   fixed delay, so results measure our proxy rather than TMDB or the network.
+2. ``run`` - fires a fixed number of requests at a running server with a given
+   concurrency and prints throughput and latency percentiles.
+
+Typical session (each server in its own terminal, pip install uvicorn first):
+
+    python benchmarks/tmdb_proxy_load.py fake-tmdb --port 9000 --latency 0.25
+
+    export TMDB_API_KEY=bench TMDB_BASE_URL=http://127.0.0.1:9000/3
+    gunicorn CineStack.wsgi:application -w 4 -b 127.0.0.1:8001
+    uvicorn CineStack.asgi:application --workers 1 --port 8002
+
+    python benchmarks/tmdb_proxy_load.py run --base http://127.0.0.1:8001 \\
+        --route "/api/tmdb/movies/{n}/" --requests 2000 --concurrency 200
+    python benchmarks/tmdb_proxy_load.py run --base http://127.0.0.1:8002 \\
+        --route "/api/tmdb/async/movies/{n}/" --requests 2000 --concurrency 200
+
+``{n}`` in the route is replaced by a unique number per request so every call
+misses the response cache and goes upstream; use a fixed route to measure the
+cache-hit path instead.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+
+def serve_fake_tmdb(port: int, latency: float) -> None:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = json.dumps({
+                "id": 1,
+                "title": "Benchmark Movie",
+                "name": "Benchmark Show",
+                "page": 1,
+                "results": [{"id": i, "media_type": "movie"} for i in range(20)],
+                "videos": {"results": []},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    print(f"Fake TMDB listening on http://127.0.0.1:{port}/3 (latency {latency * 1000:.0f} ms)")
+    server.serve_forever()
+
+
+async def run_load(base: str, route: str, total: int, concurrency: int, timeout: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+    started_at = int(time.time())
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=timeout) as client:
+
+        async def worker():
+            nonlocal errors
+            for n in counter:
+                url = route.format(n=started_at * 100000 + n)
+                start = time.perf_counter()
+                try:
+                    resp = await client.get(url)
+                    if resp.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "wall_seconds": round(wall, 2),
+        "requests_per_second": round(total / wall, 1),
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 1),
+            "p50": round(pct(0.50), 1),
+            "p95": round(pct(0.95), 1),
+            "p99": round(pct(0.99), 1),
+            "max": round(latencies[-1] * 1000, 1),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fake = sub.add_parser("fake-tmdb", help="Run a fake TMDB upstream with fixed latency")
+    fake.add_argument("--port", type=int, default=9000)
+    fake.add_argument("--latency", type=float, default=0.25, help="Seconds to wait before answering")
+
+    run = sub.add_parser("run", help="Fire requests at a running proxy server")
+    run.add_argument("--base", required=True, help="Server base URL, e.g. http://127.0.0.1:8001")
+    run.add_argument("--route", default="/api/tmdb/movies/{n}/")
+    run.add_argument("--requests", type=int, default=1000)
+    run.add_argument("--concurrency", type=int, default=100)
+    run.add_argument("--timeout", type=float, default=60)
+
+    args = parser.parse_args()
+    if args.command == "fake-tmdb":
+        serve_fake_tmdb(args.port, args.latency)
+    else:
+        result = asyncio.run(run_load(args.base, args.route, args.requests, args.concurrency, args.timeout))
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
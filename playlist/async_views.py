@@ -0,0 +1,117 @@
+"""
+Async TMDB proxy views.
+
+Native Django async views mirroring the TMDB proxy endpoints in views.py.
+Under an ASGI server (see CineStack/asgi.py) each in-flight TMDB call is a
+suspended coroutine rather than a blocked worker thread, so one process can
+hold hundreds of concurrent upstream requests. Error responses have the
+sync views' {"error": ...} shape.
+
+Under WSGI (gunicorn, the Procfile default) Django would run each call in
+a new event loop with a new, never-closed httpx client and connection
+pool, so there these routes answer 404 and clients use the sync ones.
+
+Payloads are TMDB's as-is. Unlike the sync search, popular and top-rated
+views, these do not add the caller's library state (is_favorite,
+playlist_status, my_rating) and ignore ``?enrich=1``. They are plain Django
+views without DRF token authentication, so they don't know who is
+asking. Clients that need library state should use the sync endpoints.
+"""
+
+from functools import wraps
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from .services import (
+    TMDBError,
+    asearch_tmdb,
+    aget_tmdb_movie_details,
+    aget_tmdb_tv_details,
+    aget_tmdb_tv_season_details,
+    aget_tmdb_popular,
+    aget_tmdb_top_rated,
+)
+
+
+def _parse_page(value) -> int:
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 1
+
+
+def asgi_only(view):
+    """Serve ``view`` only to requests that came in through ASGI."""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({"error": "Async TMDB endpoints are only served under ASGI"}, status=404)
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+async def _proxy(fetch):
+    """Await a TMDB fetcher and map errors the same way the sync views do."""
+    try:
+        return JsonResponse(await fetch())
+    except TMDBError as e:
+        return JsonResponse({"error": str(e)}, status=404)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@require_GET
+@asgi_only
+async def tmdb_search(request):
+    """Async proxy endpoint for TMDB search."""
+    query = request.GET.get("query", "")
+    page = _parse_page(request.GET.get("page", 1))
+    media_type = request.GET.get("type", "multi")
+
+    if not query:
+        return JsonResponse({"error": "Query parameter is required"}, status=400)
+
+    return await _proxy(lambda: asearch_tmdb(query, page, media_type))
+
+
+@require_GET
+@asgi_only
+async def tmdb_movie_detail(request, tmdb_id):
+    """Async proxy endpoint for TMDB movie details."""
+    return await _proxy(lambda: aget_tmdb_movie_details(tmdb_id))
+
+
+@require_GET
+@asgi_only
+async def tmdb_tv_detail(request, tmdb_id):
+    """Async proxy endpoint for TMDB TV show details."""
+    return await _proxy(lambda: aget_tmdb_tv_details(tmdb_id))
+
+
+@require_GET
+@asgi_only
+async def tmdb_tv_season_detail(request, tmdb_id, season_number):
+    """Async proxy endpoint for TMDB TV season."""
+    return await _proxy(lambda: aget_tmdb_tv_season_details(tmdb_id, season_number))
+
+
+@require_GET
+@asgi_only
+async def tmdb_popular(request):
+    """Async proxy endpoint for TMDB popular movies/TV shows."""
+    media_type = request.GET.get("type", "movie")
+    page = _parse_page(request.GET.get("page", 1))
+    return await _proxy(lambda: aget_tmdb_popular(media_type, page))
+
+
+@require_GET
+@asgi_only
+async def tmdb_top_rated(request):
+    """Async proxy endpoint for TMDB top-rated movies/TV shows."""
+    media_type = request.GET.get("type", "movie")
+    page = _parse_page(request.GET.get("page", 1))
+    return await _proxy(lambda: aget_tmdb_top_rated(media_type, page))
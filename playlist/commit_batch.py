@@ -0,0 +1,85 @@
+"""
+Work queued while a transaction is open and done once when it commits.
+
+Signal handlers run once per row, so a cascade that deletes a playlist with
+thousands of items would otherwise register thousands of on_commit
+callbacks. A ``CommitBatch`` hands every caller in the same transaction (or
+savepoint) the same data, and registers a single callback that flushes it.
+
+A batch ends when its callback runs or is dropped: Django discards the
+callbacks of a rolled-back transaction or savepoint, and a finalizer on the
+callback notices, so the next write starts a fresh batch instead of adding
+to one that will never be flushed. Rows written in a savepoint get their own
+batch, so rolling the savepoint back drops them too. Outside a transaction
+the data is flushed as soon as the caller is done with it.
+
+In tests, ``captureOnCommitCallbacks(execute=True)`` only runs batches
+started inside its block: data queued there is added to a batch that an
+earlier write in the same test opened, and never flushed.
+"""
+
+import threading
+import weakref
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+class _State:
+    def __init__(self, connection, data):
+        self.connection = connection
+        self.savepoint_ids = tuple(connection.savepoint_ids)
+        self.data = data
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _Flush:
+    """The on_commit callback of one batch; only Django's queue refers to it."""
+
+    def __init__(self, state, flush):
+        self.state = state
+        self.flush = flush
+
+    def __call__(self):
+        self.state.close()
+        self.flush(self.state.data)
+
+
+class CommitBatch:
+    """Collect data per transaction and pass it to ``flush`` on commit.
+
+    ``factory`` builds the empty data of a new batch; use it with::
+
+        with batch.queue() as data:
+            data.append(...)
+    """
+
+    def __init__(self, factory, flush):
+        self.factory = factory
+        self.flush = flush
+        self._local = threading.local()
+
+    @contextmanager
+    def queue(self):
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            data = self.factory()
+            yield data
+            self.flush(data)
+            return
+
+        state = getattr(self._local, "state", None)
+        if (
+            state is None
+            or state.closed
+            or state.connection is not connection
+            or state.savepoint_ids != tuple(connection.savepoint_ids)
+        ):
+            state = self._local.state = _State(connection, self.factory())
+            callback = _Flush(state, self.flush)
+            weakref.finalize(callback, state.close)
+            transaction.on_commit(callback, robust=True)
+        yield state.data
@@ -0,0 +1,61 @@
+"""
+Streaming export of a playlist's items.
+
+``get_playlist_items`` builds the whole item list in memory before
+rendering it, which spikes worker memory for playlists with tens of
+thousands of items. The generators here read the rows with
+``.iterator(chunk_size=EXPORT_CHUNK_SIZE)`` (a server-side cursor on
+Postgres) and yield the JSON a chunk at a time, so memory stays flat
+whatever the playlist size. Items are the same dicts as the playlist
+items endpoint returns (fast_serializers.playlist_item_data).
+
+Two formats:
+
+- ``json``: one array, byte-identical to ``GET /api/playlists/<id>/items/``
+- ``ndjson``: one item per line
+"""
+
+from itertools import islice
+
+from django.conf import settings
+
+from .fast_serializers import PLAYLIST_ITEM_VALUES, playlist_item_data
+from .models import PlaylistItem
+from .renderers import FastJSONRenderer
+
+
+EXPORT_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _chunks(playlist):
+    chunk_size = getattr(settings, "EXPORT_CHUNK_SIZE", 2000)
+    rows = (
+        PlaylistItem.objects.filter(playlist=playlist)
+        .values(*PLAYLIST_ITEM_VALUES)
+        .iterator(chunk_size=chunk_size)
+    )
+    while chunk := list(islice(rows, chunk_size)):
+        yield playlist_item_data(chunk)
+
+
+def stream_json(playlist):
+    render = FastJSONRenderer().render
+    yield b"["
+    separator = b""
+    for items in _chunks(playlist):
+        # Render the chunk as an array and drop its brackets
+        yield separator + render(items)[1:-1]
+        separator = b","
+    yield b"]"
+
+
+def stream_ndjson(playlist):
+    render = FastJSONRenderer().render
+    for items in _chunks(playlist):
+        yield b"".join(render(item) + b"\n" for item in items)
+
+
+STREAMS = {"json": stream_json, "ndjson": stream_ndjson}
@@ -0,0 +1,115 @@
+"""
+Read-only fast path for the large list/detail payloads.
+
+Building PlaylistItemSerializer / FavoriteSerializer / ReviewSerializer
+output (each with a nested MovieSerializer) costs field introspection and a
+``get_status_display`` call per object. The functions here build the same
+dicts, key for key, straight from ``.values()`` rows with the choice labels
+looked up in a precomputed table. Writes still go through the DRF
+serializers.
+
+The output must stay identical to the serializers', so keep the field
+lists here in step with serializers.py; tests.py and
+benchmarks/serializer_fastpath.py compare the two byte for byte.
+"""
+
+from django.utils import timezone
+
+from .models import PlaylistItem
+from .serializers import MovieSerializer
+
+
+MOVIE_FIELDS = tuple(MovieSerializer.Meta.fields)
+_MOVIE_DATETIMES = {"created_at", "updated_at"}
+
+STATUS_LABELS = {value: str(label) for value, label in PlaylistItem.Status.choices}
+
+
+def movie_values(prefix: str = "movie__") -> list:
+    return [prefix + name for name in MOVIE_FIELDS]
+
+
+PLAYLIST_ITEM_VALUES = ["id", "status", "user_rating", "added_at", "updated_at", *movie_values()]
+FAVORITE_VALUES = ["id", "added_at", *movie_values()]
+REVIEW_VALUES = ["id", "user", "user__username", "rating", "review_text", "created_at", "updated_at", *movie_values()]
+
+
+def _datetime_formatter():
+    """Same output as DRF's DateTimeField with the default ISO 8601 format."""
+    tz = timezone.get_current_timezone()
+
+    def format_datetime(value):
+        if value is None:
+            return None
+        value = value.astimezone(tz).isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    return format_datetime
+
+
+def _movie(row, fmt) -> dict:
+    return {
+        name: fmt(row["movie__" + name]) if name in _MOVIE_DATETIMES else row["movie__" + name]
+        for name in MOVIE_FIELDS
+    }
+
+
+def playlist_item_data(rows) -> list:
+    """PlaylistItemSerializer output for rows of ``.values(*PLAYLIST_ITEM_VALUES)``."""
+    fmt = _datetime_formatter()
+    return [
+        {
+            "id": row["id"],
+            "movie": _movie(row, fmt),
+            "status": row["status"],
+            "status_display": STATUS_LABELS.get(row["status"], row["status"]),
+            "user_rating": row["user_rating"],
+            "added_at": fmt(row["added_at"]),
+            "updated_at": fmt(row["updated_at"]),
+        }
+        for row in rows
+    ]
+
+
+def favorite_data(rows) -> list:
+    """FavoriteSerializer output for rows of ``.values(*FAVORITE_VALUES)``."""
+    fmt = _datetime_formatter()
+    return [
+        {"id": row["id"], "movie": _movie(row, fmt), "added_at": fmt(row["added_at"])}
+        for row in rows
+    ]
+
+
+def review_data(rows) -> list:
+    """ReviewSerializer output for rows of ``.values(*REVIEW_VALUES)``."""
+    fmt = _datetime_formatter()
+    return [
+        {
+            "id": row["id"],
+            "movie": _movie(row, fmt),
+            "user": row["user"],
+            "username": row["user__username"],
+            "rating": row["rating"],
+            "review_text": row["review_text"],
+            "created_at": fmt(row["created_at"]),
+            "updated_at": fmt(row["updated_at"]),
+        }
+        for row in rows
+    ]
+
+
+def playlist_data(playlist, item_rows) -> dict:
+    """PlaylistSerializer output for a playlist and its ``.values(*PLAYLIST_ITEM_VALUES)`` item rows."""
+    fmt = _datetime_formatter()
+    return {
+        "id": playlist.id,
+        "user": playlist.user_id,
+        "title": playlist.title,
+        "description": playlist.description,
+        "is_status_playlist": playlist.is_status_playlist,
+        "movie_count": playlist.movie_count,
+        "watched_count": playlist.watched_count,
+        "items": playlist_item_data(item_rows),
+        "created_at": fmt(playlist.created_at),
+        "updated_at": fmt(playlist.updated_at),
+    }
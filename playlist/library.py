@@ -0,0 +1,169 @@
+"""
+Per-user library state for TMDB titles.
+
+Result grids (search, popular, top rated) show whether each title is a
+favorite, which status playlist it sits in and the user's rating. These
+helpers answer that for a whole page of (tmdb_id, media_type) pairs with a
+single query instead of one check per card.
+
+``enrich_tmdb_results`` goes further for the proxy views' ``?enrich=1`` mode
+and attaches a ``library`` block (local movie id, playlists, favorite,
+review) to each result using a fixed four queries per page.
+"""
+
+from django.db.models import Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Favorite, Movie, PlaylistItem, Review
+
+
+def _result_pairs(data: dict) -> list:
+    return [
+        (int(item["id"]), item.get("media_type", "movie"))
+        for item in data.get("results", [])
+        if item.get("id") is not None
+    ]
+
+
+def _empty_state() -> dict:
+    return {"is_favorite": False, "playlist_status": None, "my_rating": None}
+
+
+def get_library_state(user, pairs) -> dict:
+    """Return {(tmdb_id, media_type): state} for the given pairs.
+
+    ``state`` holds ``is_favorite``, ``playlist_status`` (the status of the
+    title in the user's status playlists, or None) and ``my_rating`` (the
+    user's review rating, falling back to a playlist item rating). Pairs
+    the user has never touched get the empty state.
+    """
+    pairs = {(int(tmdb_id), media_type) for tmdb_id, media_type in pairs}
+    states = {pair: _empty_state() for pair in pairs}
+    if not pairs or not user.is_authenticated:
+        return states
+
+    items = PlaylistItem.objects.filter(movie=OuterRef("pk"), playlist__user=user)
+    rows = (
+        Movie.objects.for_tmdb_pairs(pairs)
+        .annotate(
+            is_favorite=Exists(Favorite.objects.filter(movie=OuterRef("pk"), user=user)),
+            playlist_status=Subquery(
+                items.filter(playlist__is_status_playlist=True)
+                .order_by("-updated_at")
+                .values("status")[:1]
+            ),
+            my_rating=Coalesce(
+                Subquery(Review.objects.filter(movie=OuterRef("pk"), user=user).values("rating")[:1]),
+                Subquery(
+                    items.filter(user_rating__isnull=False)
+                    .order_by("-updated_at")
+                    .values("user_rating")[:1]
+                ),
+            ),
+        )
+        .values_list("tmdb_id", "media_type", "is_favorite", "playlist_status", "my_rating")
+    )
+    for tmdb_id, media_type, is_favorite, playlist_status, my_rating in rows:
+        states[(tmdb_id, media_type)] = {
+            "is_favorite": is_favorite,
+            "playlist_status": playlist_status,
+            "my_rating": my_rating,
+        }
+    return states
+
+
+def decorate_tmdb_results(user, data: dict) -> dict:
+    """Return a copy of a TMDB list payload with library state on each result.
+
+    The payload may come straight from the shared response cache, so it is
+    copied rather than modified in place.
+    """
+    if not user.is_authenticated:
+        return data
+
+    states = get_library_state(user, _result_pairs(data))
+
+    decorated = []
+    for item in data.get("results", []):
+        if item.get("id") is None:
+            decorated.append(item)
+            continue
+        state = states[(int(item["id"]), item.get("media_type", "movie"))]
+        decorated.append({**item, **state})
+    return {**data, "results": decorated}
+
+
+def get_library_entries(user, pairs) -> dict:
+    """Return {(tmdb_id, media_type): entry} for pairs that exist as local Movies.
+
+    Each entry has the local ``movie_id`` and, for authenticated users, the
+    ``playlists`` holding the title, ``is_favorite`` and the ``review``.
+    Runs one query for the movies plus one each for playlist items,
+    favorites and reviews, however many pairs are passed.
+    """
+    pairs = {(int(tmdb_id), media_type) for tmdb_id, media_type in pairs}
+    if not pairs:
+        return {}
+
+    entries = {}
+    by_movie = {}
+    for pk, tmdb_id, media_type in Movie.objects.for_tmdb_pairs(pairs).values_list(
+        "pk", "tmdb_id", "media_type"
+    ):
+        entry = {"movie_id": pk, "playlists": [], "is_favorite": False, "review": None}
+        entries[(tmdb_id, media_type)] = by_movie[pk] = entry
+    if not by_movie or not user.is_authenticated:
+        return entries
+
+    items = PlaylistItem.objects.filter(movie_id__in=by_movie, playlist__user=user).order_by("-updated_at")
+    for item in items.values(
+        "movie_id", "playlist_id", "playlist__title", "playlist__is_status_playlist", "status", "user_rating"
+    ):
+        by_movie[item["movie_id"]]["playlists"].append({
+            "id": item["playlist_id"],
+            "title": item["playlist__title"],
+            "is_status_playlist": item["playlist__is_status_playlist"],
+            "status": item["status"],
+            "user_rating": item["user_rating"],
+        })
+
+    for movie_id in Favorite.objects.filter(user=user, movie_id__in=by_movie).values_list("movie_id", flat=True):
+        by_movie[movie_id]["is_favorite"] = True
+
+    for review in Review.objects.filter(user=user, movie_id__in=by_movie).values("id", "movie_id", "rating"):
+        by_movie[review["movie_id"]]["review"] = {"id": review["id"], "rating": review["rating"]}
+
+    return entries
+
+
+def _state_from_entry(entry) -> dict:
+    if entry is None:
+        return _empty_state()
+    # Playlists are newest first, matching get_library_state's choice
+    status = next((p["status"] for p in entry["playlists"] if p["is_status_playlist"]), None)
+    rating = entry["review"]["rating"] if entry["review"] else next(
+        (p["user_rating"] for p in entry["playlists"] if p["user_rating"] is not None), None
+    )
+    return {"is_favorite": entry["is_favorite"], "playlist_status": status, "my_rating": rating}
+
+
+def enrich_tmdb_results(user, data: dict) -> dict:
+    """Return a copy of a TMDB list payload with a ``library`` block per result.
+
+    ``library`` is None for titles not in the local Movie table. For
+    authenticated users the flat fields added by decorate_tmdb_results are
+    included too, derived from the same rows.
+    """
+    entries = get_library_entries(user, _result_pairs(data))
+
+    enriched = []
+    for item in data.get("results", []):
+        if item.get("id") is None:
+            enriched.append(item)
+            continue
+        entry = entries.get((int(item["id"]), item.get("media_type", "movie")))
+        extra = {"library": entry}
+        if user.is_authenticated:
+            extra.update(_state_from_entry(entry))
+        enriched.append({**item, **extra})
+    return {**data, "results": enriched}
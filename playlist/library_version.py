@@ -0,0 +1,112 @@
+"""
+Version tokens for conditional GETs of the playlist endpoints.
+
+Each user's playlists and each playlist's items have a random version token
+in Django's cache. Writes drop the token (after commit) and the next read
+mints a new one, so an ETag built from the tokens changes whenever the
+payload could have. Checking If-None-Match then costs
+a cache read and no database queries or serialization.
+
+Tokens are dropped by the Playlist, PlaylistItem and Movie signals in
+signals.py, by ``PlaylistQuerySet.refresh_counters`` (which every item write
+goes through) and by the code paths that update Movie metadata with
+``QuerySet.update()``. A movie whose metadata changed only drops the tokens
+of the playlists it is in and of their owners (``invalidate_movie_versions``);
+a TMDB refresh that leaves it as it was drops nothing, even though it moves
+the movie's ``updated_at`` (the refresh queue order).
+
+The tokens only work if every worker sees the same cache. With a
+process-local backend (the LocMemCache default) a write would only drop the
+token in the worker that handled it, and the others would keep answering
+304 with stale data, so ETags are then off unless settings.LIBRARY_ETAGS
+forces them on.
+"""
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .commit_batch import CommitBatch
+from .tmdb_cache import cache_is_process_local
+
+
+CACHE_TIMEOUT = 24 * 60 * 60
+
+def _user_key(user_id) -> str:
+    return f"library-version:v1:user:{user_id}"
+
+
+def _playlist_key(playlist_id) -> str:
+    return f"library-version:v1:playlist:{playlist_id}"
+
+
+_stale_keys = CommitBatch(set, lambda keys: cache.delete_many(list(keys)))
+
+
+def invalidate_library_versions(user_ids=(), playlist_ids=()) -> None:
+    """Drop version tokens once the current transaction commits.
+
+    Dropping them earlier would let a concurrent read mint a new token for
+    data that is not committed yet, and keep it after the commit.
+    """
+    keys = {_user_key(user_id) for user_id in user_ids if user_id is not None}
+    keys.update(_playlist_key(playlist_id) for playlist_id in playlist_ids)
+    if keys:
+        # One delete_many per transaction, however many rows a cascade touched
+        with _stale_keys.queue() as stale:
+            stale.update(keys)
+
+
+def invalidate_movie_versions(movie_ids) -> None:
+    """Drop the tokens of the playlists containing these movies, and of their owners."""
+    # models.py imports this module
+    from .models import PlaylistItem
+
+    if not movie_ids:
+        return
+    pairs = (
+        PlaylistItem.objects.filter(movie_id__in=movie_ids)
+        .values_list("playlist_id", "playlist__user_id")
+        .distinct()
+    )
+    playlist_ids, user_ids = set(), set()
+    for playlist_id, user_id in pairs:
+        playlist_ids.add(playlist_id)
+        user_ids.add(user_id)
+    invalidate_library_versions(user_ids=user_ids, playlist_ids=playlist_ids)
+
+
+def _versions(keys) -> list:
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # add() so concurrent readers settle on one token
+            cache.add(key, uuid.uuid4().hex, CACHE_TIMEOUT)
+            found[key] = cache.get(key) or ""
+    return [found[key] for key in keys]
+
+
+def etags_enabled() -> bool:
+    """settings.LIBRARY_ETAGS, or whether the cache is shared when it is None."""
+    enabled = getattr(settings, "LIBRARY_ETAGS", None)
+    return not cache_is_process_local() if enabled is None else enabled
+
+
+def library_etag(request, user_id=None, playlist_id=None):
+    """Strong ETag for a GET of the user's or a playlist's library data.
+
+    Covers the version tokens involved plus the full path and Accept
+    header, so every page and rendering gets its own tag. None when
+    ETags are disabled (see ``etags_enabled``).
+    """
+    if not etags_enabled():
+        return None
+    keys = []
+    if user_id is not None:
+        keys.append(_user_key(user_id))
+    if playlist_id is not None:
+        keys.append(_playlist_key(playlist_id))
+    parts = [*_versions(keys), request.get_full_path(), request.META.get("HTTP_ACCEPT", "")]
+    return '"%s"' % hashlib.md5("\n".join(parts).encode()).hexdigest()
@@ -0,0 +1,34 @@
+"""
+Management command to delete sync tombstones older than the retention window.
+Usage: python manage.py purge_sync_tombstones [--dry-run]
+
+Clients whose watermark is older than SYNC_TOMBSTONE_RETENTION get a full
+sync from /api/sync/, so their tombstones are no longer needed. Run it daily
+from cron.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from playlist.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete sync tombstones older than SYNC_TOMBSTONE_RETENTION'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Count expired tombstones without deleting them')
+
+    def handle(self, *args, **options):
+        retention = getattr(settings, 'SYNC_TOMBSTONE_RETENTION', 90 * 24 * 60 * 60)
+        expired = Tombstone.objects.filter(deleted_at__lt=timezone.now() - timedelta(seconds=retention))
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{expired.count()} expired tombstone(s) (dry run, nothing deleted)'))
+            return
+
+        # No signals or dependents, so this is a single DELETE
+        deleted, _ = expired.delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired tombstone(s)'))
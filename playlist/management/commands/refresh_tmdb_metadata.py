@@ -0,0 +1,119 @@
+"""
+Management command to refresh local Movie rows from TMDB.
+Usage: python manage.py refresh_tmdb_metadata [--older-than HOURS] [--limit N] [--workers N] [--rate N]
+
+Refreshes the least recently updated movies first, so running it from cron
+(e.g. hourly) keeps title, poster, description, release year and trailer
+current without clients falling back to live TMDB detail calls. Requests
+carry the ETag of the previous fetch, so unchanged titles cost a 304.
+Fetched payloads are also stored as the movies' detail snapshots.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from playlist.library_version import invalidate_movie_versions
+from playlist.models import Movie, MovieDetailSnapshot
+from playlist.services import (
+    MOVIE_METADATA_FIELDS,
+    TMDBError,
+    fetch_tmdb_details,
+    movie_fields_from_tmdb,
+)
+from playlist.tmdb_client import RateLimiter
+
+
+REFRESHED_FIELDS = [*MOVIE_METADATA_FIELDS, 'tmdb_etag', 'updated_at']
+
+
+class Command(BaseCommand):
+    help = 'Refresh stale Movie rows from TMDB, oldest first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=float, default=24,
+                            help='Only refresh movies not updated for this many hours (default: 24)')
+        parser.add_argument('--limit', type=int, default=500, help='Maximum movies to refresh per run (default: 500)')
+        parser.add_argument('--workers', type=int, default=getattr(settings, 'TMDB_BATCH_WORKERS', 8),
+                            help='Concurrent TMDB requests (default: TMDB_BATCH_WORKERS)')
+        parser.add_argument('--rate', type=float, default=20,
+                            help='Maximum TMDB requests per second, 0 for no limit (default: 20)')
+        parser.add_argument('--batch-size', type=int, default=100, help='Rows per bulk_update (default: 100)')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['older_than'])
+        movies = list(
+            Movie.objects
+            .filter(tmdb_id__isnull=False, updated_at__lt=cutoff)
+            .order_by('updated_at')[:max(0, options['limit'])]
+        )
+        if not movies:
+            self.stdout.write(self.style.SUCCESS('No stale movies to refresh'))
+            return
+
+        limiter = RateLimiter(options['rate'])
+
+        def refresh(movie):
+            limiter.acquire()
+            try:
+                return movie, fetch_tmdb_details(movie.tmdb_id, movie.media_type, movie.tmdb_etag), None
+            except Exception as e:
+                return movie, None, e
+
+        now = timezone.now()
+        changed = []
+        # Changed movies whose title, poster etc. differ, not just their ETag
+        edited = []
+        snapshots = []
+        unchanged = []
+        missing = []
+        failed = 0
+
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            for movie, result, error in executor.map(refresh, movies):
+                if error is not None:
+                    if isinstance(error, TMDBError):
+                        missing.append(movie.pk)
+                    else:
+                        failed += 1
+                    self.stderr.write(self.style.ERROR(f'Movie {movie.pk} ({movie.media_type} {movie.tmdb_id}): {error}'))
+                    continue
+
+                data, etag = result
+                if data is None:
+                    unchanged.append(movie.pk)
+                    continue
+
+                fields = movie_fields_from_tmdb(data, movie.tmdb_id, movie.media_type)
+                if any(getattr(movie, name) != fields[name] for name in MOVIE_METADATA_FIELDS):
+                    edited.append(movie.pk)
+                for name in MOVIE_METADATA_FIELDS:
+                    setattr(movie, name, fields[name])
+                movie.tmdb_etag = etag
+                # bulk_update does not apply auto_now
+                movie.updated_at = now
+                changed.append(movie)
+                snapshots.append(MovieDetailSnapshot.build(movie, data, now))
+
+        batch_size = max(1, options['batch_size'])
+        Movie.objects.bulk_update(changed, REFRESHED_FIELDS, batch_size=batch_size)
+        # Playlist payloads embed movie titles and posters
+        invalidate_movie_versions(edited)
+        MovieDetailSnapshot.objects.bulk_create(
+            snapshots,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['movie'],
+            update_fields=['payload', 'fetched_at', 'changed_at'],
+        )
+        MovieDetailSnapshot.objects.filter(movie_id__in=unchanged).update(fetched_at=now)
+        # Not modified or gone from TMDB: only push them to the back of the queue.
+        # Transient failures keep their place and are retried next run.
+        Movie.objects.filter(pk__in=unchanged + missing).update(updated_at=now)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Refreshed {len(changed)} movie(s), {len(unchanged)} unchanged, '
+            f'{len(missing)} not found, {failed} failure(s)'
+        ))
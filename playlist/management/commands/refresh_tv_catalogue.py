@@ -0,0 +1,79 @@
+"""
+Management command to refresh stale seasons in the local TV catalogue.
+Usage: python manage.py refresh_tv_catalogue [--limit N] [--workers N] [--rate N]
+
+Refetches the seasons that were fetched longest ago (older than
+TV_CATALOGUE_MAX_AGE) so newly aired episodes reach the catalogue, then
+checks those series for new seasons. Run it from cron alongside
+refresh_tmdb_metadata.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from playlist.models import Season
+from playlist.services import TMDBError, get_tmdb_tv_season_details
+from playlist.tmdb_client import RateLimiter
+from playlist.tv_catalogue import ensure_series_catalogue, store_season
+
+
+class Command(BaseCommand):
+    help = 'Refetch stale TV seasons and episodes from TMDB, oldest first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=200, help='Maximum seasons to refresh per run (default: 200)')
+        parser.add_argument('--workers', type=int, default=getattr(settings, 'TMDB_BATCH_WORKERS', 8),
+                            help='Concurrent TMDB requests (default: TMDB_BATCH_WORKERS)')
+        parser.add_argument('--rate', type=float, default=20,
+                            help='Maximum TMDB requests per second, 0 for no limit (default: 20)')
+
+    def handle(self, *args, **options):
+        max_age = getattr(settings, 'TV_CATALOGUE_MAX_AGE', 7 * 24 * 60 * 60)
+        seasons = list(
+            Season.objects
+            .filter(fetched_at__lt=timezone.now() - timedelta(seconds=max_age))
+            .select_related('series')
+            .order_by('fetched_at')[:max(0, options['limit'])]
+        )
+        if not seasons:
+            self.stdout.write(self.style.SUCCESS('No stale seasons to refresh'))
+            return
+
+        limiter = RateLimiter(options['rate'])
+
+        def fetch(season):
+            limiter.acquire()
+            try:
+                data = get_tmdb_tv_season_details(season.series.tmdb_id, season.season_number, refresh=True)
+                return season, data, None
+            except Exception as e:
+                return season, None, e
+
+        refreshed = 0
+        failed = 0
+        now = timezone.now()
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            # Fetch concurrently, write on this thread
+            for season, data, error in executor.map(fetch, seasons):
+                label = f'{season.series.title} S{season.season_number}'
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(self.style.ERROR(f'{label}: {error}'))
+                    if isinstance(error, TMDBError):
+                        # Gone from TMDB: retry after the normal interval, not every run
+                        Season.objects.filter(pk=season.pk).update(fetched_at=now)
+                    continue
+                store_season(season.series, {**data, 'season_number': season.season_number}, now)
+                refreshed += 1
+
+        # Pick up seasons announced since the series was first catalogued
+        for series in {season.series_id: season.series for season in seasons}.values():
+            try:
+                ensure_series_catalogue(series, discover=True)
+            except Exception as e:
+                self.stderr.write(self.style.ERROR(f'{series.title}: {e}'))
+
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {refreshed} season(s), {failed} failure(s)'))
@@ -0,0 +1,49 @@
+"""
+Management command to recompute the stored movie/watched counters on playlists.
+Usage: python manage.py repair_playlist_counters [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Q
+from playlist.models import Playlist, PlaylistItem
+
+
+class Command(BaseCommand):
+    help = 'Find playlists whose stored movie/watched counters drifted from their items and fix them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+
+    def handle(self, *args, **options):
+        drifted = (
+            Playlist.objects
+            .annotate(
+                actual_movie_count=Count('items'),
+                actual_watched_count=Count('items', filter=Q(items__status=PlaylistItem.Status.WATCHED)),
+            )
+            .exclude(
+                movie_count=F('actual_movie_count'),
+                watched_count=F('actual_watched_count'),
+            )
+            .order_by('pk')
+        )
+
+        ids = []
+        for playlist in drifted:
+            ids.append(playlist.pk)
+            self.stdout.write(
+                f'Playlist {playlist.pk} "{playlist.title}": '
+                f'movies {playlist.movie_count} -> {playlist.actual_movie_count}, '
+                f'watched {playlist.watched_count} -> {playlist.actual_watched_count}'
+            )
+
+        if not ids:
+            self.stdout.write(self.style.SUCCESS('All playlist counters are correct'))
+            return
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'\n{len(ids)} playlist(s) drifted (dry run, nothing changed)'))
+            return
+
+        Playlist.objects.filter(pk__in=ids).refresh_counters()
+        self.stdout.write(self.style.SUCCESS(f'\nRepaired counters on {len(ids)} playlist(s)'))
@@ -0,0 +1,45 @@
+"""
+Management command to print TMDB cache hit/miss counters.
+Usage: python manage.py tmdb_cache_stats [--reset]
+"""
+
+from django.core.management.base import BaseCommand
+from playlist.tmdb_cache import get_cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss/coalesced/stale counters for the TMDB response cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset counters after printing')
+
+    def handle(self, *args, **options):
+        total_hits = 0
+        total_misses = 0
+        total_coalesced = 0
+        total_stale = 0
+
+        for endpoint, counts in get_cache_stats().items():
+            hits, misses = counts['hits'], counts['misses']
+            coalesced, stale = counts['coalesced'], counts['stale']
+            total_hits += hits
+            total_misses += misses
+            total_coalesced += coalesced
+            total_stale += stale
+            lookups = hits + stale + misses
+            ratio = f'{(hits + stale) / lookups:.1%}' if lookups else 'n/a'
+            self.stdout.write(
+                f'{endpoint:<15} hits={hits:<8} stale={stale:<8} misses={misses:<8} '
+                f'coalesced={coalesced:<8} hit ratio={ratio}'
+            )
+
+        lookups = total_hits + total_stale + total_misses
+        ratio = f'{(total_hits + total_stale) / lookups:.1%}' if lookups else 'n/a'
+        self.stdout.write(self.style.SUCCESS(
+            f'\nTotal: hits={total_hits} stale={total_stale} misses={total_misses} '
+            f'coalesced={total_coalesced} hit ratio={ratio}'
+        ))
+
+        if options['reset']:
+            reset_cache_stats()
+            self.stdout.write('Counters reset')
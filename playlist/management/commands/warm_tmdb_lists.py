@@ -0,0 +1,49 @@
+"""
+Management command to pre-warm the cached TMDB popular and top-rated pages.
+Usage: python manage.py warm_tmdb_lists [--pages N]
+
+Run it after deploys and on a schedule shorter than the popular/top-rated
+TTL so the home screen is always served from cache.
+
+The pages are written to the default cache, so this only helps when that
+cache is shared with the web workers (Redis, Memcached, database or file
+cache; see CACHE_BACKEND in settings.py). With the default LocMemCache the
+command would warm a cache that dies with its own process, so it refuses
+to run.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from playlist.services import get_tmdb_popular, get_tmdb_top_rated
+from playlist.tmdb_cache import cache_is_process_local
+
+
+class Command(BaseCommand):
+    help = 'Fetch and cache the first N popular/top-rated pages for movies and TV shows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=3, help='Number of pages to warm per list (default: 3)')
+
+    def handle(self, *args, **options):
+        if cache_is_process_local():
+            raise CommandError(
+                'The default cache is process-local (LocMemCache/DummyCache); warmed pages would never '
+                'reach the web workers. Set CACHE_BACKEND/CACHE_LOCATION to a shared cache first.'
+            )
+
+        pages = max(1, options['pages'])
+        warmed = 0
+        failed = 0
+
+        for fetcher in (get_tmdb_popular, get_tmdb_top_rated):
+            for media_type in ('movie', 'tv'):
+                for page in range(1, pages + 1):
+                    try:
+                        fetcher(media_type, page, refresh=True)
+                        warmed += 1
+                    except Exception as e:
+                        failed += 1
+                        self.stderr.write(
+                            self.style.ERROR(f'{fetcher.__name__}({media_type}, page {page}) failed: {e}')
+                        )
+
+        self.stdout.write(self.style.SUCCESS(f'Warmed {warmed} page(s), {failed} failure(s)'))
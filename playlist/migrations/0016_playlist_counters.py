@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:54
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_playlist_counters(apps, schema_editor):
+    """Populate the new counters from existing playlist items."""
+    Playlist = apps.get_model('playlist', 'Playlist')
+    PlaylistItem = apps.get_model('playlist', 'PlaylistItem')
+    items = PlaylistItem.objects.filter(playlist=OuterRef('pk')).order_by().values('playlist')
+    total = items.annotate(count=Count('pk')).values('count')
+    watched = items.filter(status='watched').annotate(count=Count('pk')).values('count')
+    Playlist.objects.update(
+        movie_count=Coalesce(Subquery(total), 0),
+        watched_count=Coalesce(Subquery(watched), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playlist', '0015_alter_episodeprogress_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playlist',
+            name='movie_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='playlist',
+            name='watched_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_playlist_counters, migrations.RunPython.noop),
+    ]
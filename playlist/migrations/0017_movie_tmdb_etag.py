@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playlist', '0016_playlist_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='tmdb_etag',
+            field=models.CharField(blank=True, default='', editable=False, max_length=128),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playlist', '0017_movie_tmdb_etag'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieDetailSnapshot',
+            fields=[
+                ('movie', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='detail_snapshot', serialize=False, to='playlist.movie')),
+                ('payload', models.BinaryField()),
+                ('fetched_at', models.DateTimeField()),
+                ('changed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playlist', '0018_movie_detail_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Season',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season_number', models.PositiveIntegerField()),
+                ('name', models.CharField(blank=True, default='', max_length=255)),
+                ('overview', models.TextField(blank=True, default='')),
+                ('air_date', models.DateField(blank=True, null=True)),
+                ('poster_url', models.URLField(blank=True, max_length=1024, null=True)),
+                ('episode_count', models.PositiveIntegerField(default=0)),
+                ('fetched_at', models.DateTimeField()),
+                ('series', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seasons', to='playlist.movie')),
+            ],
+            options={
+                'ordering': ['series', 'season_number'],
+                'unique_together': {('series', 'season_number')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Episode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('episode_number', models.PositiveIntegerField()),
+                ('name', models.CharField(blank=True, default='', max_length=512)),
+                ('overview', models.TextField(blank=True, default='')),
+                ('air_date', models.DateField(blank=True, null=True)),
+                ('runtime', models.PositiveIntegerField(blank=True, null=True)),
+                ('still_url', models.URLField(blank=True, max_length=1024, null=True)),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='episodes', to='playlist.season')),
+            ],
+            options={
+                'ordering': ['season', 'episode_number'],
+                'unique_together': {('season', 'episode_number')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playlist', '0019_season_episode'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='episodeprogress',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='episode_progress', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='episodeprogress',
+            index=models.Index(fields=['user', '-updated_at'], name='episodeprog_user_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playlist', '0020_episodeprogress_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['user', '-added_at', '-id'], name='favorite_user_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playlistitem',
+            index=models.Index(fields=['-added_at', '-id'], name='playlistitem_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='review_user_created_idx'),
+        ),
+    ]
@@ -1,14 +1,35 @@
+import hashlib
+import json
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
-from django.db.models import Q
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from .library_version import invalidate_library_versions
+
 
 # ...existing code...
 
 
 
 
+class MovieQuerySet(models.QuerySet):
+    def for_tmdb_pairs(self, pairs):
+        """Filter to the movies matching any of the (tmdb_id, media_type) pairs."""
+        match = Q()
+        for media_type in {media_type for _, media_type in pairs}:
+            ids = [tmdb_id for tmdb_id, pair_type in pairs if pair_type == media_type]
+            match |= Q(media_type=media_type, tmdb_id__in=ids)
+        if not match:
+            return self.none()
+        return self.filter(match)
+
+
 class Movie(models.Model):
     """Movie model - stores movie info (can be manually added or fetched from TMDB)."""
 
@@ -28,9 +49,13 @@ class Movie(models.Model):
     # TMDB integration fields
     tmdb_id = models.IntegerField(blank=True, null=True, db_index=True)
     youtube_id = models.CharField(max_length=64, blank=True, null=True)
+    # ETag of the last TMDB details response, for conditional refreshes
+    tmdb_etag = models.CharField(max_length=128, blank=True, default="", editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = MovieQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at", "title"]
         constraints = [
@@ -45,6 +70,71 @@ class Movie(models.Model):
         return f"{self.title} ({self.release_year or 'N/A'})"
 
 
+class MovieDetailSnapshot(models.Model):
+    """zlib-compressed copy of a Movie's TMDB details payload.
+
+    Served by the local detail endpoints instead of proxying to TMDB.
+    ``fetched_at`` is when the payload was last confirmed with TMDB and
+    ``changed_at`` when its content last changed (sent as Last-Modified).
+    The payload always matches ``movie.tmdb_etag``.
+    """
+
+    movie = models.OneToOneField(
+        Movie,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="detail_snapshot",
+    )
+    payload = models.BinaryField()
+    fetched_at = models.DateTimeField()
+    changed_at = models.DateTimeField()
+
+    @classmethod
+    def build(cls, movie, data: dict, now=None) -> "MovieDetailSnapshot":
+        now = now or timezone.now()
+        raw = json.dumps(data, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        return cls(movie=movie, payload=zlib.compress(raw), fetched_at=now, changed_at=now)
+
+    @property
+    def data(self) -> dict:
+        return json.loads(zlib.decompress(bytes(self.payload)))
+
+    @property
+    def etag(self) -> str:
+        return '"%s"' % hashlib.md5(bytes(self.payload)).hexdigest()
+
+    def is_stale(self) -> bool:
+        max_age = getattr(settings, "TMDB_SNAPSHOT_MAX_AGE", 24 * 60 * 60)
+        return self.fetched_at < timezone.now() - timedelta(seconds=max_age)
+
+    def __str__(self) -> str:
+        return f"Snapshot of {self.movie_id}"
+
+
+class PlaylistQuerySet(models.QuerySet):
+    def refresh_counters(self) -> int:
+        """Recompute the stored movie/watched counts of these playlists in one UPDATE.
+
+        Call this inside the same transaction as any write that adds, removes
+        or changes the status of PlaylistItems.
+        """
+        items = PlaylistItem.objects.filter(playlist=OuterRef("pk")).order_by().values("playlist")
+        total = items.annotate(count=Count("pk")).values("count")
+        watched = items.filter(status=PlaylistItem.Status.WATCHED).annotate(count=Count("pk")).values("count")
+        # Item writes (bulk ones included) all end here, so conditional GETs
+        # of these playlists and their owners' lists are invalidated here too
+        owners = list(self.values_list("pk", "user_id"))
+        invalidate_library_versions(
+            user_ids=[user_id for _, user_id in owners], playlist_ids=[pk for pk, _ in owners]
+        )
+        return self.update(
+            movie_count=Coalesce(Subquery(total), 0),
+            watched_count=Coalesce(Subquery(watched), 0),
+            # Counters are part of the playlist /api/sync/ sends
+            updated_at=timezone.now(),
+        )
+
+
 class Playlist(models.Model):
     """Playlist/Watchlist - core CRUD entity for the mobile app."""
 
@@ -65,11 +155,21 @@ class Playlist(models.Model):
         related_name="playlists",
         blank=True
     )
+    # Denormalized counters, kept in sync by PlaylistQuerySet.refresh_counters()
+    movie_count = models.PositiveIntegerField(default=0, editable=False)
+    watched_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PlaylistQuerySet.as_manager()
+
+    COUNTER_FIELDS = ("movie_count", "watched_count")
+
     class Meta:
         ordering = ["-updated_at"]
+        indexes = [
+            models.Index(fields=["user", "-updated_at"], name="playlist_user_updated_idx"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['user', 'title'],
@@ -80,13 +180,16 @@ class Playlist(models.Model):
     def __str__(self) -> str:
         return self.title
 
-    @property
-    def movie_count(self) -> int:
-        return self.items.count()
-
-    @property
-    def watched_count(self) -> int:
-        return self.items.filter(status=PlaylistItem.Status.WATCHED).count()
+    def save(self, *args, **kwargs):
+        # Counters are only written by refresh_counters(); never overwrite them
+        # with whatever (possibly stale) values this instance was loaded with.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def get_progress(self):
         """Returns (watched, total) tuple for progress tracking."""
@@ -130,11 +233,26 @@ class PlaylistItem(models.Model):
     class Meta:
         unique_together = ("playlist", "movie")
         ordering = ["-added_at"]
+        indexes = [
+            # Keyset pagination of /playlist-items/ (see pagination.py)
+            models.Index(fields=["-added_at", "-id"], name="playlistitem_added_idx"),
+            # Changed items per playlist for /api/sync/
+            models.Index(fields=["playlist", "updated_at"], name="playlistitem_updated_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.movie.title} in {self.playlist.title} ({self.get_status_display()})"
 
 
+# Title and description of the automatic playlist that mirrors each watch status
+STATUS_PLAYLISTS = {
+    PlaylistItem.Status.WATCHED: ("Watched", "Movies and series I have watched"),
+    PlaylistItem.Status.WATCHING: ("Watching", "Movies and series I am currently watching"),
+    PlaylistItem.Status.TO_WATCH: ("To Watch", "Movies and series I want to watch"),
+    PlaylistItem.Status.DID_NOT_FINISH: ("Did Not Finish", "Movies and series I stopped watching"),
+}
+
+
 class Favorite(models.Model):
     """User's favorite movies and TV shows."""
     
@@ -153,6 +271,9 @@ class Favorite(models.Model):
     class Meta:
         unique_together = ("user", "movie")
         ordering = ["-added_at"]
+        indexes = [
+            models.Index(fields=["user", "-added_at", "-id"], name="favorite_user_added_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user.username} - {self.movie.title}"
@@ -181,13 +302,59 @@ class Review(models.Model):
     class Meta:
         unique_together = ("user", "movie")
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-id"], name="review_user_created_idx"),
+            models.Index(fields=["user", "updated_at"], name="review_user_updated_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user.username} - {self.movie.title} ({self.rating}/5)"
 
 
+class Season(models.Model):
+    """A TV season from TMDB, stored so episode screens don't need a live fetch."""
+
+    series = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="seasons")
+    season_number = models.PositiveIntegerField()
+    name = models.CharField(max_length=255, blank=True, default="")
+    overview = models.TextField(blank=True, default="")
+    air_date = models.DateField(blank=True, null=True)
+    poster_url = models.URLField(max_length=1024, blank=True, null=True)
+    episode_count = models.PositiveIntegerField(default=0)
+    # When the season was last fetched from TMDB
+    fetched_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["series", "season_number"]
+        unique_together = ("series", "season_number")
+
+    def __str__(self) -> str:
+        return f"{self.series.title} S{self.season_number}"
+
+
+class Episode(models.Model):
+    """A TV episode from TMDB; joined with EpisodeProgress by series/season/episode number."""
+
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name="episodes")
+    episode_number = models.PositiveIntegerField()
+    name = models.CharField(max_length=512, blank=True, default="")
+    overview = models.TextField(blank=True, default="")
+    air_date = models.DateField(blank=True, null=True)
+    runtime = models.PositiveIntegerField(blank=True, null=True)
+    still_url = models.URLField(max_length=1024, blank=True, null=True)
+
+    class Meta:
+        ordering = ["season", "episode_number"]
+        unique_together = ("season", "episode_number")
+
+    def __str__(self) -> str:
+        return f"{self.season} E{self.episode_number}"
+
+
 class EpisodeProgress(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='episode_progress')
+    # No separate index on user: the unique (user, series, season, episode)
+    # index leads with it and also serves the default ordering.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='episode_progress', db_index=False)
     series = models.ForeignKey('Movie', on_delete=models.CASCADE, related_name='episode_progress')
     season = models.PositiveIntegerField()
     episode = models.PositiveIntegerField()
@@ -207,7 +374,29 @@ class EpisodeProgress(models.Model):
     class Meta:
         ordering = ['series', 'season', 'episode']
         unique_together = ('user', 'series', 'season', 'episode')
+        indexes = [
+            # Latest activity per user ("continue watching")
+            models.Index(fields=['user', '-updated_at'], name='episodeprog_user_recent_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.series.title} S{self.season}E{self.episode}"
 
+
+class Tombstone(models.Model):
+    """Record of a deleted row, so /api/sync/ can tell clients to drop it."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+", db_index=False)
+    model = models.CharField(max_length=32)
+    object_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "deleted_at"], name="tombstone_user_deleted_idx"),
+            # Purging by age
+            models.Index(fields=["deleted_at"], name="tombstone_deleted_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.model} {self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,173 @@
+"""
+Keyset (cursor) pagination for the per-user list endpoints.
+
+PageNumberPagination turns deep pages into ``OFFSET n`` scans and runs a
+``COUNT(*)`` on every request. KeysetPagination instead continues from the
+last row of the previous page (``WHERE (added_at, id) < (..)``), which an
+index on the ordering columns answers directly at any depth.
+
+The ordering is the queryset's own (or the model's Meta.ordering) with the
+primary key appended as a tie-breaker, so each view keeps its natural order.
+Cursors are opaque base64 tokens holding the boundary row's ordering values.
+Passing ``?page=`` switches a request back to page-number pagination for
+older clients.
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over the queryset's ordering; ``?page=`` opts out."""
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+    # Opt-in for clients that still send ?page=
+    page_number_class = PageNumberPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.fallback = None
+        self.ordering = self.get_ordering(queryset)
+        if self.ordering is None or self.page_number_class.page_query_param in request.query_params:
+            self.fallback = self.page_number_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = [(name, not descending) if reverse else (name, descending) for name, descending in self.ordering]
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+        rows = list(queryset.order_by(*(f"-{name}" if descending else name for name, descending in ordering))[
+            :self.page_size + 1
+        ])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Coming from a cursor means there is at least that row on the other side
+        self.has_next = (has_more and not reverse) or (reverse and position is not None)
+        self.has_previous = (has_more and reverse) or (not reverse and position is not None)
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset):
+        """[(attname, descending), ...] ending in the primary key, or None.
+
+        Only plain local fields can be used as keys; anything else (related
+        lookups, expressions) falls back to page-number pagination.
+        """
+        model = queryset.model
+        names = list(queryset.query.order_by) or list(model._meta.ordering)
+        ordering = []
+        for name in names:
+            if not isinstance(name, str) or "__" in name or name == "?":
+                return None
+            descending = name.startswith("-")
+            name = name.lstrip("-")
+            try:
+                field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if getattr(field, "null", False):
+                return None
+            ordering.append((field.attname, descending))
+        pk = model._meta.pk.attname
+        if pk not in (name for name, _ in ordering):
+            ordering.append((pk, ordering[-1][1] if ordering else False))
+        return ordering
+
+    @staticmethod
+    def after(ordering, position) -> Q:
+        """Rows strictly after ``position`` in ``ordering`` (a row-value comparison).
+
+        The OR chain alone is not sargable: SQLite and Postgres then scan and
+        sort instead of seeking the ordering index. The redundant range bound
+        on the leading column lets them start the index scan at the cursor.
+        """
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(ordering, position):
+            condition |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{name: value})
+        (first, descending), value = ordering[0], position[0]
+        return Q(**{f"{first}__{'lte' if descending else 'gte'}": value}) & condition
+
+    def encode_cursor(self, row, reverse: bool) -> str:
+        # Rows may be model instances or .values() dicts
+        values = [row[name] if isinstance(row, dict) else getattr(row, name) for name, _ in self.ordering]
+        payload = json.dumps({"v": [self._serialize(value) for value in values], "r": int(reverse)})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+            values = payload["v"]
+            if len(values) != len(self.ordering):
+                raise ValueError
+            fields = {field.attname: field for field in model._meta.concrete_fields}
+            position = [fields[name].to_python(value) for (name, _), value in zip(self.ordering, values)]
+            return position, bool(payload.get("r"))
+        except (binascii.Error, ValidationError, ValueError, TypeError, KeyError) as e:
+            raise NotFound(self.invalid_cursor_message) from e
+
+    @staticmethod
+    def _serialize(value):
+        return value.isoformat() if hasattr(value, "isoformat") else value
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.page[-1], False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.page[0], True))
@@ -0,0 +1,43 @@
+"""
+JSON renderer backed by orjson when it is installed.
+
+Produces JSON equivalent to DRF's JSONRenderer with the default settings
+(compact, UTF-8, U+2028/U+2029 escaped), several times faster on large
+list payloads. Values orjson does not handle the same way as DRF's encoder
+(datetimes, decimals, lazy strings, ...) are passed to that encoder, and
+anything orjson rejects outright falls back to JSONRenderer. Indented output
+(e.g. ``Accept: application/json; indent=4``) always uses JSONRenderer.
+
+The bytes are the same for strings, integers, booleans and None, which is
+all the fast_serializers payloads contain. Floats may be spelled differently
+(orjson writes 1e-05 as 0.00001 and 1e+16 as 1e16), and NaN and infinities
+render as null where the strict DRF renderer raises ValueError.
+"""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if not (self.compact and self.ensure_ascii is False and self.strict):
+            # Non-default REST_FRAMEWORK JSON settings
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            rendered = orjson.dumps(
+                data,
+                default=encoders.JSONEncoder().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            # orjson.JSONEncodeError (e.g. integers over 64 bits)
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer escapes these so the output is also valid JavaScript
+        return rendered.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -78,6 +78,14 @@ class PlaylistItemSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "added_at", "updated_at"]
 
+class SyncPlaylistItemSerializer(PlaylistItemSerializer):
+    """Playlist item for /api/sync/, which also needs the owning playlist."""
+
+    playlist = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta(PlaylistItemSerializer.Meta):
+        fields = [*PlaylistItemSerializer.Meta.fields, "playlist"]
+
 class PlaylistSerializer(serializers.ModelSerializer):
     """Serializer for Playlist - the main CRUD entity for the mobile app."""
 
@@ -137,6 +145,81 @@ class UpdatePlaylistItemStatusSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=PlaylistItem.Status.choices)
 
 
+class BulkPlaylistOperationSerializer(serializers.Serializer):
+    """A single operation in a bulk playlist request."""
+
+    OPERATIONS = ("add", "remove", "set_status", "set_rating")
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    movie_id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=PlaylistItem.Status.choices, required=False)
+    rating = serializers.IntegerField(min_value=1, max_value=5, required=False)
+
+    def validate(self, attrs):
+        if attrs["op"] == "set_status" and "status" not in attrs:
+            raise serializers.ValidationError({"status": "This field is required for set_status."})
+        if attrs["op"] == "set_rating" and "rating" not in attrs:
+            raise serializers.ValidationError({"rating": "This field is required for set_rating."})
+        return attrs
+
+
+class BulkPlaylistOperationsSerializer(serializers.Serializer):
+    """Envelope for bulk playlist operations; each entry is validated on its own."""
+
+    MAX_OPERATIONS = 1000
+
+    operations = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=MAX_OPERATIONS,
+    )
+
+
+class LibraryLookupSerializer(serializers.Serializer):
+    """A (tmdb_id, media_type) pair to look up in the user's library."""
+
+    tmdb_id = serializers.IntegerField()
+    media_type = serializers.ChoiceField(choices=Movie.MediaType.choices, default=Movie.MediaType.MOVIE)
+
+
+class BulkFavoriteCheckSerializer(serializers.Serializer):
+    """Titles to check in one request, e.g. every card on a result grid."""
+
+    MAX_ITEMS = 100
+
+    items = LibraryLookupSerializer(many=True, allow_empty=False, max_length=MAX_ITEMS)
+
+
+class BatchMovieLookupSerializer(serializers.Serializer):
+    """TMDB titles to resolve to local movies in one request (e.g. a list import)."""
+
+    MAX_ITEMS = 500
+
+    items = LibraryLookupSerializer(many=True, allow_empty=False, max_length=MAX_ITEMS)
+
+
+class BulkEpisodeProgressSerializer(serializers.Serializer):
+    """A range of episodes in one season to mark with the same status."""
+
+    MAX_EPISODES = 500
+
+    series = serializers.PrimaryKeyRelatedField(queryset=Movie.objects.filter(media_type=Movie.MediaType.TV))
+    season = serializers.IntegerField(min_value=0)
+    first_episode = serializers.IntegerField(min_value=1, default=1)
+    last_episode = serializers.IntegerField(min_value=1)
+    status = serializers.ChoiceField(choices=EpisodeProgress._meta.get_field("status").choices)
+
+    def validate(self, attrs):
+        count = attrs["last_episode"] - attrs["first_episode"] + 1
+        if count < 1:
+            raise serializers.ValidationError({"last_episode": "Must not be before first_episode."})
+        if count > self.MAX_EPISODES:
+            raise serializers.ValidationError(
+                {"last_episode": f"At most {self.MAX_EPISODES} episodes can be marked at once."}
+            )
+        return attrs
+
+
 class FavoriteSerializer(serializers.ModelSerializer):
     """Serializer for Favorite model with nested movie details."""
     
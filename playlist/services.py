@@ -1,11 +1,20 @@
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple, List
 
-import requests
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
 
-from .models import Movie
+from .library_version import invalidate_movie_versions
+from .models import Movie, MovieDetailSnapshot
+from .tmdb_cache import acached_tmdb_call, cached_tmdb_call, make_cache_key, run_exclusive
+from .tmdb_client import get_async_tmdb_client, get_tmdb_client
+
+
+logger = logging.getLogger(__name__)
 
 
 class TMDBError(Exception):
@@ -25,32 +34,51 @@ def _get_tmdb_config():
     return api_key, base.rstrip("/"), image_base.rstrip("/")
 
 
-def search_tmdb(query: str, page: int = 1, media_type: str = "multi") -> dict:
-    """Search TMDB for movies and/or TV shows.
+def _tmdb_get(path: str, params: Optional[dict] = None, headers: Optional[dict] = None):
+    """GET a TMDB API path through the shared pooled client."""
+    api_key, base, _ = _get_tmdb_config()
+    return get_tmdb_client(api_key, base).get(path, params, headers=headers)
 
-    media_type options:
-      - "movie": search movies only
-      - "tv": search TV series only
-      - "multi" (default): search both and filter out people results
-    """
+
+async def _atmdb_get(path: str, params: Optional[dict] = None):
+    """GET a TMDB API path through the event loop's async client."""
     api_key, base, _ = _get_tmdb_config()
+    return await get_async_tmdb_client(api_key, base).get(path, params)
+
+
+def _check_response(resp, not_found_message: Optional[str] = None) -> dict:
+    """Raise for error statuses and return the decoded JSON body.
+
+    Works for both requests and httpx responses.
+    """
+    if not_found_message and resp.status_code == 404:
+        raise TMDBError(not_found_message)
+    resp.raise_for_status()
+    return resp.json()
+
 
+def _normalize_search_type(media_type: str) -> str:
     normalized_type = (media_type or "multi").lower()
     if normalized_type not in {"movie", "tv", "multi"}:
         normalized_type = "multi"
+    return normalized_type
 
-    endpoint = {
-        "movie": "search/movie",
-        "tv": "search/tv",
-        "multi": "search/multi",
-    }[normalized_type]
 
-    url = f"{base}/{endpoint}"
-    params = {"api_key": api_key, "query": query, "page": page}
-    resp = requests.get(url, params=params, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
+def _normalize_list_type(media_type: str) -> str:
+    normalized_type = (media_type or "movie").lower()
+    if normalized_type not in {"movie", "tv"}:
+        normalized_type = "movie"
+    return normalized_type
+
+
+SEARCH_ENDPOINTS = {
+    "movie": "search/movie",
+    "tv": "search/tv",
+    "multi": "search/multi",
+}
+
 
+def _process_search_results(data: dict, normalized_type: str) -> dict:
     results = data.get("results", [])
     if normalized_type == "multi":
         results = [
@@ -67,102 +95,205 @@ def search_tmdb(query: str, page: int = 1, media_type: str = "multi") -> dict:
     return data
 
 
+def _process_list_results(data: dict, normalized_type: str) -> dict:
+    for item in data.get("results", []):
+        item.setdefault("media_type", normalized_type)
+    data["selected_media_type"] = normalized_type
+    return data
+
+
+def search_tmdb(query: str, page: int = 1, media_type: str = "multi") -> dict:
+    """Search TMDB for movies and/or TV shows.
+
+    media_type options:
+      - "movie": search movies only
+      - "tv": search TV series only
+      - "multi" (default): search both and filter out people results
+    """
+    normalized_type = _normalize_search_type(media_type)
+
+    def fetch():
+        resp = _tmdb_get(SEARCH_ENDPOINTS[normalized_type], {"query": query, "page": page})
+        return _process_search_results(_check_response(resp), normalized_type)
+
+    return cached_tmdb_call(
+        "search",
+        {"query": query, "page": page, "media_type": normalized_type},
+        fetch,
+    )
+
+
 def get_tmdb_movie_details(tmdb_id: int) -> dict:
     """Fetch TMDB movie details (including videos)."""
-    api_key, base, _ = _get_tmdb_config()
-    url = f"{base}/movie/{tmdb_id}"
-    params = {"api_key": api_key, "append_to_response": "videos"}
-    resp = requests.get(url, params=params, timeout=10)
-    if resp.status_code == 404:
-        raise TMDBError(f"Movie {tmdb_id} not found")
-    resp.raise_for_status()
-    return resp.json()
+
+    def fetch():
+        resp = _tmdb_get(f"movie/{tmdb_id}", {"append_to_response": "videos"})
+        return _check_response(resp, f"Movie {tmdb_id} not found")
+
+    return cached_tmdb_call("movie_details", {"tmdb_id": tmdb_id}, fetch)
 
 
 def get_tmdb_tv_details(tmdb_id: int) -> dict:
     """Fetch TMDB TV show details (including videos)."""
-    api_key, base, _ = _get_tmdb_config()
-    url = f"{base}/tv/{tmdb_id}"
-    params = {"api_key": api_key, "append_to_response": "videos"}
-    resp = requests.get(url, params=params, timeout=10)
-    if resp.status_code == 404:
-        raise TMDBError(f"TV show {tmdb_id} not found")
-    resp.raise_for_status()
-    return resp.json()
 
+    def fetch():
+        resp = _tmdb_get(f"tv/{tmdb_id}", {"append_to_response": "videos"})
+        return _check_response(resp, f"TV show {tmdb_id} not found")
 
-def get_tmdb_tv_season_details(tmdb_id: int, season_number: int) -> dict:
-    """Fetch TMDB TV season details including episodes."""
-    api_key, base, _ = _get_tmdb_config()
-    url = f"{base}/tv/{tmdb_id}/season/{season_number}"
-    params = {"api_key": api_key}
-    resp = requests.get(url, params=params, timeout=10)
-    if resp.status_code == 404:
-        raise TMDBError(f"Season {season_number} for TV show {tmdb_id} not found")
-    resp.raise_for_status()
-    return resp.json()
+    return cached_tmdb_call("tv_details", {"tmdb_id": tmdb_id}, fetch)
 
 
-def get_tmdb_popular(media_type: str = "movie", page: int = 1) -> dict:
-    """Fetch popular movies or TV shows from TMDB."""
-    api_key, base, _ = _get_tmdb_config()
-    normalized_type = (media_type or "movie").lower()
-    if normalized_type not in {"movie", "tv"}:
-        normalized_type = "movie"
+def get_tmdb_tv_season_details(tmdb_id: int, season_number: int, refresh: bool = False) -> dict:
+    """Fetch TMDB TV season details including episodes.
 
-    endpoint = "movie/popular" if normalized_type == "movie" else "tv/popular"
-    url = f"{base}/{endpoint}"
-    params = {"api_key": api_key, "page": page}
-    resp = requests.get(url, params=params, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
-    for item in data.get("results", []):
-        item.setdefault("media_type", normalized_type)
-    data["selected_media_type"] = normalized_type
-    return data
+    Pass refresh=True to bypass the cached copy (used by the catalogue refresher).
+    """
 
+    def fetch():
+        resp = _tmdb_get(f"tv/{tmdb_id}/season/{season_number}")
+        return _check_response(resp, f"Season {season_number} for TV show {tmdb_id} not found")
 
-def get_tmdb_top_rated(media_type: str = "movie", page: int = 1) -> dict:
-    """Fetch top-rated movies or TV shows from TMDB."""
-    api_key, base, _ = _get_tmdb_config()
-    normalized_type = (media_type or "movie").lower()
-    if normalized_type not in {"movie", "tv"}:
-        normalized_type = "movie"
+    return cached_tmdb_call(
+        "tv_season",
+        {"tmdb_id": tmdb_id, "season_number": season_number},
+        fetch,
+        refresh=refresh,
+    )
 
-    endpoint = "movie/top_rated" if normalized_type == "movie" else "tv/top_rated"
-    url = f"{base}/{endpoint}"
-    params = {"api_key": api_key, "page": page}
-    resp = requests.get(url, params=params, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
-    for item in data.get("results", []):
-        item.setdefault("media_type", normalized_type)
-    data["selected_media_type"] = normalized_type
-    return data
 
+def get_tmdb_popular(media_type: str = "movie", page: int = 1, refresh: bool = False) -> dict:
+    """Fetch popular movies or TV shows from TMDB.
 
-def get_or_create_movie_from_tmdb(tmdb_id: int, media_type: str = Movie.MediaType.MOVIE) -> Tuple[Movie, bool]:
-    """Get or create a local Movie/TV show by TMDB id and media type."""
+    Served stale-while-revalidate from the cache; refresh=True forces an
+    upstream fetch and re-caches the page.
+    """
+    normalized_type = _normalize_list_type(media_type)
+
+    def fetch():
+        resp = _tmdb_get(f"{normalized_type}/popular", {"page": page})
+        return _process_list_results(_check_response(resp), normalized_type)
+
+    return cached_tmdb_call("popular", {"media_type": normalized_type, "page": page}, fetch, refresh=refresh)
 
+
+def get_tmdb_top_rated(media_type: str = "movie", page: int = 1, refresh: bool = False) -> dict:
+    """Fetch top-rated movies or TV shows from TMDB.
+
+    Served stale-while-revalidate from the cache; refresh=True forces an
+    upstream fetch and re-caches the page.
+    """
+    normalized_type = _normalize_list_type(media_type)
+
+    def fetch():
+        resp = _tmdb_get(f"{normalized_type}/top_rated", {"page": page})
+        return _process_list_results(_check_response(resp), normalized_type)
+
+    return cached_tmdb_call("top_rated", {"media_type": normalized_type, "page": page}, fetch, refresh=refresh)
+
+
+# ============ ASYNC TMDB FETCHERS ============
+# Same caching, keys and response shapes as the sync functions above, but
+# upstream calls go through the async client so they don't hold a thread.
+
+async def asearch_tmdb(query: str, page: int = 1, media_type: str = "multi") -> dict:
+    """Async version of search_tmdb."""
+    normalized_type = _normalize_search_type(media_type)
+
+    async def fetch():
+        resp = await _atmdb_get(SEARCH_ENDPOINTS[normalized_type], {"query": query, "page": page})
+        return _process_search_results(_check_response(resp), normalized_type)
+
+    return await acached_tmdb_call(
+        "search",
+        {"query": query, "page": page, "media_type": normalized_type},
+        fetch,
+    )
+
+
+async def aget_tmdb_movie_details(tmdb_id: int) -> dict:
+    """Async version of get_tmdb_movie_details."""
+
+    async def fetch():
+        resp = await _atmdb_get(f"movie/{tmdb_id}", {"append_to_response": "videos"})
+        return _check_response(resp, f"Movie {tmdb_id} not found")
+
+    return await acached_tmdb_call("movie_details", {"tmdb_id": tmdb_id}, fetch)
+
+
+async def aget_tmdb_tv_details(tmdb_id: int) -> dict:
+    """Async version of get_tmdb_tv_details."""
+
+    async def fetch():
+        resp = await _atmdb_get(f"tv/{tmdb_id}", {"append_to_response": "videos"})
+        return _check_response(resp, f"TV show {tmdb_id} not found")
+
+    return await acached_tmdb_call("tv_details", {"tmdb_id": tmdb_id}, fetch)
+
+
+async def aget_tmdb_tv_season_details(tmdb_id: int, season_number: int) -> dict:
+    """Async version of get_tmdb_tv_season_details."""
+
+    async def fetch():
+        resp = await _atmdb_get(f"tv/{tmdb_id}/season/{season_number}")
+        return _check_response(resp, f"Season {season_number} for TV show {tmdb_id} not found")
+
+    return await acached_tmdb_call(
+        "tv_season",
+        {"tmdb_id": tmdb_id, "season_number": season_number},
+        fetch,
+    )
+
+
+async def aget_tmdb_popular(media_type: str = "movie", page: int = 1) -> dict:
+    """Async version of get_tmdb_popular."""
+    normalized_type = _normalize_list_type(media_type)
+
+    async def fetch():
+        resp = await _atmdb_get(f"{normalized_type}/popular", {"page": page})
+        return _process_list_results(_check_response(resp), normalized_type)
+
+    return await acached_tmdb_call("popular", {"media_type": normalized_type, "page": page}, fetch)
+
+
+async def aget_tmdb_top_rated(media_type: str = "movie", page: int = 1) -> dict:
+    """Async version of get_tmdb_top_rated."""
+    normalized_type = _normalize_list_type(media_type)
+
+    async def fetch():
+        resp = await _atmdb_get(f"{normalized_type}/top_rated", {"page": page})
+        return _process_list_results(_check_response(resp), normalized_type)
+
+    return await acached_tmdb_call("top_rated", {"media_type": normalized_type, "page": page}, fetch)
+
+
+def _normalize_movie_media_type(media_type) -> str:
     normalized_type = media_type or Movie.MediaType.MOVIE
     lowered = str(normalized_type).lower()
     if lowered in ["tv", "series", "tv show", "tvshow"]:
-        normalized_type = Movie.MediaType.TV
-    elif normalized_type not in Movie.MediaType.values:
-        normalized_type = Movie.MediaType.MOVIE
+        return Movie.MediaType.TV
+    if normalized_type not in Movie.MediaType.values:
+        return Movie.MediaType.MOVIE
+    return normalized_type
 
-    try:
-        movie = Movie.objects.get(tmdb_id=tmdb_id, media_type=normalized_type)
-        return movie, False
-    except Movie.DoesNotExist:
-        pass
 
-    if normalized_type == Movie.MediaType.TV:
-        data = get_tmdb_tv_details(tmdb_id)
+def tmdb_image_url(path: Optional[str]) -> Optional[str]:
+    """Build a full image URL from a TMDB poster/still path."""
+    if not path:
+        return None
+    _, _, image_base = _get_tmdb_config()
+    return f"{image_base}{path}"
+
+
+# Movie fields that mirror TMDB and are kept current by refreshes
+MOVIE_METADATA_FIELDS = ("title", "poster_url", "description", "release_year", "youtube_id")
+
+
+def movie_fields_from_tmdb(data: dict, tmdb_id: int, media_type: str) -> dict:
+    """Map a TMDB movie/TV details payload onto Movie model fields."""
+    if media_type == Movie.MediaType.TV:
         title = data.get("name") or data.get("original_name") or ""
         release_date = data.get("first_air_date") or ""
     else:
-        data = get_tmdb_movie_details(tmdb_id)
         title = data.get("title") or data.get("original_title") or ""
         release_date = data.get("release_date") or ""
 
@@ -174,12 +305,7 @@ def get_or_create_movie_from_tmdb(tmdb_id: int, media_type: str = Movie.MediaTyp
             youtube_id = v.get("key")
             break
 
-    # Build poster URL
-    poster_path = data.get("poster_path")
-    poster_url = None
-    if poster_path:
-        _, _, image_base = _get_tmdb_config()
-        poster_url = f"{image_base}{poster_path}"
+    poster_url = tmdb_image_url(data.get("poster_path"))
 
     # Parse release_year from release_date (e.g., "2010-07-15" -> 2010)
     release_year = None
@@ -189,15 +315,200 @@ def get_or_create_movie_from_tmdb(tmdb_id: int, media_type: str = Movie.MediaTyp
         except (ValueError, IndexError):
             release_year = None
 
-    # Create the movie
-    movie = Movie.objects.create(
-        tmdb_id=tmdb_id,
-        title=title,
-        poster_url=poster_url,
-        description=data.get("overview") or "",
-        release_year=release_year,
-        media_type=normalized_type,
-        youtube_id=youtube_id,
+    return {
+        "tmdb_id": tmdb_id,
+        "title": title,
+        "poster_url": poster_url,
+        "description": data.get("overview") or "",
+        "release_year": release_year,
+        "media_type": media_type,
+        "youtube_id": youtube_id,
+    }
+
+
+def _fetch_movie_fields(tmdb_id: int, media_type: str) -> dict:
+    """Fetch TMDB details and map them onto Movie model fields."""
+    if media_type == Movie.MediaType.TV:
+        data = get_tmdb_tv_details(tmdb_id)
+    else:
+        data = get_tmdb_movie_details(tmdb_id)
+    return movie_fields_from_tmdb(data, tmdb_id, media_type)
+
+
+def fetch_tmdb_details(tmdb_id: int, media_type: str, etag: str = "") -> Tuple[Optional[dict], str]:
+    """Fetch a title's TMDB details straight from TMDB, bypassing the cache lookup.
+
+    Sends ``If-None-Match`` when an ETag from a previous fetch is given.
+    Returns (data, etag): data is None when TMDB answers 304 Not Modified.
+    Fresh payloads are also written to the details cache so the proxy
+    endpoints pick them up.
+    """
+    is_tv = media_type == Movie.MediaType.TV
+    headers = {"If-None-Match": etag} if etag else None
+    resp = _tmdb_get(f"{'tv' if is_tv else 'movie'}/{tmdb_id}", {"append_to_response": "videos"}, headers=headers)
+    if resp.status_code == 304:
+        return None, etag
+
+    data = _check_response(resp, f"{'TV show' if is_tv else 'Movie'} {tmdb_id} not found")
+    cached_tmdb_call("tv_details" if is_tv else "movie_details", {"tmdb_id": tmdb_id}, lambda: data, refresh=True)
+    return data, resp.headers.get("ETag", "")
+
+
+def get_title_details(tmdb_id: int, media_type: str) -> Tuple[dict, Optional[MovieDetailSnapshot]]:
+    """Return TMDB details for a title, served locally when we have them.
+
+    Titles already stored as a Movie are answered from their
+    MovieDetailSnapshot. A missing or stale snapshot is (re)validated with
+    a conditional TMDB request and saved together with the refreshed Movie
+    fields; if TMDB fails, a stale snapshot is served rather than an error.
+    Titles not in the local catalogue are proxied through the response
+    cache and come back with snapshot None.
+    """
+    media_type = _normalize_movie_media_type(media_type)
+    movie = (
+        Movie.objects.select_related("detail_snapshot")
+        .filter(tmdb_id=tmdb_id, media_type=media_type)
+        .first()
     )
+    if movie is None:
+        if media_type == Movie.MediaType.TV:
+            return get_tmdb_tv_details(tmdb_id), None
+        return get_tmdb_movie_details(tmdb_id), None
+
+    try:
+        snapshot = movie.detail_snapshot
+    except MovieDetailSnapshot.DoesNotExist:
+        snapshot = None
+    if snapshot is not None and not snapshot.is_stale():
+        return snapshot.data, snapshot
+
+    # One revalidation per title at a time, across threads and workers
+    key = make_cache_key("snapshot", {"tmdb_id": tmdb_id, "media_type": media_type})
+    result, ran = run_exclusive(key, lambda: _revalidate_snapshot(movie, snapshot))
+    if ran:
+        return result
+    # Another worker revalidated it; serve what it saved
+    fresh = MovieDetailSnapshot.objects.filter(movie=movie).first()
+    if fresh is not None and not fresh.is_stale():
+        return fresh.data, fresh
+    return _revalidate_snapshot(movie, fresh or snapshot)
+
+
+def _revalidate_snapshot(movie, snapshot) -> Tuple[dict, MovieDetailSnapshot]:
+    """Fetch a movie's details (conditionally, if it has a snapshot) and save them."""
+    tmdb_id, media_type = movie.tmdb_id, movie.media_type
+    try:
+        # The stored ETag only describes the snapshot, so send it only if we have one
+        data, etag = fetch_tmdb_details(tmdb_id, media_type, movie.tmdb_etag if snapshot else "")
+    except Exception:
+        if snapshot is None:
+            raise
+        logger.warning("Serving stale snapshot for %s %s", media_type, tmdb_id, exc_info=True)
+        return snapshot.data, snapshot
+
+    now = timezone.now()
+    if data is None:
+        snapshot.fetched_at = now
+        snapshot.save(update_fields=["fetched_at"])
+        return snapshot.data, snapshot
+
+    fields = movie_fields_from_tmdb(data, tmdb_id, media_type)
+    metadata = {name: fields[name] for name in MOVIE_METADATA_FIELDS}
+    # A new ETag often comes with the same title, poster and so on
+    changed = any(getattr(movie, name) != value for name, value in metadata.items())
+    with transaction.atomic():
+        Movie.objects.filter(pk=movie.pk).update(**metadata, tmdb_etag=etag, updated_at=now)
+        built = MovieDetailSnapshot.build(movie, data, now)
+        # Tolerates a concurrent first fetch that inserted the row already
+        snapshot, _ = MovieDetailSnapshot.objects.update_or_create(
+            movie=movie,
+            defaults={"payload": built.payload, "fetched_at": now, "changed_at": now},
+        )
+        if changed:
+            invalidate_movie_versions([movie.pk])
+    return data, snapshot
+
+
+def get_or_create_movie_from_tmdb(tmdb_id: int, media_type: str = Movie.MediaType.MOVIE) -> Tuple[Movie, bool]:
+    """Get or create a local Movie/TV show by TMDB id and media type.
+
+    ``created`` is True when the title was missing locally and fetched from
+    TMDB; when several requests race on the same new title they all get
+    the one row that was inserted.
+    """
+
+    normalized_type = _normalize_movie_media_type(media_type)
+
+    try:
+        movie = Movie.objects.get(tmdb_id=tmdb_id, media_type=normalized_type)
+        return movie, False
+    except Movie.DoesNotExist:
+        pass
+
+    # Concurrent callers for the same new title share one TMDB fetch through
+    # the response cache, then race to insert. The insert skips conflicts on
+    # the unique (tmdb_id, media_type) index instead of raising, so losers
+    # read back the winner's row.
+    Movie.objects.bulk_create([Movie(**_fetch_movie_fields(tmdb_id, normalized_type))], ignore_conflicts=True)
+    movie = Movie.objects.get(tmdb_id=tmdb_id, media_type=normalized_type)
 
     return movie, True
+
+
+def get_or_create_movies_from_tmdb(pairs, max_workers: Optional[int] = None) -> Tuple[dict, set, dict]:
+    """Batch version of get_or_create_movie_from_tmdb.
+
+    Takes an iterable of (tmdb_id, media_type) pairs and returns
+    (movies, created, errors):
+
+      - movies: {(tmdb_id, media_type): Movie} for every pair resolved
+      - created: the pairs that were missing locally and fetched from TMDB
+      - errors: {(tmdb_id, media_type): message} for pairs TMDB could not supply
+
+    Local hits are found with one query. Misses are fetched from TMDB on a
+    bounded thread pool (settings.TMDB_BATCH_WORKERS) and inserted with one
+    bulk_create that skips rows another request inserted meanwhile; the new
+    rows are then read back in one more query.
+    """
+    wanted = list(dict.fromkeys(
+        (int(tmdb_id), _normalize_movie_media_type(media_type)) for tmdb_id, media_type in pairs
+    ))
+    movies = {
+        (movie.tmdb_id, movie.media_type): movie
+        for movie in Movie.objects.for_tmdb_pairs(wanted)
+    }
+    misses = [pair for pair in wanted if pair not in movies]
+    errors = {}
+    if not misses:
+        return movies, set(), errors
+
+    if max_workers is None:
+        max_workers = getattr(settings, "TMDB_BATCH_WORKERS", 8)
+
+    def fetch(pair):
+        try:
+            return pair, _fetch_movie_fields(*pair), None
+        except TMDBError as e:
+            return pair, None, str(e)
+        except Exception as e:
+            return pair, None, f"TMDB request failed: {e}"
+
+    new_movies = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(misses)))) as executor:
+        for pair, fields, error in executor.map(fetch, misses):
+            if error is not None:
+                errors[pair] = error
+            else:
+                new_movies.append(Movie(**fields))
+
+    created = set()
+    if new_movies:
+        # A concurrent request may have inserted some of these already;
+        # ignore_conflicts skips them on the unique (tmdb_id, media_type) index
+        Movie.objects.bulk_create(new_movies, ignore_conflicts=True)
+        fetched = [(movie.tmdb_id, movie.media_type) for movie in new_movies]
+        for movie in Movie.objects.for_tmdb_pairs(fetched):
+            movies[(movie.tmdb_id, movie.media_type)] = movie
+        created = {pair for pair in fetched if pair in movies}
+
+    return movies, created, errors
@@ -3,10 +3,14 @@ Django signals for the playlist app.
 Signals are used to handle automatic tasks when models are created/updated.
 """
 
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Playlist
+from .models import EpisodeProgress, Favorite, Movie, Playlist, PlaylistItem, Review
+from .library_version import invalidate_library_versions, invalidate_movie_versions
+from .serializers import MovieSerializer
+from .status_playlists import invalidate_status_playlist_ids
+from .sync import record_deletion
 
 # Add any signal handlers here
 # For example, create default playlists when a user is created
@@ -15,3 +19,87 @@ from .models import Playlist
 #     if created:
 #         # Create default playlists for new users
 #         pass
+
+
+# Fields that decide which playlist a status maps to
+STATUS_LOOKUP_FIELDS = {"title", "is_status_playlist"}
+
+# Movie fields the playlist payloads embed, apart from its timestamps
+LIBRARY_MOVIE_FIELDS = [
+    name for name in MovieSerializer.Meta.fields if name not in MovieSerializer.Meta.read_only_fields
+]
+
+
+@receiver(post_save, sender=Playlist)
+def invalidate_status_playlists_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """Drop the cached status -> playlist mapping when a playlist is added or renamed."""
+    if created or update_fields is None or STATUS_LOOKUP_FIELDS & set(update_fields):
+        invalidate_status_playlist_ids(instance.user_id)
+
+
+@receiver(post_delete, sender=Playlist)
+def invalidate_status_playlists_on_delete(sender, instance, **kwargs):
+    invalidate_status_playlist_ids(instance.user_id)
+
+
+@receiver(post_save, sender=Playlist)
+@receiver(post_delete, sender=Playlist)
+def invalidate_library_version_on_playlist_change(sender, instance, **kwargs):
+    invalidate_library_versions(user_ids=[instance.user_id], playlist_ids=[instance.pk])
+
+
+@receiver(post_save, sender=PlaylistItem)
+@receiver(post_delete, sender=PlaylistItem)
+def invalidate_library_version_on_item_change(sender, instance, **kwargs):
+    invalidate_library_versions(playlist_ids=[instance.playlist_id])
+
+
+@receiver(pre_save, sender=Movie)
+def remember_changed_movie_fields(sender, instance, update_fields=None, **kwargs):
+    """Note whether a save changes what the playlist payloads show of the movie."""
+    fields = LIBRARY_MOVIE_FIELDS if update_fields is None else [
+        name for name in LIBRARY_MOVIE_FIELDS if name in update_fields
+    ]
+    # A new movie is not in anyone's playlist yet
+    if instance.pk is None or not fields:
+        instance._library_fields_changed = False
+        return
+    saved = Movie.objects.filter(pk=instance.pk).values(*fields).first()
+    instance._library_fields_changed = saved is not None and any(
+        saved[name] != getattr(instance, name) for name in fields
+    )
+
+
+@receiver(post_save, sender=Movie)
+def invalidate_library_version_on_movie_save(sender, instance, **kwargs):
+    # Deleting a movie needs nothing extra: its items cascade and refresh their playlists
+    if getattr(instance, "_library_fields_changed", False):
+        invalidate_movie_versions([instance.pk])
+
+
+@receiver(pre_delete, sender=Movie)
+def remember_playlists_of_deleted_movie(sender, instance, **kwargs):
+    """Deleting a movie cascades to its playlist items, bypassing the views that refresh counters."""
+    instance._playlists_to_refresh = list(
+        PlaylistItem.objects.filter(movie=instance).values_list("playlist_id", flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=Movie)
+def refresh_counters_after_movie_delete(sender, instance, **kwargs):
+    playlist_ids = getattr(instance, "_playlists_to_refresh", None)
+    if playlist_ids:
+        Playlist.objects.filter(pk__in=playlist_ids).refresh_counters()
+
+
+@receiver(post_delete, sender=Playlist)
+@receiver(post_delete, sender=PlaylistItem)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=EpisodeProgress)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    """Remember deletions so /api/sync/ can pass them on to offline clients."""
+    if isinstance(origin, User) or getattr(origin, "model", None) is User:
+        # The whole account is going; its tombstones go with it
+        return
+    record_deletion(instance, origin)
@@ -0,0 +1,80 @@
+"""
+In-process request coalescing.
+
+SingleFlight.do(key, fn) runs fn() once per key at a time: threads that ask
+for the same key while a call is in flight block until it finishes and share
+its result (or exception) instead of repeating the work.
+
+AsyncSingleFlight does the same for coroutines sharing an event loop.
+"""
+
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Return (result, shared) where shared is True if another caller did the work."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class AsyncSingleFlight:
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, fn):
+        """Await fn() once per key and event loop; returns (result, shared)."""
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        future = self._calls.get(flight_key)
+        if future is not None:
+            return await asyncio.shield(future), True
+
+        future = self._calls[flight_key] = loop.create_future()
+        try:
+            result = await fn()
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[flight_key]
+            if not future.done():
+                # Leader was cancelled; waiters see CancelledError too
+                future.cancel()
@@ -0,0 +1,120 @@
+"""
+Per-user lookup of the automatic status playlists.
+
+Status transitions need the ID of the user's "Watched" / "Watching" /
+"To Watch" / "Did Not Finish" playlist. Instead of looking it up by title on
+every change, the status -> playlist ID mapping is kept in Django's cache and
+dropped by the signal handlers in signals.py whenever one of the user's
+playlists is created, renamed, re-flagged or deleted. With a process-local
+cache, which only sees the invalidations of its own worker, writers also
+check the ID they get (``verify=True``).
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .library_version import invalidate_library_versions
+from .models import Playlist, STATUS_PLAYLISTS
+from .tmdb_cache import cache_is_process_local
+
+
+CACHE_TIMEOUT = 24 * 60 * 60
+
+_STATUS_BY_TITLE = {title: status for status, (title, _) in STATUS_PLAYLISTS.items()}
+
+
+def _cache_key(user_id) -> str:
+    return f"status-playlists:v1:{user_id}"
+
+
+def invalidate_status_playlist_ids(user_id) -> None:
+    cache.delete(_cache_key(user_id))
+
+
+def _remember(user_id, ids: dict, created: bool) -> None:
+    if created:
+        # Don't cache IDs of playlists that may still be rolled back
+        transaction.on_commit(lambda: cache.set(_cache_key(user_id), ids, CACHE_TIMEOUT))
+    else:
+        cache.set(_cache_key(user_id), ids, CACHE_TIMEOUT)
+
+
+def create_status_playlists(user) -> dict:
+    """Create all status playlists for a new user and seed the cache."""
+    playlists = Playlist.objects.bulk_create([
+        Playlist(user=user, title=title, description=description, is_status_playlist=True)
+        for title, description in STATUS_PLAYLISTS.values()
+    ])
+    ids = {status: playlist.pk for status, playlist in zip(STATUS_PLAYLISTS, playlists)}
+    _remember(user.pk, ids, created=True)
+    # bulk_create sends no post_save
+    invalidate_library_versions(user_ids=[user.pk])
+    return ids
+
+
+def _resolve(user) -> tuple:
+    """Look the status playlists up by title, creating or re-flagging as needed.
+
+    Returns (ids, created) where created is True if any playlist was created.
+    """
+    ids = {}
+    unflagged = []
+    rows = Playlist.objects.filter(user=user, title__in=_STATUS_BY_TITLE).values_list(
+        "pk", "title", "is_status_playlist"
+    )
+    for pk, title, is_status_playlist in rows:
+        ids[_STATUS_BY_TITLE[title]] = pk
+        if not is_status_playlist:
+            unflagged.append(pk)
+
+    if unflagged:
+        Playlist.objects.filter(pk__in=unflagged).update(is_status_playlist=True, updated_at=timezone.now())
+        invalidate_library_versions(user_ids=[user.pk])
+
+    created = False
+    for status, (title, description) in STATUS_PLAYLISTS.items():
+        if status in ids:
+            continue
+        playlist, was_created = Playlist.objects.get_or_create(
+            user=user,
+            title=title,
+            defaults={"description": description, "is_status_playlist": True},
+        )
+        ids[status] = playlist.pk
+        created = created or was_created
+
+    return ids, created
+
+
+def get_status_playlist_ids(user) -> dict:
+    """Return {status: playlist_id} for all of the user's status playlists.
+
+    Served from the cache when possible; otherwise resolved with one query
+    (plus creating any playlist that is missing) and cached.
+    """
+    ids = cache.get(_cache_key(user.pk))
+    if ids is None:
+        ids, created = _resolve(user)
+        _remember(user.pk, ids, created)
+    return ids
+
+
+def get_status_playlist_id(user, status, verify: bool = False):
+    """Return the ID of the user's playlist for ``status``, or None if unknown.
+
+    With ``verify`` and a process-local cache, the cached ID is checked with
+    one primary key query and resolved again if that playlist is gone or
+    renamed, since the invalidation from another worker's delete or rename
+    never reached this one. Use it before writing to the playlist; a shared
+    cache needs no check.
+    """
+    if status not in STATUS_PLAYLISTS:
+        return None
+    playlist_id = get_status_playlist_ids(user)[status]
+    if verify and cache_is_process_local() and not Playlist.objects.filter(
+        pk=playlist_id, user=user, title=STATUS_PLAYLISTS[status][0]
+    ).exists():
+        invalidate_status_playlist_ids(user.pk)
+        playlist_id = get_status_playlist_ids(user)[status]
+    return playlist_id
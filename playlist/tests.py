@@ -1,9 +1,43 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import requests
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from rest_framework.test import APITestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
 
-from .models import Movie, Playlist, PlaylistItem
+from .commit_batch import CommitBatch
+from .models import (
+    Episode,
+    EpisodeProgress,
+    Favorite,
+    Movie,
+    MovieDetailSnapshot,
+    Playlist,
+    PlaylistItem,
+    Review,
+    Season,
+    Tombstone,
+)
+from .pagination import KeysetPagination
+from .renderers import FastJSONRenderer
+from .serializers import FavoriteSerializer, PlaylistItemSerializer, PlaylistSerializer, ReviewSerializer
+from .views import TMDBBatchThrottle
+from . import fast_serializers, library_version, renderers, services, status_playlists, tmdb_cache, tmdb_client, tv_catalogue
 
 
 class MovieModelTests(TestCase):
@@ -125,3 +159,1743 @@ class MovieAPITests(APITestCase):
         response = self.client.get("/api/movies/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+
+
+def _tmdb_response(payload, status_code=200, headers=None):
+    response = mock.Mock(status_code=status_code, headers=headers or {})
+    response.json.return_value = payload
+    return response
+
+
+@override_settings(TMDB_API_KEY="test-key")
+class TMDBCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @mock.patch("playlist.services._tmdb_get")
+    def test_repeated_details_lookup_hits_cache(self, mock_get):
+        mock_get.return_value = _tmdb_response({"id": 27205, "title": "Inception"})
+
+        first = services.get_tmdb_movie_details(27205)
+        second = services.get_tmdb_movie_details(27205)
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get.call_count, 1)
+        stats = tmdb_cache.get_cache_stats()["movie_details"]
+        self.assertEqual(stats, {"hits": 1, "misses": 1, "coalesced": 0, "stale": 0})
+
+    @mock.patch("playlist.services._tmdb_get")
+    def test_search_key_is_normalized(self, mock_get):
+        mock_get.return_value = _tmdb_response({"results": []})
+
+        services.search_tmdb("The  Matrix", 1, "MOVIE")
+        services.search_tmdb("the matrix", 1, "movie")
+
+        self.assertEqual(mock_get.call_count, 1)
+
+    @mock.patch("playlist.services._tmdb_get")
+    def test_errors_are_not_cached(self, mock_get):
+        mock_get.return_value = _tmdb_response({}, status_code=404)
+
+        for _ in range(2):
+            with self.assertRaises(services.TMDBError):
+                services.get_tmdb_tv_details(1)
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    @mock.patch("playlist.services._tmdb_get")
+    def test_concurrent_identical_lookups_share_one_fetch(self, mock_get):
+        release = threading.Event()
+
+        def slow_response(*args, **kwargs):
+            release.wait(5)
+            return _tmdb_response({"id": 1399, "name": "Game of Thrones"})
+
+        mock_get.side_effect = slow_response
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(services.get_tmdb_tv_details(1399)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(len(results), 8)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(tmdb_cache.get_cache_stats()["tv_details"]["coalesced"], 7)
+
+    @mock.patch("playlist.services._tmdb_get")
+    def test_waits_for_fetch_in_another_worker(self, mock_get):
+        key = tmdb_cache.make_cache_key("movie_details", {"tmdb_id": 550})
+        cache.add(f"{key}:lock", 1)
+
+        def other_worker_finishes():
+            time.sleep(0.1)
+            tmdb_cache._store("movie_details", key, {"id": 550, "title": "Fight Club"})
+
+        threading.Thread(target=other_worker_finishes).start()
+        data = services.get_tmdb_movie_details(550)
+
+        self.assertEqual(data["title"], "Fight Club")
+        mock_get.assert_not_called()
+
+    @override_settings(TMDB_CACHE_TTLS={"popular": 0})
+    @mock.patch("playlist.services._tmdb_get")
+    def test_expired_popular_page_is_served_stale_and_refreshed(self, mock_get):
+        mock_get.return_value = _tmdb_response({"page": 1, "results": [{"id": 1}]})
+        services.get_tmdb_popular("movie", 1)
+
+        refreshed = threading.Event()
+
+        def refreshed_response(*args, **kwargs):
+            refreshed.set()
+            return _tmdb_response({"page": 1, "results": [{"id": 2}]})
+
+        mock_get.side_effect = refreshed_response
+        data = services.get_tmdb_popular("movie", 1)
+
+        self.assertEqual(data["results"][0]["id"], 1)
+        self.assertTrue(refreshed.wait(5))
+        self.assertEqual(tmdb_cache.get_cache_stats()["popular"]["stale"], 1)
+
+    @override_settings(TMDB_CACHE_TTLS={"movie_details": 0})
+    @mock.patch("playlist.services._tmdb_get")
+    def test_details_are_never_served_stale(self, mock_get):
+        mock_get.return_value = _tmdb_response({"id": 27205})
+
+        services.get_tmdb_movie_details(27205)
+        services.get_tmdb_movie_details(27205)
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    @mock.patch("playlist.services._tmdb_get")
+    def test_refresh_bypasses_cache(self, mock_get):
+        mock_get.return_value = _tmdb_response({"page": 1, "results": []})
+
+        services.get_tmdb_top_rated("tv", 1)
+        services.get_tmdb_top_rated("tv", 1, refresh=True)
+        services.get_tmdb_top_rated("tv", 1)
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    @override_settings(TMDB_CACHE_TTLS={"popular": 0})
+    def test_ttl_override_from_settings(self):
+        self.assertEqual(tmdb_cache.get_ttl("popular"), 0)
+        self.assertEqual(tmdb_cache.get_ttl("tv_season"), tmdb_cache.DEFAULT_TTLS["tv_season"])
+
+    @mock.patch("playlist.services._tmdb_get")
+    def test_warm_command_needs_a_shared_cache(self, mock_get):
+        mock_get.return_value = _tmdb_response({"page": 1, "results": []})
+
+        with self.assertRaisesMessage(CommandError, "process-local"):
+            call_command("warm_tmdb_lists", stdout=StringIO())
+        mock_get.assert_not_called()
+
+        out = StringIO()
+        with mock.patch("playlist.management.commands.warm_tmdb_lists.cache_is_process_local", return_value=False):
+            call_command("warm_tmdb_lists", "--pages", "1", stdout=out)
+        self.assertIn("Warmed 4 page(s), 0 failure(s)", out.getvalue())
+
+
+class TMDBClientTests(TestCase):
+    def setUp(self):
+        self.client_ = tmdb_client.TMDBClient("test-key", "https://tmdb.test/3/", max_retries=2)
+        self.session_get = mock.patch.object(self.client_.session, "get").start()
+        self.sleep = mock.patch("playlist.tmdb_client.time.sleep").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _response(self, status_code, headers=None):
+        return mock.Mock(status_code=status_code, headers=headers or {})
+
+    def test_builds_url_and_injects_api_key(self):
+        self.session_get.return_value = self._response(200)
+
+        self.client_.get("movie/1", {"append_to_response": "videos"}, headers={"If-None-Match": '"v1"'})
+
+        self.session_get.assert_called_once_with(
+            "https://tmdb.test/3/movie/1",
+            params={"api_key": "test-key", "append_to_response": "videos"},
+            headers={"If-None-Match": '"v1"'},
+            timeout=10,
+        )
+
+    def test_retries_server_errors_with_backoff(self):
+        self.session_get.side_effect = [self._response(502), self._response(503), self._response(200)]
+
+        resp = self.client_.get("movie/popular")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.session_get.call_count, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_honours_retry_after(self):
+        self.session_get.side_effect = [self._response(429, {"Retry-After": "2"}), self._response(200)]
+
+        self.client_.get("movie/popular")
+
+        self.sleep.assert_called_once_with(2.0)
+
+    def test_gives_up_after_max_retries(self):
+        self.session_get.return_value = self._response(500)
+
+        resp = self.client_.get("movie/popular")
+
+        self.assertEqual(resp.status_code, 500)
+        self.assertEqual(self.session_get.call_count, 3)
+
+    def test_client_errors_are_not_retried(self):
+        self.session_get.return_value = self._response(404)
+
+        self.client_.get("movie/0")
+
+        self.assertEqual(self.session_get.call_count, 1)
+
+    def test_connection_errors_are_retried_but_read_timeouts_are_not(self):
+        self.session_get.side_effect = [requests.ConnectTimeout(), requests.ConnectionError(), self._response(200)]
+        self.assertEqual(self.client_.get("movie/1").status_code, 200)
+
+        self.session_get.reset_mock()
+        self.session_get.side_effect = requests.ReadTimeout()
+        with self.assertRaises(requests.ReadTimeout):
+            self.client_.get("movie/1")
+        self.assertEqual(self.session_get.call_count, 1)
+
+    def test_retries_stop_when_the_budget_runs_out(self):
+        self.client_.retry_budget = 5
+        self.session_get.side_effect = [self._response(429, {"Retry-After": "3"}), self._response(200)]
+        self.assertEqual(self.client_.get("movie/popular").status_code, 200)
+
+        # A wait past the budget returns the error instead of sleeping
+        self.sleep.reset_mock()
+        self.session_get.side_effect = [self._response(503, {"Retry-After": "6"}), self._response(200)]
+        self.assertEqual(self.client_.get("movie/popular").status_code, 503)
+        self.sleep.assert_not_called()
+
+        self.session_get.side_effect = requests.ConnectionError()
+        with mock.patch("playlist.tmdb_client.time.monotonic", side_effect=[0, 0, 6]), \
+                self.assertRaises(requests.ConnectionError):
+            self.client_.get("movie/popular")
+        self.sleep.assert_called_once()
+
+
+@override_settings(TMDB_API_KEY="test-key")
+class AsyncTMDBProxyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @mock.patch("playlist.services._atmdb_get", new_callable=mock.AsyncMock)
+    async def test_async_search_matches_sync_payload(self, mock_get):
+        mock_get.return_value = _tmdb_response(
+            {"page": 1, "results": [{"id": 1, "media_type": "movie"}, {"id": 2, "media_type": "person"}]}
+        )
+
+        response = await self.async_client.get("/api/tmdb/async/search/", {"query": "alien"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {"page": 1, "results": [{"id": 1, "media_type": "movie"}], "selected_media_type": "multi"},
+        )
+
+    async def test_async_search_requires_query(self):
+        response = await self.async_client.get("/api/tmdb/async/search/")
+        self.assertEqual(response.status_code, 400)
+
+    @mock.patch("playlist.services._atmdb_get", new_callable=mock.AsyncMock)
+    def test_async_routes_are_not_served_under_wsgi(self, mock_get):
+        response = self.client.get("/api/tmdb/async/movies/603/")
+
+        self.assertEqual(response.status_code, 404)
+        mock_get.assert_not_awaited()
+
+    @mock.patch("playlist.services._atmdb_get", new_callable=mock.AsyncMock)
+    async def test_async_not_found_maps_to_404(self, mock_get):
+        mock_get.return_value = _tmdb_response({}, status_code=404)
+
+        response = await self.async_client.get("/api/tmdb/async/movies/0/")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"error": "Movie 0 not found"})
+
+    @mock.patch("playlist.services._atmdb_get", new_callable=mock.AsyncMock)
+    async def test_concurrent_async_lookups_share_one_fetch(self, mock_get):
+        async def slow_response(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return _tmdb_response({"id": 1399})
+
+        mock_get.side_effect = slow_response
+
+        results = await asyncio.gather(*(services.aget_tmdb_tv_details(1399) for _ in range(10)))
+
+        self.assertEqual(len(results), 10)
+        self.assertEqual(mock_get.await_count, 1)
+
+    @mock.patch("playlist.services._tmdb_get")
+    @mock.patch("playlist.services._atmdb_get", new_callable=mock.AsyncMock)
+    async def test_sync_and_async_share_cache_entries(self, mock_async_get, mock_get):
+        mock_get.return_value = _tmdb_response({"page": 1, "results": []})
+
+        await sync_to_async(services.get_tmdb_popular)("tv", 2)
+        response = await self.async_client.get("/api/tmdb/async/popular/", {"type": "tv", "page": 2})
+
+        self.assertEqual(response.status_code, 200)
+        mock_async_get.assert_not_awaited()
+
+
+class PlaylistQueryCountTests(APITestCase):
+    """Playlist read endpoints must run a fixed number of queries regardless of size."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="counter", password="password123")
+        self.client.force_authenticate(self.user)
+        movies = [Movie.objects.create(title=f"Movie {i}") for i in range(6)]
+        for p in range(5):
+            playlist = Playlist.objects.create(user=self.user, title=f"List {p}")
+            for i, movie in enumerate(movies[: p + 1]):
+                PlaylistItem.objects.create(
+                    playlist=playlist,
+                    movie=movie,
+                    status=PlaylistItem.Status.WATCHED if i % 2 == 0 else PlaylistItem.Status.TO_WATCH,
+                )
+        Playlist.objects.all().refresh_counters()
+        self.largest = Playlist.objects.get(title="List 4")
+
+    def test_list_query_count(self):
+        # COUNT for pagination + one page query; counters are stored columns
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/playlists/")
+        counts = {row["title"]: (row["movie_count"], row["watched_count"]) for row in response.data["results"]}
+        self.assertEqual(counts["List 4"], (5, 3))
+        self.assertEqual(counts["List 0"], (1, 1))
+
+    def test_user_playlists_query_count(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/playlists/user_playlists/")
+        self.assertEqual(len(response.data), 5)
+
+    def test_retrieve_query_count(self):
+        # Playlist + prefetched items joined with their movies
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/playlists/{self.largest.id}/")
+        self.assertEqual(len(response.data["items"]), 5)
+        self.assertEqual(response.data["movie_count"], 5)
+        self.assertEqual(response.data["watched_count"], 3)
+
+
+class PlaylistCounterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tally", password="password123")
+        self.client.force_authenticate(self.user)
+        self.playlist = Playlist.objects.create(user=self.user, title="Weekend")
+        self.movie = Movie.objects.create(title="Heat", release_year=1995)
+
+    def assertCounters(self, playlist, movies, watched):
+        playlist.refresh_from_db()
+        self.assertEqual((playlist.movie_count, playlist.watched_count), (movies, watched))
+
+    def test_add_update_remove_keep_counters(self):
+        self.client.post(f"/api/playlists/{self.playlist.id}/add_movie/", {"movie_id": self.movie.id})
+        self.assertCounters(self.playlist, 1, 0)
+
+        self.client.patch(
+            f"/api/playlists/{self.playlist.id}/update_item_status/{self.movie.id}/",
+            {"status": "watched"},
+        )
+        self.assertCounters(self.playlist, 1, 1)
+
+        self.client.delete(f"/api/playlists/{self.playlist.id}/remove_movie/{self.movie.id}/")
+        self.assertCounters(self.playlist, 0, 0)
+
+    def test_status_playlist_move_updates_every_affected_playlist(self):
+        PlaylistItem.objects.create(playlist=self.playlist, movie=self.movie)
+        Playlist.objects.filter(pk=self.playlist.pk).refresh_counters()
+        to_watch = Playlist.objects.create(user=self.user, title="To Watch", is_status_playlist=True)
+
+        self.client.post(f"/api/playlists/{to_watch.id}/add_movie/", {"movie_id": self.movie.id, "status": "watched"})
+
+        self.assertCounters(self.playlist, 1, 1)
+        watched = Playlist.objects.get(user=self.user, title="Watched")
+        self.assertCounters(watched, 1, 1)
+
+    def test_playlist_save_does_not_clobber_counters(self):
+        stale = Playlist.objects.get(pk=self.playlist.pk)
+        PlaylistItem.objects.create(playlist=self.playlist, movie=self.movie)
+        Playlist.objects.filter(pk=self.playlist.pk).refresh_counters()
+
+        stale.title = "Renamed"
+        stale.save()
+
+        self.assertCounters(self.playlist, 1, 0)
+
+    def test_deleting_a_movie_refreshes_every_playlist_it_was_in(self):
+        other = Playlist.objects.create(user=self.user, title="Crime")
+        keep = Movie.objects.create(title="Ronin", release_year=1998)
+        PlaylistItem.objects.create(playlist=self.playlist, movie=self.movie, status=PlaylistItem.Status.WATCHED)
+        PlaylistItem.objects.create(playlist=other, movie=self.movie)
+        PlaylistItem.objects.create(playlist=other, movie=keep)
+        Playlist.objects.filter(pk__in=[self.playlist.pk, other.pk]).refresh_counters()
+
+        response = self.client.delete(f"/api/movies/{self.movie.id}/")
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertCounters(self.playlist, 0, 0)
+        self.assertCounters(other, 1, 0)
+
+    def test_repair_command_fixes_drift(self):
+        PlaylistItem.objects.create(playlist=self.playlist, movie=self.movie, status=PlaylistItem.Status.WATCHED)
+
+        call_command("repair_playlist_counters", "--dry-run", stdout=StringIO())
+        self.assertCounters(self.playlist, 0, 0)
+
+        call_command("repair_playlist_counters", stdout=StringIO())
+        self.assertCounters(self.playlist, 1, 1)
+
+
+class BulkPlaylistItemsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="importer", password="password123")
+        self.client.force_authenticate(self.user)
+        self.playlist = Playlist.objects.create(user=self.user, title="Imported")
+        self.movies = [Movie.objects.create(title=f"Title {i}") for i in range(4)]
+        self.url = f"/api/playlists/{self.playlist.id}/bulk/"
+
+    def test_mixed_operations_report_per_operation_results(self):
+        m0, m1, m2, m3 = self.movies
+        PlaylistItem.objects.create(playlist=self.playlist, movie=m2)
+
+        response = self.client.post(self.url, {"operations": [
+            {"op": "add", "movie_id": m0.id},
+            {"op": "add", "movie_id": m1.id, "status": "watched"},
+            {"op": "set_rating", "movie_id": m1.id, "rating": 4},
+            {"op": "set_status", "movie_id": m2.id, "status": "watching"},
+            {"op": "add", "movie_id": m2.id},
+            {"op": "remove", "movie_id": m3.id},
+            {"op": "add", "movie_id": 999999},
+            {"op": "explode", "movie_id": m0.id},
+        ]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["applied"], 4)
+        self.assertEqual(response.data["failed"], 4)
+        errors = [("error" in result) for result in response.data["results"]]
+        self.assertEqual(errors, [False, False, False, False, True, True, True, True])
+
+        items = {item.movie_id: item for item in self.playlist.items.all()}
+        self.assertEqual(items[m1.id].status, PlaylistItem.Status.WATCHED)
+        self.assertEqual(items[m1.id].user_rating, 4)
+        self.assertEqual(items[m2.id].status, PlaylistItem.Status.WATCHING)
+        self.playlist.refresh_from_db()
+        self.assertEqual((self.playlist.movie_count, self.playlist.watched_count), (3, 1))
+
+    def test_remove_then_re_add_in_one_batch(self):
+        movie = self.movies[0]
+        PlaylistItem.objects.create(playlist=self.playlist, movie=movie, status=PlaylistItem.Status.WATCHED)
+
+        self.client.post(self.url, {"operations": [
+            {"op": "remove", "movie_id": movie.id},
+            {"op": "add", "movie_id": movie.id},
+        ]}, format="json")
+
+        item = PlaylistItem.objects.get(playlist=self.playlist, movie=movie)
+        self.assertEqual(item.status, PlaylistItem.Status.TO_WATCH)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        extra = [Movie.objects.create(title=f"Extra {i}") for i in range(40)]
+
+        def run(movies):
+            operations = [{"op": "add", "movie_id": movie.id} for movie in movies]
+            operations += [{"op": "set_status", "movie_id": movie.id, "status": "watched"} for movie in movies]
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.post(self.url, {"operations": operations}, format="json")
+            return len(ctx.captured_queries)
+
+        small = run(self.movies[:2])
+        large = run(extra)
+
+        self.assertEqual(small, large)
+
+    def test_removing_items_writes_tombstones_in_one_query(self):
+        def run(count):
+            movies = [Movie.objects.create(title=f"Removed {count}-{i}") for i in range(count)]
+            PlaylistItem.objects.bulk_create([PlaylistItem(playlist=self.playlist, movie=movie) for movie in movies])
+            operations = [{"op": "remove", "movie_id": movie.id} for movie in movies]
+            with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.url, {"operations": operations}, format="json")
+            self.assertEqual(response.data["applied"], count)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(run(2), run(50))
+        self.assertEqual(Tombstone.objects.filter(user=self.user, model="playlistitem").count(), 52)
+
+    def test_set_status_syncs_the_users_other_copies(self):
+        m0, m1, m2, _ = self.movies
+        other = Playlist.objects.create(user=self.user, title="Also here")
+        stranger = User.objects.create_user(username="stranger", password="password123")
+        strangers = Playlist.objects.create(user=stranger, title="Not mine")
+        for movie in (m0, m1, m2):
+            PlaylistItem.objects.create(playlist=self.playlist, movie=movie)
+            PlaylistItem.objects.create(playlist=other, movie=movie)
+        PlaylistItem.objects.create(playlist=strangers, movie=m0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {"operations": [
+                {"op": "set_status", "movie_id": m0.id, "status": "watched"},
+                {"op": "set_status", "movie_id": m1.id, "status": "watched"},
+                {"op": "set_status", "movie_id": m2.id, "status": "watching"},
+            ]}, format="json")
+
+        self.assertEqual(response.data["applied"], 3)
+        synced = [query["sql"] for query in ctx.captured_queries if query["sql"].startswith('UPDATE "playlist_playlistitem"')]
+        self.assertEqual(len(synced), 3)  # bulk_update + one per distinct status
+        statuses = dict(PlaylistItem.objects.filter(playlist=other).values_list("movie_id", "status"))
+        self.assertEqual(statuses, {m0.id: "watched", m1.id: "watched", m2.id: "watching"})
+        self.assertEqual(PlaylistItem.objects.get(playlist=strangers).status, PlaylistItem.Status.TO_WATCH)
+        other.refresh_from_db()
+        self.assertEqual(other.watched_count, 2)
+
+    def test_status_playlists_only_take_removes_and_ratings(self):
+        m0, m1, m2, _ = self.movies
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = status_playlists.create_status_playlists(self.user)
+        to_watch = Playlist.objects.get(pk=ids["to_watch"])
+        PlaylistItem.objects.create(playlist=to_watch, movie=m0)
+        PlaylistItem.objects.create(playlist=to_watch, movie=m1)
+
+        response = self.client.post(f"/api/playlists/{to_watch.id}/bulk/", {"operations": [
+            {"op": "add", "movie_id": m2.id},
+            {"op": "set_status", "movie_id": m0.id, "status": "watched"},
+            {"op": "set_rating", "movie_id": m0.id, "rating": 3},
+            {"op": "remove", "movie_id": m1.id},
+        ]}, format="json")
+
+        errors = [("error" in result) for result in response.data["results"]]
+        self.assertEqual(errors, [True, True, False, False])
+        item = PlaylistItem.objects.get(playlist=to_watch, movie=m0)
+        self.assertEqual((item.status, item.user_rating), (PlaylistItem.Status.TO_WATCH, 3))
+        self.assertEqual(set(to_watch.items.values_list("movie_id", flat=True)), {m0.id})
+
+    def test_requires_operations(self):
+        response = self.client.post(self.url, {"operations": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StatusTransitionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="mover", password="password123")
+        self.client.force_authenticate(self.user)
+        self.custom = Playlist.objects.create(user=self.user, title="Favourites of 1999")
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = status_playlists.create_status_playlists(self.user)
+        self.to_watch = Playlist.objects.get(pk=ids["to_watch"])
+        self.watched = Playlist.objects.get(pk=ids["watched"])
+        self.movie = Movie.objects.create(title="The Matrix", release_year=1999)
+        PlaylistItem.objects.create(playlist=self.to_watch, movie=self.movie)
+        PlaylistItem.objects.create(playlist=self.custom, movie=self.movie)
+
+    def test_add_movie_to_status_playlist_returns_target_item(self):
+        response = self.client.post(
+            f"/api/playlists/{self.to_watch.id}/add_movie/",
+            {"movie_id": self.movie.id, "status": "watched"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        item = PlaylistItem.objects.get(playlist=self.watched, movie=self.movie)
+        self.assertEqual(response.data["id"], item.id)
+        self.assertEqual(response.data["status"], "watched")
+        self.assertEqual(response.data["movie"]["title"], "The Matrix")
+        self.assertFalse(PlaylistItem.objects.filter(movie=self.movie).exclude(status="watched").exists())
+
+    @mock.patch("playlist.status_playlists.cache_is_process_local", return_value=False)
+    def test_status_transition_query_count(self, _):
+        # playlist, movie and user lookups, then one transaction (with savepoints):
+        # cross-playlist UPDATE, item SELECT + INSERT, counter refresh (owner
+        # lookup + UPDATE). The status playlist ID comes from the shared cache
+        # unchecked.
+        with self.assertNumQueries(12):
+            self.client.post(
+                f"/api/playlists/{self.to_watch.id}/add_movie/",
+                {"movie_id": self.movie.id, "status": "watched"},
+            )
+
+    @mock.patch("playlist.status_playlists.cache_is_process_local", return_value=False)
+    def test_status_transition_to_existing_item_query_count(self, _):
+        PlaylistItem.objects.create(playlist=self.watched, movie=self.movie)
+
+        with self.assertNumQueries(9):
+            response = self.client.post(
+                f"/api/playlists/{self.to_watch.id}/add_movie/",
+                {"movie_id": self.movie.id, "status": "watched"},
+            )
+        self.assertEqual(response.data["status"], "watched")
+
+    def test_process_local_cache_checks_the_status_playlist(self):
+        # One more query than with a shared cache
+        with self.assertNumQueries(13):
+            self.client.post(
+                f"/api/playlists/{self.to_watch.id}/add_movie/",
+                {"movie_id": self.movie.id, "status": "watched"},
+            )
+
+    def test_stale_cached_playlist_id_is_resolved_again(self):
+        # Another worker deleted the playlist; this worker's LocMemCache never heard of it
+        ids = status_playlists.get_status_playlist_ids(self.user)
+        Playlist.objects.filter(pk=self.watched.pk).delete()
+        cache.set(status_playlists._cache_key(self.user.pk), ids)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/api/playlists/{self.to_watch.id}/add_movie/",
+                {"movie_id": self.movie.id, "status": "watched"},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        watched = Playlist.objects.get(user=self.user, title="Watched")
+        self.assertNotEqual(watched.pk, self.watched.pk)
+        self.assertTrue(PlaylistItem.objects.filter(playlist=watched, movie=self.movie).exists())
+
+    def test_transition_is_atomic(self):
+        with mock.patch.object(PlaylistItem.objects, "get_or_create", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                self.client.post(
+                    f"/api/playlists/{self.to_watch.id}/add_movie/",
+                    {"movie_id": self.movie.id, "status": "watched"},
+                )
+
+        self.assertFalse(PlaylistItem.objects.filter(movie=self.movie, status="watched").exists())
+
+
+class StatusPlaylistCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="cached", password="password123")
+
+    def test_registration_seeds_status_playlists(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/auth/register/",
+                {"username": "newbie", "email": "newbie@example.com", "password": "password123"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        user = User.objects.get(username="newbie")
+        playlists = dict(
+            Playlist.objects.filter(user=user, is_status_playlist=True).values_list("title", "pk")
+        )
+        self.assertEqual(len(playlists), 4)
+
+        with self.assertNumQueries(0):
+            ids = status_playlists.get_status_playlist_ids(user)
+        self.assertEqual(ids["watched"], playlists["Watched"])
+        self.assertEqual(ids["did_not_finish"], playlists["Did Not Finish"])
+
+    def test_missing_playlists_are_created_and_flagged(self):
+        watched = Playlist.objects.create(user=self.user, title="Watched")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = status_playlists.get_status_playlist_ids(self.user)
+
+        self.assertEqual(ids["watched"], watched.pk)
+        self.assertEqual(Playlist.objects.filter(user=self.user, is_status_playlist=True).count(), 4)
+        with self.assertNumQueries(0):
+            status_playlists.get_status_playlist_ids(self.user)
+
+    def test_rename_and_delete_invalidate_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = status_playlists.create_status_playlists(self.user)
+
+        # Bumping updated_at leaves the mapping alone
+        watched = Playlist.objects.get(pk=ids["watched"])
+        watched.save(update_fields=["updated_at"])
+        with self.assertNumQueries(0):
+            status_playlists.get_status_playlist_ids(self.user)
+
+        watched.title = "Seen it"
+        watched.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = status_playlists.get_status_playlist_ids(self.user)
+        self.assertNotEqual(ids["watched"], watched.pk)
+
+        Playlist.objects.get(pk=ids["watching"]).delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            new_ids = status_playlists.get_status_playlist_ids(self.user)
+        self.assertNotEqual(new_ids["watching"], ids["watching"])
+        self.assertTrue(Playlist.objects.filter(pk=new_ids["watching"], title="Watching").exists())
+
+
+class LibraryStateTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="grid", password="password123")
+        self.client.force_authenticate(self.user)
+        self.fight_club = Movie.objects.create(title="Fight Club", tmdb_id=550, media_type="movie")
+        self.show = Movie.objects.create(title="Breaking Bad", tmdb_id=1396, media_type="tv")
+        # Same TMDB id as the show but a movie; must not be confused with it
+        Movie.objects.create(title="Other", tmdb_id=1396, media_type="movie")
+
+        Favorite.objects.create(user=self.user, movie=self.fight_club)
+        Review.objects.create(user=self.user, movie=self.fight_club, rating=5)
+        watching = Playlist.objects.create(user=self.user, title="Watching", is_status_playlist=True)
+        PlaylistItem.objects.create(playlist=watching, movie=self.show, status="watching", user_rating=4)
+
+        other = User.objects.create_user(username="someone", password="password123")
+        Favorite.objects.create(user=other, movie=self.show)
+
+    def test_check_bulk_uses_one_query(self):
+        items = [
+            {"tmdb_id": 550, "media_type": "movie"},
+            {"tmdb_id": 1396, "media_type": "tv"},
+            {"tmdb_id": 1396, "media_type": "movie"},
+            {"tmdb_id": 999999},
+        ]
+        with self.assertNumQueries(1):
+            response = self.client.post("/api/favorites/check_bulk/", {"items": items}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [
+            {"tmdb_id": 550, "media_type": "movie", "is_favorite": True, "playlist_status": None, "my_rating": 5},
+            {"tmdb_id": 1396, "media_type": "tv", "is_favorite": False, "playlist_status": "watching", "my_rating": 4},
+            {"tmdb_id": 1396, "media_type": "movie", "is_favorite": False, "playlist_status": None, "my_rating": None},
+            {"tmdb_id": 999999, "media_type": "movie", "is_favorite": False, "playlist_status": None, "my_rating": None},
+        ])
+
+    def test_check_bulk_validates_items(self):
+        response = self.client.post("/api/favorites/check_bulk/", {"items": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_results_are_decorated_without_touching_cache(self):
+        payload = {"page": 1, "results": [
+            {"id": 550, "media_type": "movie", "title": "Fight Club"},
+            {"id": 1396, "media_type": "tv", "name": "Breaking Bad"},
+        ]}
+        with mock.patch("playlist.views.search_tmdb", return_value=payload):
+            with self.assertNumQueries(1):
+                response = self.client.get("/api/tmdb/search/", {"query": "fight"})
+
+        first, second = response.data["results"]
+        self.assertTrue(first["is_favorite"])
+        self.assertEqual(first["my_rating"], 5)
+        self.assertEqual(second["playlist_status"], "watching")
+        self.assertNotIn("is_favorite", payload["results"][0])
+
+    def test_anonymous_results_are_not_decorated(self):
+        self.client.force_authenticate(None)
+        payload = {"page": 1, "results": [{"id": 550, "media_type": "movie"}]}
+        with mock.patch("playlist.views.get_tmdb_popular", return_value=payload):
+            with self.assertNumQueries(0):
+                response = self.client.get("/api/tmdb/popular/")
+
+        self.assertEqual(response.data, payload)
+
+    def test_enrich_adds_library_block_with_fixed_queries(self):
+        payload = {"page": 1, "results": [
+            {"id": 550, "media_type": "movie"},
+            {"id": 1396, "media_type": "tv"},
+            {"id": 424242, "media_type": "movie"},
+        ]}
+        with mock.patch("playlist.views.get_tmdb_top_rated", return_value=payload):
+            # movies, playlist items, favorites, reviews
+            with self.assertNumQueries(4):
+                response = self.client.get("/api/tmdb/top-rated/", {"enrich": "1"})
+
+        fight_club, show, unknown = response.data["results"]
+        self.assertEqual(fight_club["library"]["movie_id"], self.fight_club.id)
+        self.assertTrue(fight_club["library"]["is_favorite"])
+        self.assertEqual(fight_club["library"]["review"]["rating"], 5)
+        self.assertEqual(fight_club["my_rating"], 5)
+        self.assertEqual([p["title"] for p in show["library"]["playlists"]], ["Watching"])
+        self.assertEqual(show["playlist_status"], "watching")
+        self.assertEqual(show["my_rating"], 4)
+        self.assertIsNone(unknown["library"])
+        self.assertFalse(unknown["is_favorite"])
+
+    def test_enrich_for_anonymous_only_maps_local_movies(self):
+        self.client.force_authenticate(None)
+        payload = {"page": 1, "results": [{"id": 550, "media_type": "movie"}]}
+        with mock.patch("playlist.views.search_tmdb", return_value=payload):
+            with self.assertNumQueries(1):
+                response = self.client.get("/api/tmdb/search/", {"query": "fight", "enrich": "true"})
+
+        result = response.data["results"][0]
+        self.assertEqual(result["library"]["movie_id"], self.fight_club.id)
+        self.assertNotIn("is_favorite", result)
+
+
+@override_settings(TMDB_API_KEY="test-key")
+class BatchMovieImportTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="importer", password="password123")
+        self.client.force_authenticate(self.user)
+        self.existing = Movie.objects.create(title="Fight Club", tmdb_id=550, media_type="movie")
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def fake_tmdb(self, path, params=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+
+        kind, tmdb_id = path.split("/")
+        if tmdb_id == "404":
+            return _tmdb_response({}, status_code=404)
+        if kind == "tv":
+            return _tmdb_response({"id": int(tmdb_id), "name": f"Show {tmdb_id}", "first_air_date": "2008-01-20"})
+        return _tmdb_response({"id": int(tmdb_id), "title": f"Movie {tmdb_id}", "release_date": "1999-03-31"})
+
+    def test_batch_resolves_hits_and_fetches_misses_concurrently(self):
+        items = [
+            {"tmdb_id": 550, "media_type": "movie"},
+            {"tmdb_id": 603, "media_type": "movie"},
+            {"tmdb_id": 1396, "media_type": "tv"},
+            {"tmdb_id": 604, "media_type": "movie"},
+            {"tmdb_id": 605, "media_type": "movie"},
+            {"tmdb_id": 404, "media_type": "movie"},
+            {"tmdb_id": 603, "media_type": "movie"},
+        ]
+        with mock.patch("playlist.services._tmdb_get", side_effect=self.fake_tmdb) as mock_get:
+            # lookup, bulk insert, read-back
+            with self.assertNumQueries(3):
+                response = self.client.post("/api/movies/batch/", {"items": items}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(mock_get.call_count, 5)
+        self.assertGreater(self.max_active, 1)
+
+        results = response.data["results"]
+        self.assertEqual([r["tmdb_id"] for r in results], [550, 603, 1396, 604, 605])
+        self.assertFalse(results[0]["created"])
+        self.assertEqual(results[0]["movie"]["id"], self.existing.id)
+        self.assertTrue(results[2]["created"])
+        self.assertEqual(results[2]["movie"]["title"], "Show 1396")
+        self.assertEqual(results[2]["movie"]["release_year"], 2008)
+        self.assertEqual(response.data["errors"], [
+            {"tmdb_id": 404, "media_type": "movie", "error": "Movie 404 not found"},
+        ])
+        self.assertEqual(Movie.objects.count(), 5)
+
+    def test_batch_needs_a_user_and_is_throttled(self):
+        items = [{"tmdb_id": 550, "media_type": "movie"}]
+        self.client.force_authenticate(None)
+        response = self.client.post("/api/movies/batch/", {"items": items}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(self.user)
+        with mock.patch.dict(TMDBBatchThrottle.THROTTLE_RATES, {"tmdb_batch": "2/hour"}):
+            codes = [self.client.post("/api/movies/batch/", {"items": items}, format="json").status_code
+                     for _ in range(3)]
+        self.assertEqual(codes, [200, 200, 429])
+
+    def test_rows_inserted_concurrently_are_not_duplicated(self):
+        # Another request inserted the title after our initial lookup missed it
+        raced = Movie.objects.create(title="Raced", tmdb_id=603, media_type="movie")
+        real_lookup = Movie.objects.for_tmdb_pairs
+        lookups = iter([lambda pairs: Movie.objects.none(), real_lookup])
+
+        with mock.patch("playlist.services._tmdb_get", return_value=_tmdb_response({"id": 603, "title": "The Matrix"})):
+            with mock.patch.object(Movie.objects, "for_tmdb_pairs", side_effect=lambda pairs: next(lookups)(pairs)):
+                movies, created, errors = services.get_or_create_movies_from_tmdb([(603, "movie")])
+
+        self.assertEqual(Movie.objects.filter(tmdb_id=603).count(), 1)
+        self.assertEqual(movies[(603, "movie")].pk, raced.pk)
+        self.assertEqual(errors, {})
+
+
+@override_settings(TMDB_API_KEY="test-key")
+class ConcurrentMovieCreationTests(TransactionTestCase):
+    THREADS = 12
+
+    def setUp(self):
+        # Shared-cache in-memory SQLite fails concurrent writers with "table is
+        # locked" instead of waiting; run these against Postgres or a file DB
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("needs a database that supports concurrent writers")
+        cache.clear()
+
+    def run_concurrently(self, work):
+        """Run work(i) on THREADS threads released at the same moment."""
+        barrier = threading.Barrier(self.THREADS)
+        results = [None] * self.THREADS
+        errors = []
+
+        def run(i):
+            try:
+                barrier.wait()
+                results[i] = work(i)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return results
+
+    def slow_tmdb(self, path, params=None):
+        # Long enough for every thread to miss the local lookup
+        time.sleep(0.2)
+        return _tmdb_response({"id": 603, "title": "The Matrix", "release_date": "1999-03-31"})
+
+    def test_same_new_title_is_fetched_once_and_inserted_once(self):
+        with mock.patch("playlist.services._tmdb_get", side_effect=self.slow_tmdb) as mock_get:
+            results = self.run_concurrently(lambda i: services.get_or_create_movie_from_tmdb(603, "movie"))
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(Movie.objects.filter(tmdb_id=603, media_type="movie").count(), 1)
+        self.assertEqual(len({movie.pk for movie, _ in results}), 1)
+
+    def test_concurrent_favorites_for_new_title(self):
+        users = [User.objects.create_user(username=f"fan{i}", password="password123") for i in range(self.THREADS)]
+
+        def favorite(i):
+            client = APIClient()
+            client.force_authenticate(users[i % 3])
+            return client.post("/api/favorites/", {"tmdb_id": 603, "media_type": "movie"}).status_code
+
+        with mock.patch("playlist.services._tmdb_get", side_effect=self.slow_tmdb):
+            codes = self.run_concurrently(favorite)
+
+        self.assertNotIn(status.HTTP_500_INTERNAL_SERVER_ERROR, codes)
+        self.assertEqual(codes.count(status.HTTP_201_CREATED), 3)
+        self.assertEqual(Movie.objects.filter(tmdb_id=603).count(), 1)
+        self.assertEqual(Favorite.objects.count(), 3)
+
+
+@override_settings(TMDB_API_KEY="test-key", TMDB_IMAGE_BASE="https://img.test/w500")
+class RefreshTMDBMetadataTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.matrix = Movie.objects.create(title="Matrix (old)", tmdb_id=603, media_type="movie")
+        self.fight_club = Movie.objects.create(title="Fight Club", tmdb_id=550, media_type="movie", tmdb_etag='"fc-1"')
+        self.gone = Movie.objects.create(title="Removed", tmdb_id=404, media_type="tv")
+        self.fresh = Movie.objects.create(title="Fresh", tmdb_id=13, media_type="movie")
+        self.stale_at = timezone.now() - timedelta(days=3)
+        Movie.objects.exclude(pk=self.fresh.pk).update(updated_at=self.stale_at)
+
+    def fake_tmdb(self, path, params=None, headers=None):
+        if path == "movie/550" and (headers or {}).get("If-None-Match") == '"fc-1"':
+            return _tmdb_response({}, status_code=304)
+        if path == "movie/603":
+            return _tmdb_response(
+                {
+                    "title": "The Matrix",
+                    "overview": "Neo wakes up.",
+                    "release_date": "1999-03-31",
+                    "poster_path": "/matrix.jpg",
+                    "videos": {"results": [{"site": "YouTube", "key": "vKQi3bBA1y8"}]},
+                },
+                headers={"ETag": '"m-2"'},
+            )
+        return _tmdb_response({}, status_code=404)
+
+    def test_refreshes_stale_movies_with_conditional_requests(self):
+        out = StringIO()
+        with mock.patch("playlist.services._tmdb_get", side_effect=self.fake_tmdb) as mock_get, mock.patch(
+            "playlist.management.commands.refresh_tmdb_metadata.invalidate_movie_versions"
+        ) as invalidate:
+            call_command("refresh_tmdb_metadata", "--rate", "0", stdout=out, stderr=StringIO())
+
+        self.assertEqual(mock_get.call_count, 3)
+        # Only the movie whose metadata changed invalidates playlist ETags
+        invalidate.assert_called_once_with([self.matrix.pk])
+        self.assertIn("Refreshed 1 movie(s), 1 unchanged, 1 not found, 0 failure(s)", out.getvalue())
+
+        self.matrix.refresh_from_db()
+        self.assertEqual(self.matrix.title, "The Matrix")
+        self.assertEqual(self.matrix.poster_url, "https://img.test/w500/matrix.jpg")
+        self.assertEqual(self.matrix.release_year, 1999)
+        self.assertEqual(self.matrix.youtube_id, "vKQi3bBA1y8")
+        self.assertEqual(self.matrix.tmdb_etag, '"m-2"')
+        self.assertEqual(self.matrix.detail_snapshot.data["title"], "The Matrix")
+
+        # Unchanged and missing titles move to the back of the queue untouched
+        self.fight_club.refresh_from_db()
+        self.assertEqual(self.fight_club.title, "Fight Club")
+        self.assertGreater(self.fight_club.updated_at, self.stale_at)
+        self.gone.refresh_from_db()
+        self.assertGreater(self.gone.updated_at, self.stale_at)
+
+        # The fresh payload also reaches the details cache
+        with mock.patch("playlist.services._tmdb_get") as mock_get:
+            self.assertEqual(services.get_tmdb_movie_details(603)["title"], "The Matrix")
+        mock_get.assert_not_called()
+
+    def test_transient_failures_keep_their_place(self):
+        with mock.patch("playlist.services._tmdb_get", side_effect=ConnectionError("boom")):
+            call_command("refresh_tmdb_metadata", "--rate", "0", "--limit", "1", stdout=StringIO(), stderr=StringIO())
+
+        self.assertEqual(Movie.objects.filter(updated_at=self.stale_at).count(), 3)
+
+    def test_rate_limiter_spaces_calls(self):
+        limiter = tmdb_client.RateLimiter(50)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+@override_settings(TMDB_API_KEY="test-key")
+class LocalDetailTests(APITestCase):
+    PAYLOAD = {"id": 603, "title": "The Matrix", "overview": "Neo wakes up.", "release_date": "1999-03-31"}
+
+    def setUp(self):
+        cache.clear()
+        self.movie = Movie.objects.create(title="Matrix (old)", tmdb_id=603, media_type="movie")
+        self.url = "/api/tmdb/movies/603/local/"
+
+    def test_first_request_stores_snapshot_then_serves_locally(self):
+        with mock.patch("playlist.services._tmdb_get", return_value=_tmdb_response(self.PAYLOAD, headers={"ETag": '"v1"'})):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "The Matrix")
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.title, "The Matrix")
+        self.assertEqual(self.movie.tmdb_etag, '"v1"')
+        self.assertEqual(self.movie.detail_snapshot.data, self.PAYLOAD)
+
+        with mock.patch("playlist.services._tmdb_get") as mock_get:
+            with self.assertNumQueries(1):
+                again = self.client.get(self.url)
+        mock_get.assert_not_called()
+        self.assertEqual(again.data, self.PAYLOAD)
+        self.assertEqual(again["ETag"], response["ETag"])
+
+    def test_conditional_requests_get_304(self):
+        MovieDetailSnapshot.build(self.movie, self.PAYLOAD).save()
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_stale_snapshot_is_revalidated_with_etag(self):
+        stale = timezone.now() - timedelta(days=2)
+        Movie.objects.filter(pk=self.movie.pk).update(tmdb_etag='"v1"')
+        MovieDetailSnapshot.build(self.movie, self.PAYLOAD, now=stale).save()
+
+        with mock.patch("playlist.services._tmdb_get", return_value=_tmdb_response({}, status_code=304)) as mock_get:
+            response = self.client.get(self.url)
+
+        self.assertEqual(mock_get.call_args.kwargs["headers"], {"If-None-Match": '"v1"'})
+        self.assertEqual(response.data, self.PAYLOAD)
+        snapshot = MovieDetailSnapshot.objects.get(pk=self.movie.pk)
+        self.assertFalse(snapshot.is_stale())
+        self.assertEqual(snapshot.changed_at, stale)
+
+    def test_stale_snapshot_is_served_when_tmdb_fails(self):
+        MovieDetailSnapshot.build(self.movie, self.PAYLOAD, now=timezone.now() - timedelta(days=2)).save()
+
+        with mock.patch("playlist.services._tmdb_get", side_effect=ConnectionError("down")):
+            with self.assertLogs("playlist.services", "WARNING"):
+                response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, self.PAYLOAD)
+
+    def test_racing_first_fetch_does_not_fail(self):
+        def fetch_while_another_worker_saves(*args, **kwargs):
+            # The other worker's snapshot lands between our read and our write
+            MovieDetailSnapshot.build(self.movie, {"id": 603, "title": "Other"}).save()
+            return _tmdb_response(self.PAYLOAD, headers={"ETag": '"v1"'})
+
+        with mock.patch("playlist.services._tmdb_get", side_effect=fetch_while_another_worker_saves):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(MovieDetailSnapshot.objects.get(pk=self.movie.pk).data, self.PAYLOAD)
+
+    def test_revalidation_in_another_worker_is_waited_for(self):
+        MovieDetailSnapshot.build(self.movie, self.PAYLOAD, now=timezone.now() - timedelta(days=2)).save()
+        key = tmdb_cache.make_cache_key("snapshot", {"tmdb_id": 603, "media_type": "movie"})
+        cache.add(f"{key}:lock", 1)
+
+        def other_worker():
+            MovieDetailSnapshot.objects.filter(pk=self.movie.pk).update(fetched_at=timezone.now())
+            cache.delete(f"{key}:lock")
+
+        # Runs while this worker polls the lock (same connection, so the write is visible)
+        with mock.patch("playlist.tmdb_cache.time.sleep", side_effect=lambda _: other_worker()), \
+                mock.patch("playlist.services._tmdb_get") as mock_get:
+            response = self.client.get(self.url)
+
+        mock_get.assert_not_called()
+        self.assertEqual(response.data, self.PAYLOAD)
+
+    def test_unknown_title_is_proxied_without_snapshot(self):
+        with mock.patch("playlist.services._tmdb_get", return_value=_tmdb_response({"id": 1396, "name": "Breaking Bad"})):
+            response = self.client.get("/api/tmdb/tv/1396/local/")
+
+        self.assertEqual(response.data["name"], "Breaking Bad")
+        self.assertNotIn("ETag", response)
+        self.assertFalse(Movie.objects.filter(tmdb_id=1396).exists())
+
+
+@override_settings(TMDB_API_KEY="test-key", TMDB_IMAGE_BASE="https://img.test/w500")
+class TVCatalogueTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="binge", password="password123")
+        self.client.force_authenticate(self.user)
+        self.series = Movie.objects.create(title="Breaking Bad", tmdb_id=1396, media_type="tv")
+        EpisodeProgress.objects.create(
+            user=self.user, series=self.series, season=1, episode=2, status="completed", rating=4
+        )
+        self.episode_counts = {1: 3, 2: 2}
+
+    def fake_tmdb(self, path, params=None):
+        if path == "tv/1396":
+            return _tmdb_response({"id": 1396, "seasons": [{"season_number": n} for n in self.episode_counts]})
+        number = int(path.rsplit("/", 1)[1])
+        return _tmdb_response({
+            "name": f"Season {number}",
+            "air_date": "2008-01-20",
+            "episodes": [
+                {"episode_number": n, "name": f"S{number}E{n}", "runtime": 47, "still_path": f"/s{number}e{n}.jpg"}
+                for n in range(1, self.episode_counts[number] + 1)
+            ],
+        })
+
+    def test_catalogue_is_filled_once_then_served_locally(self):
+        url = "/api/episode-progress/catalogue/"
+        with mock.patch("playlist.services._tmdb_get", side_effect=self.fake_tmdb) as mock_get:
+            response = self.client.get(url, {"series": self.series.id})
+        self.assertEqual(mock_get.call_count, 3)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first, second = response.data["seasons"]
+        self.assertEqual(first["name"], "Season 1")
+        self.assertEqual([e["status"] for e in first["episodes"]], ["not_started", "completed", "not_started"])
+        self.assertEqual(first["episodes"][1]["rating"], 4)
+        self.assertEqual(first["episodes"][0]["still_url"], "https://img.test/w500/s1e1.jpg")
+        self.assertEqual(len(second["episodes"]), 2)
+
+        cache.clear()
+        with mock.patch("playlist.services._tmdb_get") as mock_get:
+            # series, stored seasons, episodes joined with progress
+            with self.assertNumQueries(3):
+                again = self.client.get(url, {"series": self.series.id})
+        mock_get.assert_not_called()
+        self.assertEqual(again.data, response.data)
+
+    def test_single_season_is_fetched_lazily(self):
+        with mock.patch("playlist.services._tmdb_get", side_effect=self.fake_tmdb) as mock_get:
+            response = self.client.get("/api/episode-progress/catalogue/", {"series": self.series.id, "season": 2})
+
+        mock_get.assert_called_once()
+        self.assertEqual([s["season_number"] for s in response.data["seasons"]], [2])
+        self.assertFalse(Season.objects.filter(season_number=1).exists())
+
+    def test_refresh_command_updates_stale_seasons_and_finds_new_ones(self):
+        with mock.patch("playlist.services._tmdb_get", side_effect=self.fake_tmdb):
+            tv_catalogue.ensure_series_catalogue(self.series)
+        Season.objects.update(fetched_at=timezone.now() - timedelta(days=30))
+        self.episode_counts = {1: 4, 2: 2, 3: 1}
+
+        out = StringIO()
+        cache.clear()
+        with mock.patch("playlist.services._tmdb_get", side_effect=self.fake_tmdb):
+            call_command("refresh_tv_catalogue", "--rate", "0", stdout=out)
+
+        self.assertIn("Refreshed 2 season(s), 0 failure(s)", out.getvalue())
+        self.assertEqual(Episode.objects.filter(season__season_number=1).count(), 4)
+        self.assertEqual(Season.objects.get(season_number=1).episode_count, 4)
+        self.assertTrue(Season.objects.filter(season_number=3).exists())
+
+
+class SeriesProgressSummaryTests(APITestCase):
+    url = "/api/episode-progress/summary/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="tracker", password="password123")
+        self.client.force_authenticate(self.user)
+        self.series = Movie.objects.create(title="Dark", tmdb_id=70523, media_type="tv")
+        self.other = Movie.objects.create(title="Severance", tmdb_id=95396, media_type="tv")
+        season = Season.objects.create(series=self.series, season_number=1, episode_count=3, fetched_at=timezone.now())
+        Episode.objects.bulk_create([
+            Episode(season=season, episode_number=n, name=f"Episode {n}") for n in (1, 2, 3)
+        ])
+        for episode, progress in ((1, "completed"), (2, "completed"), (3, "in_progress")):
+            EpisodeProgress.objects.create(
+                user=self.user, series=self.series, season=1, episode=episode, status=progress
+            )
+        EpisodeProgress.objects.create(user=self.user, series=self.other, season=1, episode=1, status="in_progress")
+
+    def test_summary_per_series(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        other, dark = response.data
+        self.assertEqual(dark["title"], "Dark")
+        self.assertEqual((dark["completed"], dark["in_progress"], dark["total_episodes"]), (2, 1, 3))
+        self.assertEqual(dark["last_watched"], {"season": 1, "episode": 2})
+        self.assertEqual(dark["next_up"], {"season": 1, "episode": 3, "name": "Episode 3"})
+        # Not catalogued yet
+        self.assertEqual((other["completed"], other["in_progress"]), (0, 1))
+        self.assertIsNone(other["last_watched"])
+        self.assertIsNone(other["total_episodes"])
+        self.assertIsNone(other["next_up"])
+
+    def test_list_most_recent_first(self):
+        EpisodeProgress.objects.filter(series=self.series, episode=1).update(
+            updated_at=timezone.now() + timedelta(minutes=5)
+        )
+        response = self.client.get("/api/episode-progress/", {"ordering": "-updated_at"})
+        first = response.data["results"][0]
+        self.assertEqual((first["series"], first["episode"]), (self.series.id, 1))
+
+    def test_summary_is_cached_until_progress_changes(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        progress = EpisodeProgress.objects.get(series=self.series, episode=3)
+        self.client.patch(f"/api/episode-progress/{progress.id}/", {"status": "completed"}, format="json")
+        dark = self.client.get(self.url).data[0]
+        self.assertEqual(dark["completed"], 3)
+        self.assertIsNone(dark["next_up"])
+
+        self.client.delete(f"/api/episode-progress/{progress.id}/")
+        dark = next(s for s in self.client.get(self.url).data if s["series"] == self.series.id)
+        self.assertEqual(dark["last_watched"], {"season": 1, "episode": 2})
+
+
+class BulkEpisodeProgressTests(APITestCase):
+    url = "/api/episode-progress/bulk/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="marker", password="password123")
+        self.client.force_authenticate(self.user)
+        self.series = Movie.objects.create(title="The Wire", tmdb_id=1438, media_type="tv")
+        EpisodeProgress.objects.create(
+            user=self.user, series=self.series, season=1, episode=3, status="in_progress", notes="paused", rating=5
+        )
+
+    def test_marks_season_in_one_upsert(self):
+        payload = {"series": self.series.id, "season": 1, "last_episode": 13, "status": "completed"}
+        # series lookup, then count + upsert inside savepoint/release
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["marked"], 13)
+        self.assertEqual(response.data["created"], 12)
+        self.assertEqual(response.data["updated"], 1)
+        rows = EpisodeProgress.objects.filter(user=self.user, series=self.series, season=1)
+        self.assertEqual(rows.filter(status="completed").count(), 13)
+        kept = rows.get(episode=3)
+        self.assertEqual((kept.notes, kept.rating), ("paused", 5))
+
+        again = self.client.post(self.url, payload, format="json")
+        self.assertEqual((again.data["created"], again.data["updated"]), (0, 13))
+        self.assertEqual(rows.count(), 13)
+
+    def test_invalidates_summary(self):
+        self.client.get("/api/episode-progress/summary/")
+        self.client.post(self.url, {"series": self.series.id, "season": 1, "first_episode": 1,
+                                    "last_episode": 2, "status": "completed"}, format="json")
+        summary = self.client.get("/api/episode-progress/summary/").data[0]
+        self.assertEqual(summary["completed"], 2)
+
+    def test_rejects_bad_ranges(self):
+        movie = Movie.objects.create(title="Heat", tmdb_id=949, media_type="movie")
+        for payload in (
+            {"series": self.series.id, "season": 1, "first_episode": 5, "last_episode": 4, "status": "completed"},
+            {"series": self.series.id, "season": 1, "last_episode": 501, "status": "completed"},
+            {"series": movie.id, "season": 1, "last_episode": 2, "status": "completed"},
+            {"series": self.series.id, "season": 1, "last_episode": 2, "status": "watched"},
+        ):
+            response = self.client.post(self.url, payload, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, payload)
+        self.assertEqual(EpisodeProgress.objects.count(), 1)
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="pager", password="password123")
+        self.client.force_authenticate(self.user)
+        self.series = Movie.objects.create(title="Lost", tmdb_id=4607, media_type="tv")
+        EpisodeProgress.objects.bulk_create([
+            EpisodeProgress(user=self.user, series=self.series, season=season, episode=episode, status="completed")
+            for season in (1, 2, 3)
+            for episode in range(1, 9)
+        ])
+        movies = Movie.objects.bulk_create([
+            Movie(title=f"Film {n}", tmdb_id=500 + n, media_type="movie") for n in range(25)
+        ])
+        favorites = Favorite.objects.bulk_create([Favorite(user=self.user, movie=movie) for movie in movies])
+        # Several favorites share a timestamp so the id tie-breaker matters
+        base = timezone.now()
+        for index, favorite in enumerate(favorites):
+            Favorite.objects.filter(pk=favorite.pk).update(added_at=base - timedelta(minutes=index // 3))
+
+    def walk(self, url, params=None):
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            if not response.data["next"]:
+                return pages
+            response = self.client.get(response.data["next"])
+
+    def test_pages_follow_natural_ordering(self):
+        pages = self.walk("/api/episode-progress/", {"page_size": 10})
+        self.assertEqual([len(page["results"]) for page in pages], [10, 10, 4])
+        self.assertNotIn("count", pages[0])
+        self.assertIsNone(pages[0]["previous"])
+        episodes = [(row["season"], row["episode"]) for page in pages for row in page["results"]]
+        self.assertEqual(episodes, sorted(episodes))
+        self.assertEqual(len(set(episodes)), 24)
+
+        favorites = self.walk("/api/favorites/", {"page_size": 4})
+        ids = [row["id"] for page in favorites for row in page["results"]]
+        expected = list(
+            Favorite.objects.filter(user=self.user).order_by("-added_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_the_same_page(self):
+        first = self.client.get("/api/favorites/", {"page_size": 5}).data
+        second = self.client.get(first["next"]).data
+        back = self.client.get(second["previous"]).data
+        self.assertEqual(back["results"], first["results"])
+        self.assertIsNone(back["previous"])
+        self.assertEqual(self.client.get(back["next"]).data["results"], second["results"])
+
+    def test_deep_page_uses_keyset_query(self):
+        first = self.client.get("/api/episode-progress/", {"page_size": 10}).data
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first["next"])
+        sql = " ".join(query["sql"] for query in queries.captured_queries)
+        self.assertNotIn("COUNT(", sql)
+        self.assertNotIn("OFFSET", sql)
+
+    def test_cursor_predicate_can_seek_the_ordering_index(self):
+        playlist = Playlist.objects.create(user=self.user, title="All")
+        PlaylistItem.objects.bulk_create([
+            PlaylistItem(playlist=playlist, movie=movie) for movie in Movie.objects.filter(media_type="movie")
+        ])
+        first = self.client.get("/api/playlist-items/", {"page_size": 10}).data
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(first["next"]).data
+        self.assertEqual(len(second["results"]), 10)
+        # A leading range bound on added_at ahead of the (added_at, id) OR chain
+        self.assertRegex(queries.captured_queries[0]["sql"], r'WHERE \("playlist_playlistitem"."added_at" <= ')
+        if connection.vendor == "sqlite":
+            pagination = KeysetPagination()
+            pagination.ordering = pagination.get_ordering(PlaylistItem.objects.all())
+            last = PlaylistItem.objects.get(pk=first["results"][-1]["id"])
+            plan = PlaylistItem.objects.filter(
+                pagination.after(pagination.ordering, [last.added_at, last.id])
+            ).order_by("-added_at", "-id")[:10].explain()
+            self.assertIn("playlistitem_added_idx", plan)
+
+    def test_page_number_is_opt_in(self):
+        response = self.client.get("/api/episode-progress/", {"page": 2})
+        self.assertEqual(response.data["count"], 24)
+        self.assertEqual(len(response.data["results"]), 4)
+
+    def test_invalid_cursor(self):
+        for cursor in ("not-a-cursor", "eyJ2IjogWzFdfQ"):
+            response = self.client.get("/api/reviews/", {"cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CommitBatchTests(TransactionTestCase):
+    def test_one_flush_per_committed_transaction(self):
+        flushed = []
+        batch = CommitBatch(list, flushed.append)
+        with transaction.atomic():
+            for n in range(3):
+                with batch.queue() as data:
+                    data.append(n)
+        with batch.queue() as data:
+            data.append("autocommit")
+        self.assertEqual(flushed, [[0, 1, 2], ["autocommit"]])
+
+    def test_rolled_back_batch_is_not_reused(self):
+        flushed = []
+        batch = CommitBatch(list, flushed.append)
+        try:
+            with transaction.atomic():
+                with batch.queue() as data:
+                    data.append("rolled back")
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        # Same (empty) savepoint stack as the rolled-back transaction
+        with transaction.atomic():
+            with batch.queue() as data:
+                data.append("committed")
+        self.assertEqual(flushed, [["committed"]])
+
+
+class DeltaSyncTests(APITestCase):
+    url = "/api/sync/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="offline", password="password123")
+        self.other = User.objects.create_user(username="someone", password="password123")
+        self.client.force_authenticate(self.user)
+        self.movie = Movie.objects.create(title="Arrival", tmdb_id=329865, media_type="movie")
+        self.series = Movie.objects.create(title="Fargo", tmdb_id=60622, media_type="tv")
+        self.playlist = Playlist.objects.create(user=self.user, title="Sci-fi")
+        self.item = PlaylistItem.objects.create(playlist=self.playlist, movie=self.movie)
+        self.favorite = Favorite.objects.create(user=self.user, movie=self.movie)
+        Review.objects.create(user=self.user, movie=self.movie, rating=5)
+        EpisodeProgress.objects.create(user=self.user, series=self.series, season=1, episode=1, status="completed")
+        Favorite.objects.create(user=self.other, movie=self.movie)
+
+    def sync(self, since=None):
+        response = self.client.get(self.url, {"since": since} if since else None)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_first_sync_is_full(self):
+        data = self.sync()
+        self.assertTrue(data["full"])
+        self.assertEqual([p["id"] for p in data["playlists"]], [self.playlist.id])
+        self.assertEqual(data["playlist_items"][0]["playlist"], self.playlist.id)
+        self.assertEqual(len(data["favorites"]), 1)
+        self.assertEqual(len(data["reviews"]), 1)
+        self.assertEqual(len(data["episode_progress"]), 1)
+        self.assertTrue(data["watermark"].endswith("Z"))
+
+    @override_settings(SYNC_WATERMARK_OVERLAP=0)
+    def test_incremental_sync_returns_only_changes_and_deletions(self):
+        watermark = self.sync()["watermark"]
+        # Nothing changed
+        with self.assertNumQueries(6):
+            data = self.sync(watermark)
+        self.assertFalse(data["full"])
+        self.assertEqual(data["playlists"], [])
+        self.assertEqual(data["deleted"]["favorites"], [])
+
+        favorite_id = self.favorite.id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/favorites/{favorite_id}/")
+        self.client.patch(f"/api/playlists/{self.playlist.id}/update_item_status/{self.movie.id}/",
+                          {"status": "watched"}, format="json")
+        self.client.post("/api/episode-progress/bulk/", {"series": self.series.id, "season": 1,
+                                                          "last_episode": 2, "status": "completed"}, format="json")
+
+        data = self.sync(watermark)
+        self.assertEqual(data["deleted"]["favorites"], [favorite_id])
+        self.assertEqual(data["favorites"], [])
+        self.assertEqual([i["status"] for i in data["playlist_items"]], ["watched"])
+        # The playlist's counters changed with it
+        self.assertEqual(data["playlists"][0]["watched_count"], 1)
+        self.assertEqual(len(data["episode_progress"]), 2)
+        self.assertEqual(data["reviews"], [])
+
+    def test_cascaded_deletes_are_recorded(self):
+        watermark = self.sync()["watermark"]
+        playlist_id, item_id = self.playlist.id, self.item.id
+        more = [PlaylistItem.objects.create(playlist=self.playlist, movie=Movie.objects.create(title=f"Extra {n}")).id
+                for n in range(20)]
+        # Owner comes from the playlist being deleted: one bulk insert, no lookups
+        with self.assertNumQueries(5), self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/playlists/{playlist_id}/")
+        data = self.sync(watermark)
+        self.assertEqual(data["deleted"]["playlists"], [playlist_id])
+        self.assertEqual(sorted(data["deleted"]["playlist_items"]), [item_id, *more])
+
+    def test_rolled_back_deletes_leave_no_tombstones(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.favorite.delete()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            Review.objects.filter(user=self.user).delete()
+        self.assertEqual(list(Tombstone.objects.values_list("model", flat=True)), ["review"])
+
+    def test_deleting_account_leaves_no_tombstones(self):
+        self.user.delete()
+        self.assertFalse(Tombstone.objects.exists())
+
+    def test_old_or_bad_watermarks(self):
+        old = (timezone.now() - timedelta(days=365)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.assertTrue(self.sync(old)["full"])
+        response = self.client.get(self.url, {"since": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_purge_command_removes_expired_tombstones(self):
+        Tombstone.objects.create(user=self.user, model="favorite", object_id=1,
+                                 deleted_at=timezone.now() - timedelta(days=400))
+        Tombstone.objects.create(user=self.user, model="favorite", object_id=2)
+        out = StringIO()
+        call_command("purge_sync_tombstones", stdout=out)
+        self.assertIn("Deleted 1 expired tombstone(s)", out.getvalue())
+        self.assertEqual(list(Tombstone.objects.values_list("object_id", flat=True)), [2])
+
+
+@override_settings(LIBRARY_ETAGS=True)
+class ConditionalPlaylistTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="poller", password="password123")
+        self.client.force_authenticate(self.user)
+        # Flush the fixtures' invalidation batch so each test starts its own
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie = Movie.objects.create(title="Alien", tmdb_id=348, media_type="movie")
+            self.playlist = Playlist.objects.create(user=self.user, title="Horror")
+            self.item = PlaylistItem.objects.create(playlist=self.playlist, movie=self.movie)
+
+    def get(self, url, etag=None):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag) if etag else self.client.get(url)
+
+    def test_unchanged_library_is_304_without_queries(self):
+        urls = [
+            "/api/playlists/",
+            f"/api/playlists/{self.playlist.id}/",
+            "/api/playlists/user_playlists/",
+            f"/api/playlists/{self.playlist.id}/items/",
+        ]
+        etags = {}
+        for url in urls:
+            response = self.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etags[url] = response["ETag"]
+        self.assertEqual(len(set(etags.values())), len(urls))
+
+        for url in urls:
+            with self.assertNumQueries(0):
+                response = self.get(url, etags[url])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response["ETag"], etags[url])
+
+    def test_writes_change_the_etag(self):
+        detail = f"/api/playlists/{self.playlist.id}/"
+        items = f"/api/playlists/{self.playlist.id}/items/"
+        etag = self.get(detail)["ETag"]
+        items_etag = self.get(items)["ETag"]
+
+        # Rating an existing item only saves the item
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/api/playlists/{self.playlist.id}/update_item_rating/{self.movie.id}/",
+                              {"rating": 4}, format="json")
+        response = self.get(detail, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["items"][0]["user_rating"], 4)
+        self.assertEqual(self.get(items, items_etag).status_code, status.HTTP_200_OK)
+
+        list_etag = self.get("/api/playlists/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(detail, {"title": "Scary"}, format="json")
+        self.assertEqual(self.get("/api/playlists/", list_etag).status_code, status.HTTP_200_OK)
+
+    def test_movie_metadata_refresh_changes_the_etag(self):
+        url = f"/api/playlists/{self.playlist.id}/items/"
+        etag = self.get(url)["ETag"]
+        elsewhere = Movie.objects.create(title="Heat", tmdb_id=949, media_type="movie")
+        with self.captureOnCommitCallbacks(execute=True):
+            library_version.invalidate_movie_versions([elsewhere.id])
+        self.assertEqual(self.get(url, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        with self.captureOnCommitCallbacks(execute=True):
+            library_version.invalidate_movie_versions([self.movie.id])
+        self.assertEqual(self.get(url, etag).status_code, status.HTTP_200_OK)
+
+    def test_only_real_movie_edits_change_the_etag(self):
+        url = f"/api/playlists/{self.playlist.id}/"
+        etag = self.get(url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie.save()
+            Movie.objects.create(title="Heat", tmdb_id=949, media_type="movie").save()
+        self.assertEqual(self.get(url, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie.title = "Aliens"
+            self.movie.save(update_fields=["title"])
+        self.assertEqual(self.get(url, etag).status_code, status.HTTP_200_OK)
+
+    def test_snapshot_revalidation_with_the_same_metadata_keeps_the_etag(self):
+        payload = {"id": 348, "title": "Alien", "overview": "In space.", "release_date": "1979-05-25"}
+        with mock.patch("playlist.services._tmdb_get", return_value=_tmdb_response(payload, headers={"ETag": '"v1"'})):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.get("/api/tmdb/movies/348/local/")
+        url = f"/api/playlists/{self.playlist.id}/items/"
+        etag = self.get(url)["ETag"]
+
+        # New ETag and payload from TMDB, but the fields a playlist shows are the same
+        MovieDetailSnapshot.objects.update(fetched_at=timezone.now() - timedelta(days=30))
+        payload = {**payload, "vote_count": 9000}
+        with mock.patch("playlist.services._tmdb_get", return_value=_tmdb_response(payload, headers={"ETag": '"v2"'})):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.client.get("/api/tmdb/movies/348/local/").data, payload)
+        self.assertEqual(self.get(url, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(LIBRARY_ETAGS=None)
+    def test_etags_need_a_shared_cache_by_default(self):
+        url = f"/api/playlists/{self.playlist.id}/"
+        # LocMemCache: another worker would never see the invalidation
+        response = self.get(url, '"anything"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", response)
+        with mock.patch("playlist.library_version.cache_is_process_local", return_value=False):
+            etag = self.get(url)["ETag"]
+            self.assertEqual(self.get(url, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_movie_edits_through_the_api_change_the_etag(self):
+        detail = f"/api/playlists/{self.playlist.id}/"
+        etag = self.get(detail)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/api/movies/{self.movie.id}/", {"title": "New"}, format="json")
+        response = self.get(detail, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["items"][0]["movie"]["title"], "New")
+
+        etag = response["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/movies/{self.movie.id}/")
+        self.assertEqual(self.get(detail, etag).status_code, status.HTTP_200_OK)
+
+    def test_deleting_a_large_playlist_drops_the_tokens_in_one_call(self):
+        movies = Movie.objects.bulk_create([Movie(title=f"Extra {n}") for n in range(50)])
+        PlaylistItem.objects.bulk_create([PlaylistItem(playlist=self.playlist, movie=movie) for movie in movies])
+        etag = self.get("/api/playlists/")["ETag"]
+        with mock.patch.object(cache, "delete_many", wraps=cache.delete_many) as delete_many:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.delete(f"/api/playlists/{self.playlist.id}/")
+        self.assertEqual(delete_many.call_count, 1)
+        self.assertEqual(self.get("/api/playlists/", etag).status_code, status.HTTP_200_OK)
+
+
+class FastSerializerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="reader", password="password123")
+        self.client.force_authenticate(self.user)
+        self.playlist = Playlist.objects.create(user=self.user, title="Mixed", description="Ünïcode line")
+        now = timezone.now()
+        for n, item_status in enumerate(["to_watch", "watching", "watched", "did_not_finish"]):
+            movie = Movie.objects.create(
+                title=f"Film  {n} 🎬", tmdb_id=900 + n, media_type="tv" if n % 2 else "movie",
+                release_year=None if n == 1 else 1990 + n, poster_url="" if n == 2 else f"https://img/{n}.jpg",
+            )
+            item = PlaylistItem.objects.create(
+                playlist=self.playlist, movie=movie, status=item_status, user_rating=n or None
+            )
+            PlaylistItem.objects.filter(pk=item.pk).update(added_at=now - timedelta(hours=n))
+            Favorite.objects.create(user=self.user, movie=movie)
+            Review.objects.create(user=self.user, movie=movie, rating=n + 1, review_text="Great\n\"quoted\"")
+        Playlist.objects.filter(pk=self.playlist.pk).refresh_counters()
+        self.playlist.refresh_from_db()
+
+    def assertSameBytes(self, expected, actual):
+        self.assertEqual(FastJSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_matches_the_drf_serializers(self):
+        items = PlaylistItem.objects.filter(playlist=self.playlist)
+        self.assertSameBytes(
+            PlaylistItemSerializer(items.select_related("movie"), many=True).data,
+            fast_serializers.playlist_item_data(items.values(*fast_serializers.PLAYLIST_ITEM_VALUES)),
+        )
+        self.assertSameBytes(
+            PlaylistSerializer(self.playlist).data,
+            fast_serializers.playlist_data(self.playlist, items.values(*fast_serializers.PLAYLIST_ITEM_VALUES)),
+        )
+        favorites = Favorite.objects.filter(user=self.user)
+        self.assertSameBytes(
+            FavoriteSerializer(favorites.select_related("movie"), many=True).data,
+            fast_serializers.favorite_data(favorites.values(*fast_serializers.FAVORITE_VALUES)),
+        )
+        reviews = Review.objects.filter(user=self.user)
+        self.assertSameBytes(
+            ReviewSerializer(reviews.select_related("movie", "user"), many=True).data,
+            fast_serializers.review_data(reviews.values(*fast_serializers.REVIEW_VALUES)),
+        )
+
+    def test_endpoints_use_one_query_per_page(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/playlists/{self.playlist.id}/")
+        self.assertEqual(len(response.data["items"]), 4)
+        self.assertEqual(response.data["items"][0]["status_display"], "To Watch")
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/favorites/", {"page_size": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+        # Cursors work on .values() rows too
+        self.assertEqual(len(self.client.get(response.data["next"]).data["results"]), 2)
+
+    def test_renderer_falls_back_for_indent_and_big_integers(self):
+        for data, media_type in (({"n": 2 ** 70}, None), ({"a": [1]}, "application/json; indent=2")):
+            self.assertEqual(FastJSONRenderer().render(data, media_type), JSONRenderer().render(data, media_type))
+        when = timezone.now()
+        self.assertEqual(FastJSONRenderer().render({"at": when, 1: None}), JSONRenderer().render({"at": when, 1: None}))
+
+    def test_renderer_floats_are_equivalent_not_identical(self):
+        data = {"small": 1e-05, "large": 1e16, "plain": 7.5}
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+        if renderers.orjson is not None:
+            # Where the strict DRF renderer raises ValueError
+            self.assertEqual(FastJSONRenderer().render({"score": float("nan")}), b'{"score":null}')
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class PlaylistExportTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="exporter", password="password123")
+        self.client.force_authenticate(self.user)
+        self.playlist = Playlist.objects.create(user=self.user, title="Export me")
+        for n in range(5):
+            movie = Movie.objects.create(title=f"Title {n} ", tmdb_id=1200 + n)
+            PlaylistItem.objects.create(playlist=self.playlist, movie=movie, status="watched" if n % 2 else "to_watch")
+        self.url = f"/api/playlists/{self.playlist.id}/export/"
+
+    def test_json_export_streams_the_items_endpoint_payload(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn(f"playlist-{self.playlist.id}.json", response["Content-Disposition"])
+        body = b"".join(response.streaming_content)
+        self.assertEqual(body, self.client.get(f"/api/playlists/{self.playlist.id}/items/").content)
+        self.assertEqual(len(json.loads(body)), 5)
+
+    def test_ndjson_export_has_one_item_per_line(self):
+        response = self.client.get(self.url, {"as": "ndjson"})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual({json.loads(line)["movie"]["tmdb_id"] for line in lines}, set(range(1200, 1205)))
+
+    def test_empty_playlist_exports_an_empty_array(self):
+        PlaylistItem.objects.filter(playlist=self.playlist).delete()
+        response = self.client.get(self.url)
+        self.assertEqual(b"".join(response.streaming_content), b"[]")
+
+    def test_rejects_unknown_format_and_other_users_playlists(self):
+        self.assertEqual(self.client.get(self.url, {"as": "csv"}).status_code, status.HTTP_400_BAD_REQUEST)
+        other = User.objects.create_user(username="someone", password="password123")
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(LIBRARY_ETAGS=True)
+    def test_unchanged_playlist_answers_304(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,335 @@
+"""
+Caching layer for TMDB proxy calls.
+
+Every TMDB fetcher in services.py goes through ``cached_tmdb_call``, which
+stores upstream responses in Django's cache framework under a key derived
+from the endpoint name and its normalized parameters. Each endpoint class
+has its own TTL (see ``DEFAULT_TTLS``; override with settings.TMDB_CACHE_TTLS).
+
+Misses are coalesced: concurrent identical lookups in one worker share a
+single upstream call, and workers coordinate through a cache-backed lock so
+only one of them fetches while the others wait for the cached result.
+
+Endpoints listed in ``DEFAULT_STALE_TTLS`` are served stale-while-revalidate:
+once their TTL passes, the last cached value is still returned immediately
+and a background thread refreshes it.
+
+``acached_tmdb_call`` is the asyncio counterpart used by the async proxy
+views; it shares keys, TTLs and counters with the sync path.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "tmdb:v2"
+
+# Seconds each endpoint class stays fresh in the cache.
+DEFAULT_TTLS = {
+    "search": 10 * 60,
+    "popular": 10 * 60,
+    "top_rated": 10 * 60,
+    "movie_details": 6 * 60 * 60,
+    "tv_details": 6 * 60 * 60,
+    "tv_season": 24 * 60 * 60,
+}
+
+# Extra seconds an expired entry may still be served while it is refreshed.
+# Endpoints not listed here are never served stale.
+DEFAULT_STALE_TTLS = {
+    "popular": 24 * 60 * 60,
+    "top_rated": 24 * 60 * 60,
+}
+
+ENDPOINTS = tuple(DEFAULT_TTLS)
+STAT_KINDS = ("hits", "misses", "coalesced", "stale")
+
+# Cross-worker fetch lock: how long a lock may be held, how long followers
+# wait for the leader's result, and how often they poll for it.
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 15
+LOCK_POLL_INTERVAL = 0.05
+
+_inflight = SingleFlight()
+_async_inflight = AsyncSingleFlight()
+# Strong references to background refresh tasks so they are not garbage collected
+_refresh_tasks = set()
+
+
+def cache_is_process_local() -> bool:
+    """True if the default cache is not shared between worker processes.
+
+    With LocMemCache (the default in settings.py) or DummyCache, entries set
+    or deleted in one gunicorn worker are invisible to the others.
+    """
+    return isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def get_ttl(endpoint: str) -> int:
+    overrides = getattr(settings, "TMDB_CACHE_TTLS", None) or {}
+    return int(overrides.get(endpoint, DEFAULT_TTLS[endpoint]))
+
+
+def get_stale_ttl(endpoint: str) -> int:
+    overrides = getattr(settings, "TMDB_CACHE_STALE_TTLS", None) or {}
+    return int(overrides.get(endpoint, DEFAULT_STALE_TTLS.get(endpoint, 0)))
+
+
+def _normalize_value(value) -> str:
+    if isinstance(value, str):
+        return " ".join(value.split()).lower()
+    return str(value)
+
+
+def make_cache_key(endpoint: str, params: dict) -> str:
+    """Build a stable cache key for an endpoint and its parameters.
+
+    Parameters are sorted and normalized (whitespace collapsed, lowercased)
+    so equivalent requests share one entry. The query string is hashed to
+    keep keys short and safe for memcached-style backends.
+    """
+    normalized = sorted((name, _normalize_value(value)) for name, value in params.items())
+    digest = hashlib.md5(urlencode(normalized).encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{endpoint}:{digest}"
+
+
+def _stat_key(endpoint: str, kind: str) -> str:
+    return f"{KEY_PREFIX}:stats:{endpoint}:{kind}"
+
+
+def _record(endpoint: str, kind: str) -> None:
+    key = _stat_key(endpoint, kind)
+    # add() is a no-op when the counter already exists, so incr() never misses
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Counter was evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+async def _arecord(endpoint: str, kind: str) -> None:
+    key = _stat_key(endpoint, kind)
+    await cache.aadd(key, 0, timeout=None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, timeout=None)
+
+
+def get_cache_stats() -> dict:
+    """Return hit/miss/coalesced/stale counters per endpoint.
+
+    ``coalesced`` counts misses that were answered by another in-flight
+    fetch rather than a call of their own; ``stale`` counts expired entries
+    served while a background refresh ran.
+    """
+    keys = [_stat_key(endpoint, kind) for endpoint in ENDPOINTS for kind in STAT_KINDS]
+    values = cache.get_many(keys)
+    return {
+        endpoint: {kind: values.get(_stat_key(endpoint, kind), 0) for kind in STAT_KINDS}
+        for endpoint in ENDPOINTS
+    }
+
+
+def reset_cache_stats() -> None:
+    cache.delete_many([_stat_key(endpoint, kind) for endpoint in ENDPOINTS for kind in STAT_KINDS])
+
+
+def _store(endpoint: str, key: str, data) -> None:
+    ttl = get_ttl(endpoint)
+    entry = {"data": data, "fresh_until": time.time() + ttl}
+    cache.set(key, entry, ttl + get_stale_ttl(endpoint))
+
+
+def _refresh_in_background(endpoint: str, key: str, fetch) -> None:
+    """Refetch a stale entry on a daemon thread, at most once across workers."""
+    refresh_key = f"{key}:refresh"
+    if not cache.add(refresh_key, 1, LOCK_TIMEOUT):
+        return
+
+    def run():
+        try:
+            _store(endpoint, key, fetch())
+        except Exception:
+            logger.exception("Background refresh of TMDB %s failed", endpoint)
+        finally:
+            cache.delete(refresh_key)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def _fetch_with_lock(endpoint: str, key: str, fetch):
+    """Fetch and cache a value, letting only one worker hit TMDB at a time.
+
+    Returns (data, shared) where shared is True if another worker's fetch
+    supplied the value.
+    """
+    # Another worker may have filled the entry while we were queued
+    entry = cache.get(key)
+    if entry is not None:
+        return entry["data"], True
+
+    lock_key = f"{key}:lock"
+    acquired = cache.add(lock_key, 1, LOCK_TIMEOUT)
+    if not acquired:
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry["data"], True
+            if cache.get(lock_key) is None:
+                # Leader gave up without caching anything (e.g. upstream error)
+                break
+        # Fall through and fetch ourselves rather than fail the request
+
+    try:
+        data = fetch()
+        _store(endpoint, key, data)
+        return data, False
+    finally:
+        if acquired:
+            cache.delete(lock_key)
+
+
+def _run_with_lock(key: str, fn):
+    lock_key = f"{key}:lock"
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            if cache.get(lock_key) is None:
+                return None, False
+        # The leader is taking too long; do the work rather than fail the request
+        return fn(), True
+    try:
+        return fn(), True
+    finally:
+        cache.delete(lock_key)
+
+
+def run_exclusive(key: str, fn):
+    """Run ``fn()`` for ``key`` in one thread of one worker at a time.
+
+    For work whose result is stored elsewhere than this cache (e.g. TMDB
+    revalidations saved to the database). Threads of this worker share the
+    leader's result; callers in other workers wait for the leader to finish
+    and get ``(None, False)``, meaning "re-read what it wrote". Returns
+    ``(result, True)`` otherwise.
+    """
+    result, _ = _inflight.do(key, lambda: _run_with_lock(key, fn))
+    return result
+
+
+def cached_tmdb_call(endpoint: str, params: dict, fetch, refresh: bool = False):
+    """Return the cached response for (endpoint, params), calling fetch() on a miss.
+
+    Only successful responses are cached; exceptions raised by fetch()
+    propagate to the caller untouched. Pass refresh=True to skip the cache
+    lookup and store a freshly fetched value (used for pre-warming).
+    """
+    key = make_cache_key(endpoint, params)
+    if refresh:
+        data = fetch()
+        _store(endpoint, key, data)
+        return data
+
+    entry = cache.get(key)
+    if entry is not None:
+        if time.time() < entry["fresh_until"]:
+            _record(endpoint, "hits")
+        else:
+            _record(endpoint, "stale")
+            _refresh_in_background(endpoint, key, fetch)
+        return entry["data"]
+
+    _record(endpoint, "misses")
+    (data, shared_remote), shared_local = _inflight.do(key, lambda: _fetch_with_lock(endpoint, key, fetch))
+    if shared_local or shared_remote:
+        _record(endpoint, "coalesced")
+    return data
+
+
+async def _astore(endpoint: str, key: str, data) -> None:
+    ttl = get_ttl(endpoint)
+    entry = {"data": data, "fresh_until": time.time() + ttl}
+    await cache.aset(key, entry, ttl + get_stale_ttl(endpoint))
+
+
+def _arefresh_in_background(endpoint: str, key: str, fetch) -> None:
+    async def run():
+        refresh_key = f"{key}:refresh"
+        if not await cache.aadd(refresh_key, 1, LOCK_TIMEOUT):
+            return
+        try:
+            await _astore(endpoint, key, await fetch())
+        except Exception:
+            logger.exception("Background refresh of TMDB %s failed", endpoint)
+        finally:
+            await cache.adelete(refresh_key)
+
+    task = asyncio.get_running_loop().create_task(run())
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def _afetch_with_lock(endpoint: str, key: str, fetch):
+    """Async counterpart of _fetch_with_lock."""
+    entry = await cache.aget(key)
+    if entry is not None:
+        return entry["data"], True
+
+    lock_key = f"{key}:lock"
+    acquired = await cache.aadd(lock_key, 1, LOCK_TIMEOUT)
+    if not acquired:
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            entry = await cache.aget(key)
+            if entry is not None:
+                return entry["data"], True
+            if await cache.aget(lock_key) is None:
+                break
+
+    try:
+        data = await fetch()
+        await _astore(endpoint, key, data)
+        return data, False
+    finally:
+        if acquired:
+            await cache.adelete(lock_key)
+
+
+async def acached_tmdb_call(endpoint: str, params: dict, fetch):
+    """Async counterpart of cached_tmdb_call; fetch is a coroutine function."""
+    key = make_cache_key(endpoint, params)
+    entry = await cache.aget(key)
+    if entry is not None:
+        if time.time() < entry["fresh_until"]:
+            await _arecord(endpoint, "hits")
+        else:
+            await _arecord(endpoint, "stale")
+            _arefresh_in_background(endpoint, key, fetch)
+        return entry["data"]
+
+    await _arecord(endpoint, "misses")
+    (data, shared_remote), shared_local = await _async_inflight.do(
+        key, lambda: _afetch_with_lock(endpoint, key, fetch)
+    )
+    if shared_local or shared_remote:
+        await _arecord(endpoint, "coalesced")
+    return data
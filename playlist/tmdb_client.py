@@ -0,0 +1,251 @@
+"""
+HTTP clients for the TMDB API.
+
+A single TMDBClient per process holds a pooled, keep-alive requests.Session
+so repeated TMDB calls reuse TCP/TLS connections. Idempotent GETs are retried
+on 429/5xx and connection errors with jittered exponential backoff, honouring
+TMDB's Retry-After header when present. Read timeouts are not retried (TMDB
+got the request and is slow; waiting out another timeout rarely helps), and no retry
+starts once ``retry_budget`` seconds have passed since the first attempt, so
+one call stays well inside a gunicorn worker's 30 s timeout.
+
+AsyncTMDBClient is the httpx-based equivalent used by the async proxy views;
+one instance (and connection pool) is kept per running event loop.
+"""
+
+import asyncio
+import random
+import threading
+import time
+import weakref
+from typing import Optional
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# httpx errors that mean the request never reached TMDB (or the connection
+# dropped); read and write timeouts are not retried
+ASYNC_RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+
+def _backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _retry_delay(attempt: int, retry_after: Optional[float], base: float, cap: float, deadline: float):
+    """Seconds to wait before the next attempt, or None if it would pass ``deadline``."""
+    delay = min(retry_after, cap) if retry_after is not None else _backoff_delay(attempt, base, cap)
+    return delay if time.monotonic() + delay <= deadline else None
+
+
+def _retry_after(headers) -> Optional[float]:
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class TMDBClient:
+    """Pooled TMDB HTTP client with retry and backoff."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        pool_size: int = 10,
+        timeout: float = 10,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8,
+        retry_budget: float = 15,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget = retry_budget
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, path: str, params: Optional[dict] = None, headers: Optional[dict] = None) -> requests.Response:
+        """GET ``path`` relative to the base URL, retrying transient failures.
+
+        Returns the final response; callers decide how to handle non-2xx
+        statuses (including 304 for conditional requests sent with
+        ``If-None-Match`` in ``headers``). Connection errors are re-raised
+        once retries (or the retry budget) run out; read timeouts at once.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        query = {"api_key": self.api_key, **(params or {})}
+        deadline = time.monotonic() + self.retry_budget
+
+        attempt = 0
+        while True:
+            try:
+                resp = self.session.get(url, params=query, headers=headers, timeout=self.timeout)
+            except requests.ConnectionError:
+                # Includes connect timeouts, but not read timeouts
+                delay = None
+                if attempt < self.max_retries:
+                    delay = _retry_delay(attempt, None, self.backoff_base, self.backoff_max, deadline)
+                if delay is None:
+                    raise
+            else:
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return resp
+                delay = _retry_delay(
+                    attempt, _retry_after(resp.headers), self.backoff_base, self.backoff_max, deadline
+                )
+                if delay is None:
+                    return resp
+                resp.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncTMDBClient:
+    """Pooled async TMDB HTTP client with the same retry policy as TMDBClient."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        pool_size: int = 100,
+        timeout: float = 10,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8,
+        retry_budget: float = 15,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget = retry_budget
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def get(self, path: str, params: Optional[dict] = None) -> httpx.Response:
+        """Async counterpart of TMDBClient.get."""
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        query = {"api_key": self.api_key, **(params or {})}
+        deadline = time.monotonic() + self.retry_budget
+
+        attempt = 0
+        while True:
+            try:
+                resp = await self.client.get(url, params=query)
+            except ASYNC_RETRY_ERRORS:
+                delay = None
+                if attempt < self.max_retries:
+                    delay = _retry_delay(attempt, None, self.backoff_base, self.backoff_max, deadline)
+                if delay is None:
+                    raise
+            else:
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return resp
+                delay = _retry_delay(
+                    attempt, _retry_after(resp.headers), self.backoff_base, self.backoff_max, deadline
+                )
+                if delay is None:
+                    return resp
+                await resp.aclose()
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls evenly at ``rate`` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = time.monotonic()
+
+    def acquire(self) -> None:
+        """Block until the caller may make its next call."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_tmdb_client(api_key: str, base_url: str) -> TMDBClient:
+    """Return the process-wide client, creating it on first use.
+
+    The client is built lazily so each gunicorn worker gets its own
+    connection pool after forking.
+    """
+    global _client
+    client = _client
+    if client is not None and client.api_key == api_key and client.base_url == base_url.rstrip("/"):
+        return client
+
+    with _client_lock:
+        if _client is None or _client.api_key != api_key or _client.base_url != base_url.rstrip("/"):
+            if _client is not None:
+                _client.close()
+            _client = TMDBClient(
+                api_key,
+                base_url,
+                pool_size=getattr(settings, "TMDB_HTTP_POOL_SIZE", 10),
+                timeout=getattr(settings, "TMDB_HTTP_TIMEOUT", 10),
+                max_retries=getattr(settings, "TMDB_HTTP_MAX_RETRIES", 3),
+                backoff_base=getattr(settings, "TMDB_HTTP_BACKOFF", 0.5),
+                retry_budget=getattr(settings, "TMDB_HTTP_RETRY_BUDGET", 15),
+            )
+        return _client
+
+
+# httpx connection pools are bound to the event loop that created them
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_tmdb_client(api_key: str, base_url: str) -> AsyncTMDBClient:
+    """Return the client for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.api_key != api_key or client.base_url != base_url.rstrip("/"):
+        client = AsyncTMDBClient(
+            api_key,
+            base_url,
+            pool_size=getattr(settings, "TMDB_ASYNC_POOL_SIZE", 100),
+            timeout=getattr(settings, "TMDB_HTTP_TIMEOUT", 10),
+            max_retries=getattr(settings, "TMDB_HTTP_MAX_RETRIES", 3),
+            backoff_base=getattr(settings, "TMDB_HTTP_BACKOFF", 0.5),
+            retry_budget=getattr(settings, "TMDB_HTTP_RETRY_BUDGET", 15),
+        )
+        _async_clients[loop] = client
+    return client
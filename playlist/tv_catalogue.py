@@ -0,0 +1,239 @@
+"""
+Local catalogue of TV seasons and episodes.
+
+Seasons are filled lazily from ``get_tmdb_tv_season_details`` the first time
+anyone opens a series, then served from the Season/Episode tables. The
+``refresh_tv_catalogue`` management command refetches stale seasons in the
+background so newly aired episodes show up.
+
+``series_episodes_with_progress`` joins the catalogue with one user's
+EpisodeProgress rows in a single query, so a series progress screen needs no
+per-season TMDB calls. ``get_series_progress_summary`` rolls the same data up
+per series ("12/24 watched", next up) and caches it per user.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Episode, EpisodeProgress, Movie, Season
+from .services import get_tmdb_tv_details, get_tmdb_tv_season_details, tmdb_image_url
+
+
+EPISODE_FIELDS = ["name", "overview", "air_date", "runtime", "still_url"]
+
+
+def _parse_air_date(value):
+    try:
+        return parse_date(value) if value else None
+    except ValueError:
+        return None
+
+
+def store_season(series: Movie, data: dict, now=None) -> Season:
+    """Upsert a season and its episodes from a TMDB season payload."""
+    now = now or timezone.now()
+    episodes = [item for item in data.get("episodes", []) if item.get("episode_number") is not None]
+
+    with transaction.atomic():
+        season, _ = Season.objects.update_or_create(
+            series=series,
+            season_number=data["season_number"],
+            defaults={
+                "name": data.get("name") or "",
+                "overview": data.get("overview") or "",
+                "air_date": _parse_air_date(data.get("air_date")),
+                "poster_url": tmdb_image_url(data.get("poster_path")),
+                "episode_count": len(episodes),
+                "fetched_at": now,
+            },
+        )
+        Episode.objects.bulk_create(
+            [
+                Episode(
+                    season=season,
+                    episode_number=item["episode_number"],
+                    name=item.get("name") or "",
+                    overview=item.get("overview") or "",
+                    air_date=_parse_air_date(item.get("air_date")),
+                    runtime=item.get("runtime"),
+                    still_url=tmdb_image_url(item.get("still_path")),
+                )
+                for item in episodes
+            ],
+            update_conflicts=True,
+            unique_fields=["season", "episode_number"],
+            update_fields=EPISODE_FIELDS,
+        )
+        # Episodes TMDB dropped (e.g. renumbered specials)
+        season.episodes.exclude(episode_number__in=[item["episode_number"] for item in episodes]).delete()
+    return season
+
+
+def sync_season(series: Movie, season_number: int) -> Season:
+    """Fetch one season from TMDB and store it."""
+    data = get_tmdb_tv_season_details(series.tmdb_id, season_number)
+    return store_season(series, {**data, "season_number": season_number})
+
+
+def ensure_season(series: Movie, season_number: int) -> Season:
+    """Return the stored season, fetching it from TMDB on first use."""
+    season = Season.objects.filter(series=series, season_number=season_number).first()
+    return season or sync_season(series, season_number)
+
+
+def ensure_series_catalogue(series: Movie, discover: bool = False, max_workers=None) -> None:
+    """Fetch and store the seasons of a series that are not stored yet.
+
+    Series with stored seasons are left alone unless ``discover`` is set,
+    which checks the series details for newly announced seasons. The season
+    list comes from the series details; missing seasons are fetched
+    concurrently (bounded by settings.TMDB_BATCH_WORKERS) and then written
+    on this thread.
+    """
+    stored = set(Season.objects.filter(series=series).values_list("season_number", flat=True))
+    if stored and not discover:
+        return
+    details = get_tmdb_tv_details(series.tmdb_id)
+    missing = [
+        item["season_number"]
+        for item in details.get("seasons", [])
+        if item.get("season_number") is not None and item["season_number"] not in stored
+    ]
+    if not missing:
+        return
+
+    if max_workers is None:
+        max_workers = getattr(settings, "TMDB_BATCH_WORKERS", 8)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as executor:
+        payloads = list(executor.map(lambda number: get_tmdb_tv_season_details(series.tmdb_id, number), missing))
+
+    now = timezone.now()
+    for number, data in zip(missing, payloads):
+        store_season(series, {**data, "season_number": number}, now)
+
+
+def series_episodes_with_progress(user, series: Movie, season_number=None):
+    """Episodes of a series annotated with the user's progress, in one query.
+
+    Each episode carries ``progress_status`` and ``progress_rating`` (None
+    when the user has no EpisodeProgress row for it) and its season via
+    select_related.
+    """
+    progress = EpisodeProgress.objects.filter(
+        user=user,
+        series=series,
+        season=OuterRef("season__season_number"),
+        episode=OuterRef("episode_number"),
+    ).order_by()
+    episodes = Episode.objects.filter(season__series=series)
+    if season_number is not None:
+        episodes = episodes.filter(season__season_number=season_number)
+    return (
+        episodes.select_related("season")
+        .annotate(
+            progress_status=Subquery(progress.values("status")[:1]),
+            progress_rating=Subquery(progress.values("rating")[:1]),
+        )
+        .order_by("season__season_number", "episode_number")
+    )
+
+
+SUMMARY_CACHE_TIMEOUT = 15 * 60
+
+
+def _summary_cache_key(user_id) -> str:
+    return f"series-progress:v1:{user_id}"
+
+
+def invalidate_series_progress_summary(user_id) -> None:
+    cache.delete(_summary_cache_key(user_id))
+
+
+def _next_up(catalogue, last, today):
+    """First aired catalogue episode after ``last`` (or the first one at all)."""
+    for season_number, episode_number, name, air_date in catalogue:
+        if last is not None and (season_number, episode_number) <= last:
+            continue
+        if season_number == 0 and last is None:
+            # Don't suggest specials as the place to start
+            continue
+        if air_date is not None and air_date > today:
+            return None
+        return {"season": season_number, "episode": episode_number, "name": name}
+    return None
+
+
+EPISODE_KEY = 100000
+
+
+def series_progress_rows(user):
+    """One row per series the user has progress on, most recently active first.
+
+    Rows carry ``completed``, ``in_progress``, ``last_activity`` and
+    ``furthest``, the furthest completed episode as
+    ``season * EPISODE_KEY + episode`` (None if nothing is completed).
+    """
+    # Furthest completed episode as a plain aggregate over season/episode
+    # packed into one number, rather than a correlated subquery per series
+    furthest = Max(F("season") * EPISODE_KEY + F("episode"), filter=Q(status="completed"))
+    return (
+        EpisodeProgress.objects.filter(user=user)
+        .values("series", "series__title", "series__poster_url")
+        .annotate(
+            completed=Count("pk", filter=Q(status="completed")),
+            in_progress=Count("pk", filter=Q(status="in_progress")),
+            last_activity=Max("updated_at"),
+            furthest=furthest,
+        )
+        .order_by("-last_activity")
+    )
+
+
+def get_series_progress_summary(user) -> list:
+    """Per-series progress for a user, most recently active first.
+
+    Uses one grouped aggregate over EpisodeProgress (series_progress_rows)
+    and one query over the catalogued
+    episodes of those series for totals and next-up. The result is cached
+    per user; EpisodeProgressViewSet drops it on every write.
+    """
+    key = _summary_cache_key(user.pk)
+    summary = cache.get(key)
+    if summary is not None:
+        return summary
+
+    rows = list(series_progress_rows(user))
+
+    catalogues = {}
+    for series_id, season_number, episode_number, name, air_date in (
+        Episode.objects.filter(season__series__in=[row["series"] for row in rows])
+        .order_by("season__series", "season__season_number", "episode_number")
+        .values_list("season__series", "season__season_number", "episode_number", "name", "air_date")
+    ):
+        catalogues.setdefault(series_id, []).append((season_number, episode_number, name, air_date))
+
+    today = timezone.localdate()
+    summary = []
+    for row in rows:
+        catalogue = catalogues.get(row["series"])
+        last = divmod(row["furthest"], EPISODE_KEY) if row["furthest"] is not None else None
+        summary.append({
+            "series": row["series"],
+            "title": row["series__title"],
+            "poster_url": row["series__poster_url"],
+            "completed": row["completed"],
+            "in_progress": row["in_progress"],
+            "total_episodes": len(catalogue) if catalogue else None,
+            "last_watched": {"season": last[0], "episode": last[1]} if last else None,
+            "next_up": _next_up(catalogue, last, today) if catalogue else None,
+            "last_activity": row["last_activity"],
+        })
+
+    cache.set(key, summary, SUMMARY_CACHE_TIMEOUT)
+    return summary
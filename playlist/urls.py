@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import (
     MovieViewSet,
     PlaylistViewSet,
@@ -10,9 +11,11 @@ from .views import (
     TMDBSearchView,
     TMDBMovieDetailView,
     TMDBTVDetailView,
+    TMDBLocalDetailView,
     TMDBTVSeasonDetailView,
     TMDBPopularView,
     TMDBTopRatedView,
+    SyncView,
     get_playlist_items,
     RequestPasswordResetView,
     VerifyResetCodeView,  # ADD THIS IMPORT!
@@ -39,10 +42,22 @@ urlpatterns = [
     path("", include(router.urls)),
     # Playlist items endpoint
     path("playlists/<int:playlist_id>/items/", get_playlist_items, name="playlist-items"),
+    path("sync/", SyncView.as_view(), name="sync"),
     # TMDB proxy endpoints
     path("tmdb/search/", TMDBSearchView.as_view(), name="tmdb-search"),
     path("tmdb/movies/<int:tmdb_id>/", TMDBMovieDetailView.as_view(), name="tmdb-movie-detail"),
     path("tmdb/tv/<int:tmdb_id>/", TMDBTVDetailView.as_view(), name="tmdb-tv-detail"),
+    # Details served from the local snapshot (TMDB fallback on miss/staleness)
+    path(
+        "tmdb/movies/<int:tmdb_id>/local/",
+        TMDBLocalDetailView.as_view(media_type="movie"),
+        name="tmdb-movie-local-detail",
+    ),
+    path(
+        "tmdb/tv/<int:tmdb_id>/local/",
+        TMDBLocalDetailView.as_view(media_type="tv"),
+        name="tmdb-tv-local-detail",
+    ),
     path(
         "tmdb/tv/<int:tmdb_id>/seasons/<int:season_number>/",
         TMDBTVSeasonDetailView.as_view(),
@@ -50,6 +65,18 @@ urlpatterns = [
     ),
     path("tmdb/popular/", TMDBPopularView.as_view(), name="tmdb-popular"),
     path("tmdb/top-rated/", TMDBTopRatedView.as_view(), name="tmdb-top-rated"),
+    # Async TMDB proxy endpoints: raw TMDB payloads without the library state
+    # the sync ones add, and 404 unless served through ASGI (see async_views.py)
+    path("tmdb/async/search/", async_views.tmdb_search, name="tmdb-async-search"),
+    path("tmdb/async/movies/<int:tmdb_id>/", async_views.tmdb_movie_detail, name="tmdb-async-movie-detail"),
+    path("tmdb/async/tv/<int:tmdb_id>/", async_views.tmdb_tv_detail, name="tmdb-async-tv-detail"),
+    path(
+        "tmdb/async/tv/<int:tmdb_id>/seasons/<int:season_number>/",
+        async_views.tmdb_tv_season_detail,
+        name="tmdb-async-tv-season-detail",
+    ),
+    path("tmdb/async/popular/", async_views.tmdb_popular, name="tmdb-async-popular"),
+    path("tmdb/async/top-rated/", async_views.tmdb_top_rated, name="tmdb-async-top-rated"),
     # Password reset endpoints
     path("auth/password-reset/request/", RequestPasswordResetView.as_view(), name="password-reset-request"),
     path("auth/password-reset/verify/", VerifyResetCodeView.as_view(), name="password-reset-verify"),  # ADD THIS LINE!
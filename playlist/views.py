@@ -1,9 +1,11 @@
 import random
 import string
+from functools import partial
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
+from rest_framework.throttling import UserRateThrottle
 from rest_framework import status, viewsets
 from django.core.cache import cache
 from django.contrib.auth import get_user_model
@@ -11,11 +13,15 @@ from rest_framework.authtoken.models import Token
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import authenticate
+from django.db import transaction
 from django.db.models import Q
 import os
 from django.core.mail import send_mail
+from django.http import StreamingHttpResponse
 from django.conf import settings
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 import threading
 import traceback
 
@@ -27,14 +33,43 @@ from .serializers import (
     PlaylistItemSerializer,
     AddMovieToPlaylistSerializer,
     UpdatePlaylistItemStatusSerializer,
+    BulkPlaylistOperationSerializer,
+    BulkPlaylistOperationsSerializer,
+    BulkFavoriteCheckSerializer,
+    BatchMovieLookupSerializer,
+    BulkEpisodeProgressSerializer,
     UserRegistrationSerializer,
     FavoriteSerializer,
     ReviewSerializer,
     EpisodeProgressSerializer,
 )
+from .fast_serializers import (
+    FAVORITE_VALUES,
+    PLAYLIST_ITEM_VALUES,
+    REVIEW_VALUES,
+    favorite_data,
+    playlist_data,
+    playlist_item_data,
+    review_data,
+)
+from .export import EXPORT_FORMATS, STREAMS
+from .library_version import library_etag
+from .pagination import KeysetPagination
+from .sync import changes_since, parse_watermark
+from .library import decorate_tmdb_results, enrich_tmdb_results, get_library_state
+from .status_playlists import create_status_playlists, get_status_playlist_id
+from .tv_catalogue import (
+    ensure_season,
+    ensure_series_catalogue,
+    get_series_progress_summary,
+    invalidate_series_progress_summary,
+    series_episodes_with_progress,
+)
 from .services import (
     search_tmdb,
     get_or_create_movie_from_tmdb,
+    get_or_create_movies_from_tmdb,
+    get_title_details,
     TMDBError,
     get_tmdb_tv_details,
     get_tmdb_tv_season_details,
@@ -224,22 +259,7 @@ class RegisterView(APIView):
     
     def create_status_playlists(self, user):
         """Create automatic status playlists for user"""
-        status_playlists = [
-            {'title': 'Watched', 'description': 'Movies and series I have watched'},
-            {'title': 'Watching', 'description': 'Movies and series I am currently watching'},
-            {'title': 'To Watch', 'description': 'Movies and series I want to watch'},
-            {'title': 'Did Not Finish', 'description': 'Movies and series I stopped watching'}
-        ]
-        
-        for pl_data in status_playlists:
-            Playlist.objects.get_or_create(
-                user=user,
-                title=pl_data['title'],
-                defaults={
-                    'description': pl_data['description'],
-                    'is_status_playlist': True
-                }
-            )
+        create_status_playlists(user)
 
 class LoginView(APIView):
     """User login endpoint."""
@@ -446,6 +466,16 @@ class ResetPasswordView(APIView):
 
 # ============ TMDB VIEWS ============
 
+def _with_library_state(request, results):
+    """Annotate a TMDB result page with the caller's library state.
+
+    ?enrich=1 adds a full ``library`` block per result; otherwise signed-in
+    users get the flat is_favorite/playlist_status/my_rating fields.
+    """
+    if request.query_params.get('enrich', '').lower() in ('1', 'true', 'yes'):
+        return enrich_tmdb_results(request.user, results)
+    return decorate_tmdb_results(request.user, results)
+
 class TMDBSearchView(APIView):
     """Proxy endpoint for TMDB search."""
     permission_classes = [AllowAny]
@@ -468,7 +498,7 @@ class TMDBSearchView(APIView):
         
         try:
             results = search_tmdb(query, page, media_type)
-            return Response(results)
+            return Response(_with_library_state(request, results))
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -509,6 +539,36 @@ class TMDBTVDetailView(APIView):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class TMDBLocalDetailView(APIView):
+    """Movie/TV details served from the local snapshot when we have the title.
+
+    Falls back to TMDB for titles not in the catalogue or with a stale
+    snapshot. Local answers carry ETag/Last-Modified and honour
+    If-None-Match/If-Modified-Since with a 304.
+    """
+    permission_classes = [AllowAny]
+    media_type = Movie.MediaType.MOVIE
+
+    def get(self, request, tmdb_id):
+        try:
+            details, snapshot = get_title_details(tmdb_id, self.media_type)
+        except TMDBError as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        if snapshot is None:
+            return Response(details)
+
+        last_modified = int(snapshot.changed_at.timestamp())
+        response = Response(details, headers={
+            "ETag": snapshot.etag,
+            "Last-Modified": http_date(last_modified),
+        })
+        return get_conditional_response(
+            request, etag=snapshot.etag, last_modified=last_modified, response=response
+        )
+
 class TMDBTVSeasonDetailView(APIView):
     """Proxy endpoint for TMDB TV season."""
     permission_classes = [AllowAny]
@@ -537,7 +597,7 @@ class TMDBPopularView(APIView):
 
         try:
             results = get_tmdb_popular(media_type, page)
-            return Response(results)
+            return Response(_with_library_state(request, results))
         except Exception as e:
             return Response(
                 {"error": str(e)},
@@ -559,7 +619,7 @@ class TMDBTopRatedView(APIView):
 
         try:
             results = get_tmdb_top_rated(media_type, page)
-            return Response(results)
+            return Response(_with_library_state(request, results))
         except Exception as e:
             return Response(
                 {"error": str(e)},
@@ -568,6 +628,11 @@ class TMDBTopRatedView(APIView):
 
 # ============ MODEL VIEWSETS ============
 
+class TMDBBatchThrottle(UserRateThrottle):
+    """Per-user limit on the batch import, which can fetch hundreds of titles from TMDB."""
+    scope = "tmdb_batch"
+
+
 class MovieViewSet(viewsets.ModelViewSet):
     """API endpoint for Movie CRUD operations."""
     queryset = Movie.objects.all()
@@ -612,10 +677,84 @@ class MovieViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="batch",
+        permission_classes=[IsAuthenticated],
+        throttle_classes=[TMDBBatchThrottle],
+    )
+    def batch_get_or_create(self, request):
+        """Get or create many movies from TMDB IDs in one request.
+
+        Body: {"items": [{"tmdb_id": 550, "media_type": "movie"}, ...]}
+        Titles TMDB cannot supply are listed under "errors"; the rest are
+        returned under "results" in request order. One request can cost
+        hundreds of TMDB calls, so it needs a user and is rate limited
+        (the "tmdb_batch" throttle rate).
+        """
+        serializer = BatchMovieLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        pairs = [(item['tmdb_id'], item['media_type']) for item in serializer.validated_data['items']]
+        movies, created, errors = get_or_create_movies_from_tmdb(pairs)
+
+        results = []
+        seen = set()
+        for pair in pairs:
+            if pair in seen or pair not in movies:
+                continue
+            seen.add(pair)
+            results.append({
+                'tmdb_id': pair[0],
+                'media_type': pair[1],
+                'created': pair in created,
+                'movie': MovieSerializer(movies[pair]).data,
+            })
+
+        return Response({
+            'results': results,
+            'errors': [
+                {'tmdb_id': tmdb_id, 'media_type': media_type, 'error': message}
+                for (tmdb_id, media_type), message in errors.items()
+            ],
+        })
+
+
+def _conditional_library_response(request, etag, build):
+    """Answer 304 if the client's copy (If-None-Match) is current, else call ``build``.
+
+    The ETag comes from library_version tokens, so a 304 is decided before
+    any playlist query or serialization runs. Without an ETag (disabled, see
+    library_version.etags_enabled) this is just ``build()``.
+    """
+    if etag is None:
+        return build()
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = build()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _fast_list(view, values, build):
+    """ModelViewSet.list, but serialized from .values() rows by ``build``."""
+    queryset = view.filter_queryset(view.get_queryset()).values(*values)
+    page = view.paginate_queryset(queryset)
+    if page is not None:
+        return view.get_paginated_response(build(page))
+    return Response(build(queryset))
+
 
 class PlaylistViewSet(viewsets.ModelViewSet):
     """
     API endpoint for Playlist CRUD operations.
+
+    GET list, detail, user_playlists and export answer If-None-Match with 304 when
+    nothing in the user's library changed.
     """
     serializer_class = PlaylistSerializer
     permission_classes = [IsAuthenticated]
@@ -634,15 +773,58 @@ class PlaylistViewSet(viewsets.ModelViewSet):
             return PlaylistListSerializer
         return PlaylistSerializer
     
+    def list(self, request, *args, **kwargs):
+        etag = library_etag(request, user_id=request.user.pk)
+        return _conditional_library_response(request, etag, partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        def build():
+            # Items and their movies come from one .values() query (fast_serializers)
+            playlist = self.get_object()
+            items = PlaylistItem.objects.filter(playlist=playlist).values(*PLAYLIST_ITEM_VALUES)
+            return Response(playlist_data(playlist, items))
+
+        etag = library_etag(request, user_id=request.user.pk, playlist_id=kwargs["pk"])
+        return _conditional_library_response(request, etag, build)
+
     @action(detail=False, methods=["get"])
     def user_playlists(self, request):
         """Get only user-created playlists (exclude status playlists)."""
-        user_playlists = Playlist.objects.filter(
-            user=request.user,
-            is_status_playlist=False
-        )
-        serializer = PlaylistListSerializer(user_playlists, many=True)
-        return Response(serializer.data)
+        def build():
+            user_playlists = Playlist.objects.filter(
+                user=request.user,
+                is_status_playlist=False
+            )
+            serializer = PlaylistListSerializer(user_playlists, many=True)
+            return Response(serializer.data)
+
+        return _conditional_library_response(request, library_etag(request, user_id=request.user.pk), build)
+
+    @action(detail=True, methods=["get"])
+    def export(self, request, pk=None):
+        """Stream all items of a playlist: ?as=json (default) or ?as=ndjson.
+
+        Memory stays flat however large the playlist (see export.py). The
+        parameter is not called ``format`` because DRF uses that one to pick
+        a renderer.
+        """
+        export_format = request.query_params.get("as", "json")
+        if export_format not in STREAMS:
+            return Response(
+                {"error": f"as must be one of: {', '.join(STREAMS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        def build():
+            playlist = self.get_object()
+            response = StreamingHttpResponse(
+                STREAMS[export_format](playlist), content_type=EXPORT_FORMATS[export_format]
+            )
+            response["Content-Disposition"] = f'attachment; filename="playlist-{playlist.pk}.{export_format}"'
+            return response
+
+        etag = library_etag(request, user_id=request.user.pk, playlist_id=pk)
+        return _conditional_library_response(request, etag, build)
     
     def destroy(self, request, *args, **kwargs):
         """Delete a playlist - explicitly defined for clarity."""
@@ -674,20 +856,8 @@ class PlaylistViewSet(viewsets.ModelViewSet):
 
         # If this is a status playlist, use move_to_status_playlist logic which handles all transitions
         if playlist.is_status_playlist:
-            self.move_to_status_playlist(playlist.user, movie, status_value)
-            # Return the item from the target status playlist
-            target_status_name = {
-                'watched': 'Watched',
-                'watching': 'Watching',
-                'to_watch': 'To Watch',
-                'did_not_finish': 'Did Not Finish'
-            }.get(status_value, 'To Watch')
-            target_playlist = Playlist.objects.get(
-                user=playlist.user,
-                title=target_status_name,
-                is_status_playlist=True
-            )
-            item = PlaylistItem.objects.get(playlist=target_playlist, movie=movie)
+            # Returns the item from the target status playlist
+            item = self.move_to_status_playlist(playlist.user, movie, status_value)
             return Response(
                 PlaylistItemSerializer(item).data,
                 status=status.HTTP_201_CREATED
@@ -701,14 +871,16 @@ class PlaylistViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        item = PlaylistItem.objects.create(
-            playlist=playlist,
-            movie=movie,
-            status=status_value
-        )
-        
-        # Update playlist's updated_at timestamp
-        playlist.save()
+        with transaction.atomic():
+            item = PlaylistItem.objects.create(
+                playlist=playlist,
+                movie=movie,
+                status=status_value
+            )
+            Playlist.objects.filter(pk=playlist.pk).refresh_counters()
+
+            # Update playlist's updated_at timestamp
+            playlist.save(update_fields=["updated_at"])
         
         return Response(
             PlaylistItemSerializer(item).data,
@@ -723,10 +895,12 @@ class PlaylistViewSet(viewsets.ModelViewSet):
         try:
             # Try to get the playlist item
             item = PlaylistItem.objects.get(playlist=playlist, movie_id=movie_id)
-            item.delete()
-            
-            # Update playlist's updated_at timestamp
-            playlist.save()
+            with transaction.atomic():
+                item.delete()
+                Playlist.objects.filter(pk=playlist.pk).refresh_counters()
+
+                # Update playlist's updated_at timestamp
+                playlist.save(update_fields=["updated_at"])
             
             return Response(
                 {"message": f"Movie removed from playlist '{playlist.title}'"},
@@ -748,87 +922,73 @@ class PlaylistViewSet(viewsets.ModelViewSet):
     def update_item_status(self, request, pk=None, movie_id=None):
         """Update a movie's watch status in this playlist and auto-move to status playlist."""
         playlist = self.get_object()
-        item = get_object_or_404(PlaylistItem, playlist=playlist, movie_id=movie_id)
+        item = get_object_or_404(
+            PlaylistItem.objects.select_related("movie"),
+            playlist=playlist,
+            movie_id=movie_id
+        )
 
         serializer = UpdatePlaylistItemStatusSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         new_status = serializer.validated_data["status"]
-        old_status = item.status
 
-        # Update status in all PlaylistItems for this user and movie
-        PlaylistItem.objects.filter(
-            movie_id=movie_id,
-            playlist__user=playlist.user
-        ).update(status=new_status)
-
-        # Refresh item from DB
-        item.refresh_from_db()
+        with transaction.atomic():
+            if playlist.is_status_playlist:
+                # Auto-move to corresponding status playlist ONLY if this is a status playlist;
+                # this also updates the status in every other playlist
+                self.move_to_status_playlist(playlist.user, item.movie, new_status)
+            else:
+                # Don't move movies when updating status in custom playlists
+                PlaylistItem.objects.filter(
+                    movie_id=movie_id,
+                    playlist__user=playlist.user
+                ).update(status=new_status, updated_at=timezone.now())
+                Playlist.objects.filter(user=playlist.user, items__movie_id=movie_id).refresh_counters()
 
-        # Auto-move to corresponding status playlist ONLY if this is a status playlist
-        # Don't move movies when updating status in custom playlists
-        if playlist.is_status_playlist and new_status:
-            self.move_to_status_playlist(playlist.user, item.movie, new_status)
+            # Refresh item from DB
+            item.refresh_from_db(fields=["status", "updated_at"])
 
         return Response(PlaylistItemSerializer(item).data)
     
+    @transaction.atomic
     def move_to_status_playlist(self, user, movie, status):
-        """Move movie to the corresponding status playlist"""
-        status_playlist_map = {
-            'watched': 'Watched',
-            'watching': 'Watching',
-            'to_watch': 'To Watch',
-            'did_not_finish': 'Did Not Finish'
-        }
-        
-        if status not in status_playlist_map:
-            return
-        
-        target_playlist_name = status_playlist_map[status]
-        
-        # Get or create the target status playlist
-        target_playlist, created = Playlist.objects.get_or_create(
-            user=user,
-            title=target_playlist_name,
-            defaults={
-                'description': f'Movies and series I {status.replace("_", " ")}',
-                'is_status_playlist': True
-            }
-        )
-        
-        # Ensure the playlist is marked as status playlist
-        if not created and not target_playlist.is_status_playlist:
-            target_playlist.is_status_playlist = True
-            target_playlist.save()
-        
+        """Move movie to the corresponding status playlist and return its item there.
+
+        One transaction: resolve the status playlist, set the new status on
+        every one of the user's items for this movie, make sure the target
+        playlist holds it, then refresh the affected playlists' counters.
+        """
+        # Status -> playlist ID comes from the per-user cache; a process-local
+        # cache is checked by primary key, since another worker may have
+        # deleted the playlist without this one hearing of it
+        target_playlist_id = get_status_playlist_id(user, status, verify=True)
+        if target_playlist_id is None:
+            return None
+
         # Update status in all PlaylistItems (status and custom) for this user and movie
         PlaylistItem.objects.filter(
             movie=movie,
             playlist__user=user
-        ).update(status=status)
+        ).update(status=status, updated_at=timezone.now())
 
-        # Add to target status playlist (if not already there)
-        item, created = PlaylistItem.objects.get_or_create(
-            playlist=target_playlist,
+        # Add to target status playlist (if not already there). An existing item
+        # is read after the UPDATE above, so it already carries the new status.
+        item, _ = PlaylistItem.objects.get_or_create(
+            playlist_id=target_playlist_id,
             movie=movie,
             defaults={'status': status}
         )
-        
-        if not created:
-            item.status = status
-            item.save()
+        item.movie = movie
+
+        Playlist.objects.filter(user=user, items__movie=movie).refresh_counters()
+        return item
 
     @action(detail=True, methods=["patch"], url_path="update_item_rating/(?P<movie_id>[^/.]+)")
     def update_item_rating(self, request, pk=None, movie_id=None):
         """Update a movie's user rating in this playlist."""
         playlist = self.get_object()
         movie = get_object_or_404(Movie, pk=movie_id)
-        item, created = PlaylistItem.objects.get_or_create(
-            playlist=playlist,
-            movie=movie,
-            defaults={"status": PlaylistItem.Status.TO_WATCH}
-        )
-
         rating = request.data.get('rating')
         if rating is None:
             return Response(
@@ -849,11 +1009,143 @@ class PlaylistViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        item.user_rating = rating
-        item.save()
+        with transaction.atomic():
+            item, created = PlaylistItem.objects.get_or_create(
+                playlist=playlist,
+                movie=movie,
+                defaults={"status": PlaylistItem.Status.TO_WATCH}
+            )
+            item.user_rating = rating
+            item.save()
+            if created:
+                Playlist.objects.filter(pk=playlist.pk).refresh_counters()
 
         return Response(PlaylistItemSerializer(item).data)
 
+    @action(detail=True, methods=["post"], url_path="bulk")
+    def bulk_items(self, request, pk=None):
+        """Apply many add/remove/set_status/set_rating operations in one transaction.
+
+        Body: {"operations": [{"op": "add", "movie_id": 1, "status": "to_watch"},
+                              {"op": "remove", "movie_id": 2},
+                              {"op": "set_status", "movie_id": 3, "status": "watched"},
+                              {"op": "set_rating", "movie_id": 4, "rating": 5}]}
+
+        Operations run in order against this playlist. As with
+        update_item_status, a set_status also sets the status of the user's
+        other copies of the movie (one UPDATE per distinct status). Status
+        playlists only take remove and set_rating: adding or re-statusing
+        there moves movies between playlists, which add_movie and
+        update_item_status do. Each operation gets its own entry in "results";
+        invalid operations are reported and skipped, the rest are written with
+        bulk queries and the playlist is touched once.
+        """
+        playlist = self.get_object()
+        envelope = BulkPlaylistOperationsSerializer(data=request.data)
+        envelope.is_valid(raise_exception=True)
+
+        results = []
+        operations = []
+        for index, raw in enumerate(envelope.validated_data["operations"]):
+            op_serializer = BulkPlaylistOperationSerializer(data=raw)
+            if op_serializer.is_valid():
+                operations.append((index, op_serializer.validated_data))
+                results.append(None)
+            else:
+                results.append({"index": index, "op": raw.get("op"), "movie_id": raw.get("movie_id"),
+                                "error": op_serializer.errors})
+
+        movie_ids = {op["movie_id"] for _, op in operations}
+        existing_movies = set(Movie.objects.filter(pk__in=movie_ids).values_list("pk", flat=True))
+
+        with transaction.atomic():
+            items = {
+                item.movie_id: item
+                for item in PlaylistItem.objects.select_for_update().filter(playlist=playlist, movie_id__in=movie_ids)
+            }
+            to_create = {}
+            to_update = {}
+            to_delete = set()
+            # Movies whose status a set_status changed, synced to their other copies
+            restatused = set()
+
+            for index, op in operations:
+                movie_id = op["movie_id"]
+                result = {"index": index, "op": op["op"], "movie_id": movie_id}
+                results[index] = result
+                item = items.get(movie_id)
+
+                if playlist.is_status_playlist and op["op"] in ("add", "set_status"):
+                    result["error"] = "Use add_movie or update_item_status to change statuses in a status playlist"
+                    continue
+
+                if op["op"] == "add":
+                    if movie_id not in existing_movies:
+                        result["error"] = "Movie not found"
+                    elif item is not None:
+                        result["error"] = "Movie already in playlist"
+                    else:
+                        item = PlaylistItem(
+                            playlist=playlist,
+                            movie_id=movie_id,
+                            status=op.get("status", PlaylistItem.Status.TO_WATCH),
+                            user_rating=op.get("rating"),
+                        )
+                        items[movie_id] = to_create[movie_id] = item
+                    continue
+
+                if item is None:
+                    result["error"] = "Movie not found in this playlist"
+                    continue
+
+                if op["op"] == "remove":
+                    del items[movie_id]
+                    if to_create.pop(movie_id, None) is None:
+                        to_update.pop(movie_id, None)
+                        to_delete.add(item.pk)
+                elif op["op"] == "set_status":
+                    item.status = op["status"]
+                    restatused.add(movie_id)
+                elif op["op"] == "set_rating":
+                    item.user_rating = op["rating"]
+
+                if op["op"] != "remove" and item.pk is not None:
+                    to_update[movie_id] = item
+
+            if to_delete:
+                PlaylistItem.objects.filter(pk__in=to_delete).delete()
+            if to_create:
+                PlaylistItem.objects.bulk_create(to_create.values())
+            if to_update:
+                now = timezone.now()
+                for item in to_update.values():
+                    item.updated_at = now
+                PlaylistItem.objects.bulk_update(to_update.values(), ["status", "user_rating", "updated_at"])
+
+            by_status = {}
+            for movie_id in restatused & items.keys():
+                by_status.setdefault(items[movie_id].status, []).append(movie_id)
+            for new_status, movie_ids in by_status.items():
+                PlaylistItem.objects.filter(playlist__user=playlist.user, movie_id__in=movie_ids).exclude(
+                    playlist=playlist
+                ).update(status=new_status, updated_at=timezone.now())
+
+            if to_delete or to_create or to_update:
+                changed = Q(pk=playlist.pk)
+                if by_status:
+                    changed |= Q(pk__in=PlaylistItem.objects.filter(
+                        playlist__user=playlist.user, movie_id__in=restatused
+                    ).values("playlist_id"))
+                Playlist.objects.filter(changed).refresh_counters()
+                playlist.save(update_fields=["updated_at"])
+
+        failed = sum(1 for result in results if "error" in result)
+        return Response({
+            "applied": len(results) - failed,
+            "failed": failed,
+            "results": results,
+        })
+
 
 class PlaylistItemViewSet(viewsets.ModelViewSet):
     """
@@ -867,6 +1159,32 @@ class PlaylistItemViewSet(viewsets.ModelViewSet):
     """
     queryset = PlaylistItem.objects.select_related("movie", "playlist").all()
     serializer_class = PlaylistItemSerializer
+    pagination_class = KeysetPagination
+
+    # Reads skip the serializer (fast_serializers); writes use it
+    def list(self, request, *args, **kwargs):
+        return _fast_list(self, PLAYLIST_ITEM_VALUES, playlist_item_data)
+
+    def retrieve(self, request, *args, **kwargs):
+        item = get_object_or_404(self.get_queryset().values(*PLAYLIST_ITEM_VALUES), pk=kwargs["pk"])
+        return Response(playlist_item_data([item])[0])
+
+    # Every write keeps the parent playlist's stored counters in step
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            item = serializer.save()
+            Playlist.objects.filter(pk=item.playlist_id).refresh_counters()
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            item = serializer.save()
+            Playlist.objects.filter(pk=item.playlist_id).refresh_counters()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            playlist_id = instance.playlist_id
+            instance.delete()
+            Playlist.objects.filter(pk=playlist_id).refresh_counters()
 
 
 class EpisodeProgressViewSet(viewsets.ModelViewSet):
@@ -876,6 +1194,7 @@ class EpisodeProgressViewSet(viewsets.ModelViewSet):
     """
     serializer_class = EpisodeProgressSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         # Only return progress records for the requesting user
@@ -902,28 +1221,148 @@ class EpisodeProgressViewSet(viewsets.ModelViewSet):
             except (ValueError, TypeError):
                 pass
 
+        # ?ordering=-updated_at lists the most recently touched episodes first
+        if self.request.query_params.get('ordering') == '-updated_at':
+            qs = qs.order_by('-updated_at')
+
         return qs
 
     def perform_create(self, serializer):
-        # Debug: log incoming data
-        print('EpisodeProgressViewSet.perform_create:', serializer.validated_data)
         # Assign the current user on create
         serializer.save(user=self.request.user)
+        invalidate_series_progress_summary(self.request.user.pk)
 
     def perform_update(self, serializer):
-        # Debug: log incoming data
-        print('EpisodeProgressViewSet.perform_update:', serializer.validated_data)
         # Prevent changing ownership — always ensure user is request.user
         serializer.save(user=self.request.user)
+        invalidate_series_progress_summary(self.request.user.pk)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        invalidate_series_progress_summary(self.request.user.pk)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_mark(self, request):
+        """Mark a range of episodes in one season with the same status.
+
+        POST /api/episode-progress/bulk/
+        Body: {"series": 1, "season": 2, "first_episode": 1, "last_episode": 24, "status": "completed"}
+        Upserts every episode in the range in one statement; notes and ratings
+        of existing rows are kept.
+        """
+        serializer = BulkEpisodeProgressSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        episodes = range(data['first_episode'], data['last_episode'] + 1)
+
+        now = timezone.now()
+        with transaction.atomic():
+            existing = EpisodeProgress.objects.filter(
+                user=request.user, series=data['series'], season=data['season'], episode__in=episodes
+            ).count()
+            EpisodeProgress.objects.bulk_create(
+                [
+                    EpisodeProgress(
+                        user=request.user,
+                        series=data['series'],
+                        season=data['season'],
+                        episode=episode,
+                        status=data['status'],
+                        updated_at=now,
+                    )
+                    for episode in episodes
+                ],
+                update_conflicts=True,
+                unique_fields=['user', 'series', 'season', 'episode'],
+                update_fields=['status', 'updated_at'],
+            )
+        invalidate_series_progress_summary(request.user.pk)
+
+        return Response({
+            'series': data['series'].id,
+            'season': data['season'],
+            'status': data['status'],
+            'marked': len(episodes),
+            'created': len(episodes) - existing,
+            'updated': existing,
+        })
+
+    @action(detail=False, methods=['get'], url_path='summary')
+    def summary(self, request):
+        """Progress per series for the current user, most recently active first.
+
+        GET /api/episode-progress/summary/
+        Each entry has completed/in-progress counts, the catalogue's episode
+        total, the furthest completed episode and the next aired episode after
+        it (total and next_up are null until the series is catalogued).
+        """
+        return Response(get_series_progress_summary(request.user))
+
+    @action(detail=False, methods=['get'], url_path='catalogue')
+    def catalogue(self, request):
+        """Seasons and episodes of a series with the user's progress on each.
+
+        GET /api/episode-progress/catalogue/?series=<movie id>[&season=<n>]
+        Seasons are read from the local catalogue, fetching any that are not
+        stored yet from TMDB on first use.
+        """
+        try:
+            series_id = int(request.query_params.get('series'))
+            season_number = request.query_params.get('season')
+            season_number = int(season_number) if season_number is not None else None
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'series (and optional season) must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        series = get_object_or_404(Movie, pk=series_id, media_type=Movie.MediaType.TV, tmdb_id__isnull=False)
+
+        try:
+            if season_number is None:
+                ensure_series_catalogue(series)
+            else:
+                ensure_season(series, season_number)
+        except TMDBError as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        seasons = {}
+        for episode in series_episodes_with_progress(request.user, series, season_number):
+            season = episode.season
+            if season.season_number not in seasons:
+                seasons[season.season_number] = {
+                    'season_number': season.season_number,
+                    'name': season.name,
+                    'air_date': season.air_date,
+                    'poster_url': season.poster_url,
+                    'episode_count': season.episode_count,
+                    'episodes': [],
+                }
+            seasons[season.season_number]['episodes'].append({
+                'episode_number': episode.episode_number,
+                'name': episode.name,
+                'overview': episode.overview,
+                'air_date': episode.air_date,
+                'runtime': episode.runtime,
+                'still_url': episode.still_url,
+                'status': episode.progress_status or 'not_started',
+                'rating': episode.progress_rating,
+            })
+
+        return Response({'series': series.id, 'seasons': list(seasons.values())})
 
 
 @api_view(['GET'])
 def get_playlist_items(request, playlist_id):
-    """Get all items in a playlist."""
-    playlist = get_object_or_404(Playlist, id=playlist_id)
-    items = PlaylistItem.objects.filter(playlist=playlist).select_related('movie')
-    serializer = PlaylistItemSerializer(items, many=True)
-    return Response(serializer.data)
+    """Get all items in a playlist (304 if unchanged since the client's ETag)."""
+    def build():
+        playlist = get_object_or_404(Playlist, id=playlist_id)
+        items = PlaylistItem.objects.filter(playlist=playlist).values(*PLAYLIST_ITEM_VALUES)
+        return Response(playlist_item_data(items))
+
+    return _conditional_library_response(request, library_etag(request, playlist_id=playlist_id), build)
 
 
 def generate_verification_code():
@@ -937,13 +1376,18 @@ class FavoriteViewSet(viewsets.ModelViewSet):
     GET /api/favorites/ - List all user favorites
     POST /api/favorites/ - Add to favorites (requires tmdb_id and media_type)
     DELETE /api/favorites/{id}/ - Remove from favorites by favorite ID
+    POST /api/favorites/check_bulk/ - Favorite/status/rating for many titles at once
     """
     serializer_class = FavoriteSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return Favorite.objects.filter(user=self.request.user).select_related('movie')
 
+    def list(self, request, *args, **kwargs):
+        return _fast_list(self, FAVORITE_VALUES, favorite_data)
+
     def create(self, request, *args, **kwargs):
         """Add a movie/series to favorites."""
         tmdb_id = request.data.get('tmdb_id')
@@ -954,13 +1398,15 @@ class FavoriteViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         try:
-            movie, created = get_or_create_movie_from_tmdb(tmdb_id, media_type)
-            existing_favorite = Favorite.objects.filter(
+            movie, _ = get_or_create_movie_from_tmdb(tmdb_id, media_type)
+            # get_or_create falls back to reading the row if a concurrent
+            # request for the same title inserts it first
+            favorite, created = Favorite.objects.get_or_create(
                 user=request.user,
                 movie=movie
-            ).first()
-            if existing_favorite:
-                serializer = self.get_serializer(existing_favorite)
+            )
+            if not created:
+                serializer = self.get_serializer(favorite)
                 return Response(
                     {
                         'message': 'Already in favorites',
@@ -968,10 +1414,6 @@ class FavoriteViewSet(viewsets.ModelViewSet):
                     },
                     status=status.HTTP_200_OK
                 )
-            favorite = Favorite.objects.create(
-                user=request.user,
-                movie=movie
-            )
             serializer = self.get_serializer(favorite)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         except TMDBError as e:
@@ -1031,6 +1473,24 @@ class FavoriteViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['post'], url_path='check_bulk')
+    def check_favorites_bulk(self, request):
+        """Check favorite, status and rating for many titles at once.
+
+        Body: {"items": [{"tmdb_id": 550, "media_type": "movie"}, ...]}
+        """
+        serializer = BulkFavoriteCheckSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        pairs = [(item['tmdb_id'], item['media_type']) for item in serializer.validated_data['items']]
+        states = get_library_state(request.user, pairs)
+        return Response({
+            'results': [
+                {'tmdb_id': tmdb_id, 'media_type': media_type, **states[(tmdb_id, media_type)]}
+                for tmdb_id, media_type in pairs
+            ]
+        })
+
     @action(detail=False, methods=['get'], url_path='check')
     def check_favorite(self, request):
         """Check if a movie/series is favorited."""
@@ -1076,10 +1536,14 @@ class ReviewViewSet(viewsets.ModelViewSet):
     """
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return Review.objects.filter(user=self.request.user).select_related('movie', 'user')
 
+    def list(self, request, *args, **kwargs):
+        return _fast_list(self, REVIEW_VALUES, review_data)
+
     def create(self, request, *args, **kwargs):
         """Add or update a review."""
         tmdb_id = request.data.get('tmdb_id')
@@ -1218,4 +1682,26 @@ class ReviewViewSet(viewsets.ModelViewSet):
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+
+class SyncView(APIView):
+    """
+    Delta sync for offline-first clients.
+
+    GET /api/sync/ - everything (first launch)
+    GET /api/sync/?since=<watermark> - rows created/updated and IDs deleted since then
+
+    Every response has a "watermark" to send as ``since`` next time. "full"
+    is true when the response is a complete snapshot (no ``since``, or one too
+    old to serve incrementally) and the client should replace its local copy.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        raw = request.query_params.get('since')
+        since = parse_watermark(raw)
+        if raw and since is None:
+            return Response({'error': 'since must be a watermark returned by this endpoint'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(changes_since(request.user, since))